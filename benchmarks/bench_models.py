@@ -0,0 +1,167 @@
+"""Micro-benchmarks of the parsing and serialization of the models.
+
+Run from the repository root::
+
+    python benchmarks/bench_models.py
+    python benchmarks/bench_models.py --baseline benchmarks/baseline.json
+    python benchmarks/bench_models.py --save-baseline benchmarks/baseline.json
+
+With ``--baseline`` the exit code is 1, if a benchmark is slower or allocates more
+than the tolerance allows (``--tolerance``, default 0.2: 20% fewer ops/sec or 20% more
+peak memory than the baseline).
+
+The absolute numbers depend on the machine and the Python version, so no baseline is
+committed. Record it on the same machine (or CI runner) right before the comparison,
+e.g. on the main branch with ``pipenv run benchmark_baseline`` and then on the
+branch to check with ``pipenv run benchmark_compare``. A baseline of another
+Python version (major.minor) is rejected with the exit code 2.
+"""
+import argparse
+import gc
+import json
+import pathlib
+import sys
+import time
+import tracemalloc
+import typing as t
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+
+import fixtures  # noqa: E402
+from unzer.model import Basket, Customer, PaymentGetResponse  # noqa: E402
+from unzer.model.payment import PaymentTransaction  # noqa: E402
+
+Benchmark: t.TypeAlias = t.Callable[[], t.Any]
+
+
+def benchmarks() -> dict[str, Benchmark]:
+    """Build the benchmarks, the fixtures are created once upfront."""
+    cases: dict[str, Benchmark] = {}
+    for size in (1, 10, 500):
+        data = fixtures.payment(size)
+        cases["PaymentGetResponse.fromDict[%d txn]" % size] = lambda data=data: PaymentGetResponse.fromDict(data, None)
+    txn = fixtures.transaction("s-pay-1", 1)
+    cases["PaymentTransaction.fromDict"] = lambda: PaymentTransaction.fromDict(txn)
+    customerData = fixtures.customer()
+    cases["Customer.fromDict"] = lambda: Customer.fromDict(customerData)
+    customer = fixtures.customerModel()
+    cases["Customer.serialize"] = customer.serialize
+    for size in (1, 10, 100, 1000, 5000):
+        data = fixtures.basket(size)
+        cases["Basket.fromDict[%d items]" % size] = lambda data=data: Basket.fromDict(data)
+    for size in (1, 5000):
+        cases["Basket.serialize[%d items]" % size] = fixtures.basketModel(size).serialize
+    cases["PaymentPage.serialize"] = fixtures.paymentPageModel().serialize
+    return cases
+
+
+def measureSpeed(func: Benchmark, minTime: float, repeat: int) -> float:
+    """Measure the operations per second, the best of *repeat* rounds of at least *minTime* seconds."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= minTime:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, min(10, int(minTime / elapsed) + 1))
+    best = elapsed
+    gcEnabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat - 1):
+            started = time.perf_counter()
+            for _ in range(loops):
+                func()
+            best = min(best, time.perf_counter() - started)
+    finally:
+        if gcEnabled:
+            gc.enable()
+    return loops / best
+
+
+def measureAllocations(func: Benchmark) -> tuple[int, int]:
+    """Measure the peak of traced memory (bytes) of one operation and the number of memory blocks held by its result."""
+    func()  # warm up caches (e.g. compiled regexes, strptime)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        result = func()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+    return peak, blocks
+
+
+def run(cases: dict[str, Benchmark], minTime: float, repeat: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, func in cases.items():
+        opsPerSec = measureSpeed(func, minTime, repeat)
+        peak, blocks = measureAllocations(func)
+        results[name] = {"ops_per_sec": opsPerSec, "peak_bytes": peak, "blocks": blocks}
+        print("%-40s %14.1f ops/s %12d B peak %8d blocks" % (name, opsPerSec, peak, blocks), flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Compare the results against a baseline, get the regressions."""
+    regressions = []
+    print()
+    print("%-40s %12s %12s" % ("benchmark", "speed", "memory"))
+    for name, result in results.items():
+        if name not in baseline:
+            print("%-40s %12s %12s" % (name, "new", "new"))
+            continue
+        speed = result["ops_per_sec"] / baseline[name]["ops_per_sec"]
+        memory = result["peak_bytes"] / max(1, baseline[name]["peak_bytes"])
+        print("%-40s %11.2fx %11.2fx" % (name, speed, memory))
+        if speed < 1 - tolerance:
+            regressions.append("%s is %.0f%% slower" % (name, (1 - speed) * 100))
+        if memory > 1 + tolerance:
+            regressions.append("%s uses %.0f%% more memory" % (name, (memory - 1) * 100))
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-k", "--filter", help="Run only the benchmarks containing this text.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum time of one round in seconds.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of rounds, the best is taken.")
+    parser.add_argument("--baseline", type=pathlib.Path, help="Compare against this baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression (0.2 = 20%%).")
+    parser.add_argument("--save-baseline", type=pathlib.Path, help="Store the results as baseline.")
+    args = parser.parse_args(argv)
+
+    cases = benchmarks()
+    if args.filter:
+        cases = {name: func for name, func in cases.items() if args.filter in name}
+    results = run(cases, args.min_time, args.repeat)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps({
+            "python": sys.version.split()[0],
+            "results": results,
+        }, indent=2, sort_keys=True) + "\n")
+        print("Saved baseline to %s" % args.save_baseline)
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if str(baseline.get("python")).rsplit(".", 1)[0] != "%d.%d" % sys.version_info[:2]:
+            print("Baseline was recorded with Python %s, record a new one with --save-baseline"
+                  % baseline.get("python"))
+            return 2
+        if regressions := compare(results, baseline["results"], args.tolerance):
+            print()
+            print("\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
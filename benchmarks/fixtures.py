@@ -0,0 +1,153 @@
+import datetime
+
+from unzer.model import Address, Basket, BasketItem, Customer, PaymentPage
+from unzer.model.payment import Action
+
+
+def transaction(paymentId: str, index: int) -> dict:
+    """A transaction of a payment as returned by ``GET payments/{id}``."""
+    code = "s-chg-%d" % index if index else "s-aut-1"
+    kind = "charge" if index else "authorize"
+    date = datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=index)
+    return {
+        "date": date.strftime("%Y-%m-%d %H:%M:%S"),
+        "type": kind,
+        "status": "success",
+        "url": "https://api.unzer.com/v1/payments/%s/%s/%s" % (paymentId, kind + ("s" if index else ""), code),
+        "amount": "10.0000",
+        "participantId": "31HA07BC8142C5A171744F3D6D155865",
+    }
+
+
+def payment(transactions: int) -> dict:
+    """A payment with a number of transactions (an authorization and charges)."""
+    paymentId = "s-pay-%d" % transactions
+    return {
+        "id": paymentId,
+        "state": {"id": 1, "name": "completed"},
+        "amount": {
+            "total": "%d.0000" % (10 * transactions),
+            "charged": "%d.0000" % (10 * (transactions - 1)),
+            "canceled": "0.0000",
+            "remaining": "10.0000",
+        },
+        "currency": "EUR",
+        "orderId": "order-%d" % transactions,
+        "invoiceId": "",
+        "resources": {
+            "customerId": "s-cst-1",
+            "paymentId": paymentId,
+            "basketId": "s-bsk-1",
+            "metadataId": "",
+            "payPageId": "",
+            "traceId": "70ddf3152a798c554d9751a6d77812ae",
+            "typeId": "s-crd-fm7tifzkqewy",
+        },
+        "transactions": [transaction(paymentId, index) for index in range(transactions)],
+    }
+
+
+def basketItem(index: int) -> dict:
+    return {
+        "basketItemReferenceId": "item-%d" % index,
+        "quantity": 2,
+        "vat": 19,
+        "amountDiscount": 0,
+        "amountGross": 23.8,
+        "amountVat": 3.8,
+        "amountPerUnit": 11.9,
+        "amountNet": 20.0,
+        "unit": "pc.",
+        "title": "Article %d" % index,
+        "subTitle": "A very fine article",
+        "imageUrl": "https://example.com/images/%d.png" % index,
+        "type": "goods",
+    }
+
+
+def basket(items: int) -> dict:
+    """A basket as returned by ``GET baskets/{id}``."""
+    return {
+        "id": "s-bsk-%d" % items,
+        "amountTotalGross": 23.8 * items,
+        "amountTotalVat": 3.8 * items,
+        "amountTotalDiscount": 0.0,
+        "currencyCode": "EUR",
+        "orderId": "order-%d" % items,
+        "note": "",
+        "basketItems": [basketItem(index) for index in range(items)],
+    }
+
+
+def basketModel(items: int) -> Basket:
+    return Basket(
+        orderId="order-%d" % items,
+        currencyCode="EUR",
+        amountTotalGross=23.8 * items,
+        amountTotalVat=3.8 * items,
+        amountTotalDiscount=0.0,
+        basketItems=[BasketItem.fromDict(basketItem(index)) for index in range(items)],
+    )
+
+
+def address() -> dict:
+    return {
+        "name": "Max Mustermann",
+        "street": "Hauptstraße 1",
+        "state": "DE-BW",
+        "zip": "76133",
+        "city": "Karlsruhe",
+        "country": "DE",
+    }
+
+
+def customer() -> dict:
+    """A customer as returned by ``GET customers/{id}``."""
+    return {
+        "id": "s-cst-1",
+        "lastname": "Mustermann",
+        "firstname": "Max",
+        "salutation": "mr",
+        "company": "",
+        "customerId": "c-4711",
+        "birthDate": "1980-01-01",
+        "email": "max@example.com",
+        "phone": "+49 721 123456",
+        "mobile": "",
+        "billingAddress": address(),
+        "shippingAddress": address(),
+    }
+
+
+def customerModel() -> Customer:
+    return Customer(
+        lastname="Mustermann",
+        firstname="Max",
+        salutation="mr",
+        customerId="c-4711",
+        birthDate=datetime.date(1980, 1, 1),
+        email="max@example.com",
+        phone="+49 721 123456",
+        billingAddress=Address.fromDict(address()),
+        shippingAddress=Address.fromDict(address()),
+    )
+
+
+def paymentPageModel() -> PaymentPage:
+    return PaymentPage(
+        action=Action.CHARGE,
+        amount=119.0,
+        currency="EUR",
+        card3ds=True,
+        orderId="order-1",
+        returnUrl="https://example.com/return",
+        shopName="Example Shop",
+        shopDescription="Everything you need",
+        tagline="Pay with ease",
+        logoImage="https://example.com/logo.png",
+        termsAndConditionUrl="https://example.com/terms",
+        privacyPolicyUrl="https://example.com/privacy",
+        imprintUrl="https://example.com/imprint",
+        customerId="s-cst-1",
+        basketId="s-bsk-1",
+    )
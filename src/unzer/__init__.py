@@ -3,5 +3,33 @@ __author__ = "Sven Eberth"
 __email__ = "se@mausbrand.de"
 __version__ = "1.4.0"
 
+from .async_client import AsyncUnzerClient
+from .cache import ResponseCache, SQLiteCache
+from .circuit_breaker import CircuitBreaker, CircuitState
 from .client import UnzerClient
+from .codec import JSONCodec, OrjsonCodec, StdlibJSONCodec
+from .hooks import Hooks, RequestEvent, operationLabel
+from .instrumentation import Instrumentation
+from .metrics import MetricsCollector
+from .profiling import CallProfile, Profiler
 from .model import *
+from .ratelimit import RateLimit, RateLimiter, SharedMemoryBackend
+from .retry import RetryPolicy
+from .transport import (
+    FaultInjectionTransport,
+    FaultReport,
+    HttpxTransport,
+    InMemoryTransport,
+    RecordingTransport,
+    ReplayTransport,
+    RequestsTransport,
+    Transport,
+    TransportConnectionError,
+    TransportError,
+    TransportRequest,
+    TransportResponse,
+    TransportTimeout,
+    constantLatency,
+    lognormalLatency,
+    uniformLatency,
+)
@@ -0,0 +1,554 @@
+import asyncio
+import itertools
+import logging
+import typing as t
+from types import NoneType
+
+from .client import RETRY, BaseUnzerClient, HttpMethod
+from .hooks import RequestEvent
+from .instrumentation import Instrumentation
+from .model import *
+from .model.basket import Basket
+from .model.keypair import KeyPairTypes
+from .model.payment import PaymentGetResponse, PaymentRequest, PaymentResponse
+from .model.paymentpage import PaymentPage, PaymentPageResponse
+from .model.webhook import Webhook
+from .ratelimit import TokenBucket
+from .transport import HttpxTransport, Transport, TransportError
+
+logger = logging.getLogger("unzer-sdk").getChild(__name__)
+
+
+class AsyncUnzerClient(BaseUnzerClient):
+    """Asyncio variant of :class:`UnzerClient`.
+
+    Provides the same resource methods as coroutines.
+    By default, the requests are performed by a pooled :class:`httpx.AsyncClient`
+    (see :class:`HttpxTransport`) and the retry delays don't block the event loop,
+    so many payments can be in-flight on one event loop.
+
+    Requires the optional dependency ``httpx`` (``pip install unzer[async]``).
+    """
+
+    def __init__(
+            self,
+            private_key: str,
+            public_key: str,
+            sandbox: bool = False,
+            language: str = "en",
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            transport: Transport = None,
+            **kwargs
+    ):
+        """Create a new async client.
+
+        :param private_key: The private key of the keypair.
+        :param public_key: The public key of the keypair.
+        :param sandbox: Use the sandbox environment.
+        :param language: Language for translation of customerMessage in errors.
+        :param max_connections: Maximum number of concurrent connections.
+        :param max_keepalive_connections: Maximum number of idle keep-alive connections.
+        :param transport: (optional) The transport to perform the requests.
+            The connection parameters are ignored, if a transport is provided.
+
+        See :class:`BaseUnzerClient` for further parameters.
+        """
+        kwargs.setdefault("instrumentation", Instrumentation(logger))
+        super().__init__(private_key, public_key, sandbox, language, **kwargs)
+        if transport is None:
+            transport = HttpxTransport(max_connections, max_keepalive_connections)
+        self.transport = transport
+
+    async def close(self) -> None:
+        """Close the transport and release all pooled connections."""
+        await self.transport.aclose()
+
+    async def __aenter__(self) -> t.Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+    async def request(
+            self,
+            operation: str,
+            method: HttpMethod,
+            payload: t.Any = None,
+            additional_headers: dict[str, str] = None,
+    ) -> t.Any:
+        """Perform a request to the unzer-api.
+
+        See :meth:`UnzerClient.request`.
+        """
+        url = self._buildUrl(operation)
+        headers = self._buildHeaders(additional_headers)
+        if method != "GET":
+            try:
+                return await self._request(url, method, headers, payload, auth=self._auth)
+            finally:
+                self._invalidateResponses(operation)
+        data, generation = self._cachedResponse(operation)
+        if data is not None:
+            return data
+        if self.coalesceGets:
+            data = await self._singleFlight.doAsync(
+                self._flightKey(url, headers),
+                lambda: self._request(url, method, headers, payload, auth=self._auth),
+            )
+        else:
+            data = await self._request(url, method, headers, payload, auth=self._auth)
+        self._storeResponse(operation, data, generation)
+        return data
+
+    async def _request(self, url: str, method: str,
+                       headers: dict[str, str], payload: t.Any,
+                       auth: tuple[str, str]) -> t.Any:
+        """Helper method to perform the request with throttling.
+
+        See :meth:`UnzerClient._request`.
+        """
+        request = self._buildTransportRequest(url, method, headers, payload, auth)
+        operation = self._operationOf(url)
+        retry = self.currentRetryPolicy.start()
+        sampled = self.instrumentation.samplePayload()
+        event = RequestEvent(self, method, url, operation, request)
+        profiling = self._startProfile(event)
+        r = data = None
+        try:
+            while True:
+                if not retry.canAttempt():
+                    break
+                if self.rateLimiter is not None:
+                    self._checkCircuit(operation)
+                    await self.rateLimiter.acquireAsync(self.private_key, *self._rateLimitClass(method, operation))
+                self._acquireCircuit(operation, method)
+                request.timeout = retry.attemptTimeout(self.timeout)
+                event.startAttempt(retry.attempt)
+                self.hooks.emit("before_request", event)
+                self.instrumentation.attempt(request, retry.attempt, payload, sampled)
+                try:
+                    r = await self.transport.asend(request)
+                except TransportError as exc:
+                    self._recordCircuit(operation, None)
+                    if not self._isRetryableError(exc):
+                        raise
+                    event.exception = exc
+                    delay = retry.nextDelay()
+                else:
+                    event.response = r
+                    self.hooks.emit("after_response", event)
+                    if (data := self._handleResponse(r, operation, sampled)) is not RETRY:
+                        return data
+                    delay = retry.nextDelay(r)
+                if delay is None:
+                    break
+                event.delay = delay
+                self.hooks.emit("retry", event)
+                self.instrumentation.retry(delay)
+                await asyncio.sleep(delay)
+            return self._raiseAllAttemptsFailed(r)
+        except Exception as exc:
+            event.exception = exc
+            self.hooks.emit("error", event)
+            raise
+        finally:
+            if profiling is not None:
+                self._finishProfile(profiling, event, data)
+
+    async def getKeyPair(self) -> dict:
+        """See :meth:`UnzerClient.getKeyPair`."""
+        return await self.request(
+            "keypair",
+            "GET",
+        )
+
+    async def getKeyPairTypes(self) -> dict[str, t.Any]:
+        """See :meth:`UnzerClient.getKeyPairTypes`."""
+        return await self.request(
+            "keypair/types",
+            "GET",
+        )
+
+    async def getKeyPairConfiguration(self, refresh: bool = False) -> KeyPairTypes:
+        """See :meth:`UnzerClient.getKeyPairConfiguration`."""
+        async def load():
+            return KeyPairTypes.fromDict(await self.getKeyPairTypes())
+
+        return await self._keyPairTypes.getAsync(load, refresh)
+
+    async def getError(self, errorId: str) -> dict:
+        """See :meth:`UnzerClient.getError`."""
+        if not isinstance(errorId, str):
+            raise TypeError("Expected a errorId of type str. Got %r" % type(errorId))
+        return await self.request(
+            "errors/%s" % errorId,
+            "GET",
+        )
+
+    async def createCustomer(self, customer, readBack=None):
+        """See :meth:`UnzerClient.createCustomer`."""
+        if not isinstance(customer, Customer):
+            raise TypeError("Expected a Customer object. Got %r" % type(customer))
+        if customer.key:
+            raise TypeError("Customer has a id (key) set. "
+                            "Call updateCustomer to update it or remove it to create a new one.")
+        data = await self.request(
+            "customers",
+            "POST",
+            customer.serialize(),
+        )
+        # API docs wrong: we get only a dict with the id back
+        if not self._shouldReadBack(readBack):
+            return self._rememberCustomer(self._buildLocalModel(customer, data["id"]))
+        return await self.getCustomer(data["id"])
+
+    async def updateCustomer(self, customer, readBack=None):
+        """See :meth:`UnzerClient.updateCustomer`."""
+        if not isinstance(customer, Customer):
+            raise TypeError("Expected a Customer object. Got %r" % type(customer))
+        if not customer.keyOrCustomerId:
+            raise TypeError("Customer has no customerId oder key (id)")
+        data = await self.request(
+            "customers/%s" % customer.keyOrCustomerId,
+            "PUT",
+            customer.serialize(),
+        )
+        # API docs wrong: we get only a dict with the id back
+        if not self._shouldReadBack(readBack):
+            return self._rememberCustomer(self._buildLocalModel(customer, data["id"]))
+        return await self.getCustomer(data["id"])
+
+    async def createOrUpdateCustomer(self, customer, readBack=None):
+        """See :meth:`UnzerClient.createOrUpdateCustomer`."""
+        if not isinstance(customer, Customer):
+            raise TypeError("Expected a Customer object. Got %r" % type(customer))
+        if (known := self._knownCustomer(customer)) is not None:
+            try:
+                return await self.updateCustomer(known, readBack)
+            except ErrorResponse as er:
+                if customer.key or er.statusCode not in (400, 404):
+                    raise er
+                # the cached key is outdated, the customer was deleted
+                self._forgetCustomer(customer.customerId)
+        try:
+            return await self.createCustomer(customer, readBack)
+        except ErrorResponse as er:
+            if self._isCustomerExistsError(er):
+                return await self.updateCustomer(customer, readBack)
+            raise er
+
+    async def deleteCustomer(self, customer):
+        """See :meth:`UnzerClient.deleteCustomer`."""
+        if isinstance(customer, Customer):
+            if not customer.key and not customer.customerId:
+                raise TypeError("Customer has no customerId oder key (id)")
+            codeOrExternalId = customer.customerId or customer.key
+        elif isinstance(customer, str):
+            codeOrExternalId = customer
+        else:
+            raise TypeError("Expected a Customer object or str. Got %r" % type(customer))
+        data = await self.request(
+            "customers/%s" % codeOrExternalId,
+            "DELETE",
+        )
+        self._forgetCustomer(codeOrExternalId)
+        return data["id"]
+
+    async def getCustomer(self, codeOrExternalId):
+        """See :meth:`UnzerClient.getCustomer`."""
+        data = await self.request(
+            "customers/%s" % codeOrExternalId,
+            "GET",
+        )
+        return self._rememberCustomer(self._buildResponseModel(Customer.fromDict, data))
+
+    async def createBasket(self, basket, readBack=None):
+        """See :meth:`UnzerClient.createBasket`."""
+        if not isinstance(basket, Basket):
+            raise TypeError("Expected a Basket object. Got %r" % type(basket))
+        data = await self.request(
+            "baskets",
+            "POST",
+            basket.serialize(),
+        )
+        if not self._shouldReadBack(readBack):
+            return self._buildLocalModel(basket, data["id"])
+        return await self.getBasket(data["id"])
+
+    async def updateBasket(self, basket, readBack=None):
+        """See :meth:`UnzerClient.updateBasket`."""
+        if not isinstance(basket, Basket):
+            raise TypeError("Expected a Basket object. Got %r" % type(basket))
+        if not basket.key:
+            raise TypeError("Basket has no key (id)")
+        data = await self.request(
+            "baskets/%s" % basket.key,
+            "PUT",
+            basket.serialize(),
+        )
+        if not self._shouldReadBack(readBack):
+            return self._buildLocalModel(basket, data["id"])
+        return await self.getBasket(data["id"])
+
+    async def getBasket(self, basketId):
+        """See :meth:`UnzerClient.getBasket`."""
+        data = await self.request(
+            "baskets/%s" % basketId,
+            "GET",
+        )
+        return self._buildResponseModel(Basket.fromDict, data)
+
+    async def createPaymentType(self, paymentType):
+        """See :meth:`UnzerClient.createPaymentType`."""
+        if not isinstance(paymentType, PaymentType):
+            raise TypeError("Expected a PaymentType object. Got %r" % type(paymentType))
+        paymentType.validateBeforeRequest()
+        data = await self.request(
+            self._paymentTypeOperation(paymentType),
+            "POST",
+            paymentType.serialize(),
+        )
+        return self._buildResponseModel(type(paymentType).fromDict, data)
+
+    async def createPaymentPage(self, paymentPage, customer=None):
+        """See :meth:`UnzerClient.createPaymentPage`."""
+        if not isinstance(paymentPage, PaymentPage) or isinstance(paymentPage, PaymentPageResponse):
+            raise TypeError("Expected a PaymentPage object. Got %r" % type(paymentPage))
+        if self.preflight:
+            paymentPage.validateBeforeRequest(
+                await self.getKeyPairConfiguration(),
+                customer.customerType if customer is not None else None,
+            )
+        else:
+            paymentPage.validateBeforeRequest()
+        if customer is not None and customer.key and not paymentPage.customerId:
+            paymentPage.customerId = customer.key
+        data = await self.request(
+            "paypage/%s" % paymentPage.action.value,
+            "POST",
+            paymentPage.serialize(),
+        )
+        return self._buildResponseModel(PaymentPageResponse.fromDict, data)
+
+    async def getPaymentPage(self, payPageId):
+        """See :meth:`UnzerClient.getPaymentPage`."""
+        if not isinstance(payPageId, str):
+            raise TypeError("Expected a payPageId of type str. Got %r" % type(payPageId))
+        data = await self.request(
+            "paypage/%s" % payPageId,
+            "GET",
+        )
+        return self._buildResponseModel(PaymentPageResponse.fromDict, data)
+
+    async def getPayment(self, codeOrOrderId):
+        """See :meth:`UnzerClient.getPayment`.
+
+        The returned :class:`PaymentGetResponse` is bound to this client,
+        so its methods which perform requests return awaitables.
+        """
+        if not isinstance(codeOrOrderId, str):
+            raise TypeError("Expected a codeOrOrderId of type str. Got %r" % type(codeOrOrderId))
+        data = await self.request(
+            "payments/%s" % codeOrOrderId,
+            "GET",
+        )
+        return self._buildResponseModel(PaymentGetResponse.fromDict, data, self)
+
+    async def getPayments(
+            self,
+            codeOrOrderIds: t.Iterable[str],
+            concurrency: int = 8,
+            on_error: t.Callable[[str, Exception], None] = None,
+            rate_limit: float = None,
+    ) -> t.AsyncIterator[PaymentGetResponse]:
+        """See :meth:`UnzerClient.getPayments`.
+
+        Iterate with ``async for``.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        bucket = TokenBucket(rate_limit, burst=1) if rate_limit else None
+        codeOrOrderIds = iter(codeOrOrderIds)
+        pending: dict[asyncio.Task, str] = {}
+        try:
+            while True:
+                for codeOrOrderId in itertools.islice(codeOrOrderIds, concurrency - len(pending)):
+                    if bucket is not None:
+                        await bucket.acquireAsync()
+                    pending[asyncio.ensure_future(self.getPayment(codeOrOrderId))] = codeOrOrderId
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    codeOrOrderId = pending.pop(task)
+                    try:
+                        payment = task.result()
+                    except Exception as exc:
+                        self._reportBulkError(codeOrOrderId, exc, on_error)
+                    else:
+                        yield payment
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def authorize(self, payment, **kwargs) -> PaymentResponse:
+        """See :meth:`UnzerClient.authorize`."""
+        return await self._authorize_or_charge("authorize", payment, **kwargs)
+
+    async def charge(self, payment, **kwargs) -> PaymentResponse:
+        """See :meth:`UnzerClient.charge`."""
+        return await self._authorize_or_charge("charges", payment, **kwargs)
+
+    async def checkout(
+            self,
+            payment: PaymentRequest,
+            customer: Customer = None,
+            basket: Basket = None,
+            action: Action = Action.CHARGE,
+            rollback: bool = True,
+            headers: dict[str, str] = None,
+    ) -> PaymentResponse:
+        """See :meth:`UnzerClient.checkout`."""
+        type_ = self._checkoutTransaction(action)
+        plan = self._checkoutPlan(payment, customer, basket)
+        if self.preflight:
+            payment.validateBeforeRequest(await self.getKeyPairConfiguration(), self._checkoutCustomerType(customer))
+        resources = {"customer": customer, "basket": basket, "paymentType": payment.paymentType}
+        failures = {}
+        results = await asyncio.gather(*(fn() for fn in plan.values()), return_exceptions=True)
+        for step, result in zip(plan, results):
+            if isinstance(result, BaseException):
+                failures[step] = result
+                resources[step] = None
+            else:
+                resources[step] = result
+        if not failures:
+            try:
+                return await self._authorize_or_charge(type_, self._checkoutPayment(payment, resources), headers)
+            except Exception as exc:
+                failures["transaction"] = exc
+        rolledBack = []
+        for key in self._checkoutRollback(plan, resources, failures) if rollback else ():
+            try:
+                await self.deleteCustomer(key)
+            except Exception:
+                logger.exception("Failed to roll back the customer %s of a failed checkout", key)
+            else:
+                rolledBack.append(key)
+        raise self._checkoutFailure(failures, resources, rolledBack) from next(iter(failures.values()))
+
+    async def _authorize_or_charge(
+            self,
+            type_: str,
+            payment: PaymentRequest,
+            headers: dict[str, str] = None,
+            customer: Customer = None,
+    ) -> PaymentResponse:
+        """Internal helper for authorize and charge calls
+
+        :param customer: (optional) The customer of the payment, its key is used as customerId
+            (if none is set) and its customerType is validated by the preflight.
+        """
+        if type_ not in {"authorize", "charges"}:
+            raise ValueError("Invalid type %r" % type_)
+        if not isinstance(payment, PaymentRequest):
+            raise TypeError("Expected a PaymentRequest object. Got %r" % type(PaymentRequest))
+        if not payment.paymentType:
+            raise ValueError("No paymentType set")
+        if self.preflight:
+            payment.validateBeforeRequest(
+                await self.getKeyPairConfiguration(),
+                customer.customerType if customer is not None else None,
+            )
+        else:
+            payment.validateBeforeRequest()
+        if customer is not None and customer.key and not payment.customerId:
+            payment.customerId = customer.key
+        if not payment.paymentType.key:
+            payment.paymentType = await self.createPaymentType(payment.paymentType)
+        data = await self.request(
+            "/".join(filter(None, ["payments", payment.paymentId, type_])),
+            "POST",
+            payment.serialize(),
+            additional_headers=headers or {},
+        )
+        if data.get("isError"):
+            raise ErrorResponse.fromDict(data)
+        return self._buildResponseModel(PaymentResponse.fromDict, data, self)
+
+    async def getChargedTransaction(self, codeOrOrderId, txnCode):
+        """See :meth:`UnzerClient.getChargedTransaction`."""
+        if not isinstance(codeOrOrderId, str):
+            raise TypeError("Expected a codeOrOrderId of type str. Got %r" % type(codeOrOrderId))
+        if not isinstance(txnCode, (str, NoneType)):
+            raise TypeError("Expected a txnCode of type str or None. Got %r" % type(txnCode))
+        data = await self.request(
+            "payments/%s/charges/%s" % (codeOrOrderId, txnCode or ""),
+            "GET",
+        )
+        return self._buildResponseModel(PaymentResponse.fromDict, data, self)
+
+    async def listWebhooks(self):
+        """See :meth:`UnzerClient.listWebhooks`."""
+        data = await self.request(
+            "webhooks",
+            "GET",
+        )
+        return self._loadWebhookResponse(data)
+
+    async def getWebhook(self, webhookId):
+        """See :meth:`UnzerClient.getWebhook`."""
+        data = await self.request(
+            "webhooks/%s" % webhookId,
+            "GET",
+        )
+        return self._buildResponseModel(Webhook.fromDict, data)
+
+    async def createWebhook(self, webhook):
+        """See :meth:`UnzerClient.createWebhook`."""
+        if not isinstance(webhook, Webhook):
+            raise TypeError("Expected a Webhook object. Got %r" % type(webhook))
+        if webhook.webhookId:
+            raise TypeError("Webhook has a id set. "
+                            "Call updateWebhook to update it or remove the id to create a new one.")
+        webhook.validateBeforeRequest()
+        data = await self.request(
+            "webhooks",
+            "POST",
+            webhook.serialize(),
+        )
+        return self._loadWebhookResponse(data)
+
+    async def updateWebhook(self, webhook):
+        """See :meth:`UnzerClient.updateWebhook`."""
+        if not isinstance(webhook, Webhook):
+            raise TypeError("Expected a Webhook object. Got %r" % type(webhook))
+        if not webhook.webhookId:
+            raise ValueError("Webhook to update has no id")
+        if not webhook.url:
+            raise ValueError("Webhook to update has no url")
+        data = await self.request(
+            "webhooks/%s" % webhook.webhookId,
+            "PUT",
+            {"url": webhook.url},
+        )
+        return self._buildResponseModel(Webhook.fromDict, data)
+
+    async def deleteWebhook(self, webhookOrId):
+        """See :meth:`UnzerClient.deleteWebhook`."""
+        if isinstance(webhookOrId, Webhook):
+            webhookOrId = webhookOrId.webhookId
+        data = await self.request(
+            "webhooks/%s" % webhookOrId,
+            "DELETE",
+        )
+        return data["id"]
+
+    async def deleteAllWebhooks(self):
+        """See :meth:`UnzerClient.deleteAllWebhooks`."""
+        data = await self.request(
+            "webhooks",
+            "DELETE",
+        )
+        return data["events"]
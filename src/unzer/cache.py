@@ -0,0 +1,488 @@
+import asyncio
+import collections
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import typing as t
+
+logger = logging.getLogger("unzer-sdk").getChild(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        """A thread-safe, size-bounded LRU cache with an optional time-to-live.
+
+        :param maxsize: Maximum number of entries; the least recently used entry is evicted.
+            A maxsize of 0 disables the cache.
+        :param ttl: (optional) Default time-to-live of the entries in seconds.
+        """
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: collections.OrderedDict[t.Hashable, tuple[float | None, t.Any]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: t.Hashable, default: t.Any = None) -> t.Any:
+        """Get the value of a key, if it's present and not expired."""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: t.Hashable, value: t.Any, ttl: float | None = _MISSING) -> None:
+        """Set the value of a key.
+
+        :param ttl: (optional) Time-to-live of this entry in seconds,
+            defaults to the :attr:`ttl` of the cache. None means no expiration.
+        """
+        if self.maxsize <= 0:
+            return
+        if ttl is _MISSING:
+            ttl = self.ttl
+        expires = None if ttl is None else time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: t.Hashable) -> None:
+        """Remove a key, if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def deleteWhere(self, predicate: t.Callable[[t.Hashable, t.Any], bool]) -> None:
+        """Remove all entries for which ``predicate(key, value)`` is true."""
+        with self._lock:
+            for key in [key for key, (_, value) in self._data.items() if predicate(key, value)]:
+                del self._data[key]
+
+    def deletePrefix(self, prefix: tuple) -> None:
+        """Remove all entries with a tuple key starting with *prefix*."""
+        self.deleteWhere(lambda key, _: isinstance(key, tuple) and key[:len(prefix)] == prefix)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: t.Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class StaleWhileRevalidate:
+    def __init__(self, ttl: float, stale_ttl: float = 0.0):
+        """Hold one value, which is loaded on demand and refreshed after a time-to-live.
+
+        Within :attr:`stale_ttl` seconds after the value expired, the stale value is
+        returned immediately and refreshed in the background (one refresh at a time).
+        After that, the value is loaded again before it's returned.
+
+        :param ttl: Time in seconds, the value is fresh.
+        :param stale_ttl: Time in seconds after the expiration, the stale value may be served.
+        """
+        super().__init__()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._value: t.Any = _MISSING
+        self._loadedAt = 0.0
+        self._refreshing = False
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> t.Any:
+        """The current value, even if it's stale, or None if nothing is loaded."""
+        return None if self._value is _MISSING else self._value
+
+    def _state(self, refresh: bool) -> str:
+        """Decide how to serve the value: fresh, stale (and revalidate) or load."""
+        if refresh or self._value is _MISSING:
+            return "load"
+        age = time.monotonic() - self._loadedAt
+        if age < self.ttl:
+            return "fresh"
+        if age < self.ttl + self.stale_ttl:
+            with self._lock:
+                if self._refreshing:
+                    return "fresh"
+                self._refreshing = True
+            return "stale"
+        return "load"
+
+    def _store(self, value: t.Any) -> t.Any:
+        with self._lock:
+            self._value = value
+            self._loadedAt = time.monotonic()
+            self._refreshing = False
+        return value
+
+    def _revalidate(self, loader: t.Callable[[], t.Any]) -> None:
+        try:
+            self._store(loader())
+        except Exception:
+            logger.exception("Failed to revalidate %r", self)
+            with self._lock:
+                self._refreshing = False
+
+    async def _revalidateAsync(self, loader: t.Callable[[], t.Awaitable[t.Any]]) -> None:
+        try:
+            self._store(await loader())
+        except Exception:
+            logger.exception("Failed to revalidate %r", self)
+            with self._lock:
+                self._refreshing = False
+
+    def get(self, loader: t.Callable[[], t.Any], refresh: bool = False) -> t.Any:
+        """Get the value, load or revalidate it with *loader* if necessary.
+
+        :param loader: Loads the current value.
+        :param refresh: Load the value, even if it's fresh.
+        """
+        state = self._state(refresh)
+        if state == "load":
+            return self._store(loader())
+        if state == "stale":
+            threading.Thread(target=self._revalidate, args=(loader,), daemon=True).start()
+        return self._value
+
+    async def getAsync(self, loader: t.Callable[[], t.Awaitable[t.Any]], refresh: bool = False) -> t.Any:
+        """Get the value, load or revalidate it with the async *loader* if necessary.
+
+        See :meth:`get`.
+        """
+        state = self._state(refresh)
+        if state == "load":
+            return self._store(await loader())
+        if state == "stale":
+            task = asyncio.ensure_future(self._revalidateAsync(loader))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return self._value
+
+    def invalidate(self) -> None:
+        """Drop the value, the next access loads it again."""
+        with self._lock:
+            self._value = _MISSING
+            self._refreshing = False
+
+
+class _Flight:
+    def __init__(self):
+        """A call in flight of :class:`SingleFlight`."""
+        super().__init__()
+        self.done = threading.Event()
+        self.result: t.Any = None
+        self.exception: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one.
+
+    While a call with a key is in flight, further calls with the same key
+    don't call again, but wait for it and get the same result (or exception).
+    Nothing is kept after the call finished.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.shared = 0  # calls, which got the result of another call
+        self._flights: dict[t.Hashable, _Flight] = {}
+        self._futures: dict[t.Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: t.Hashable, fn: t.Callable[[], t.Any]) -> t.Any:
+        """Call *fn* or wait for the call in flight with the same key."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+        if not leader:
+            flight.done.wait()
+            if flight.exception is not None:
+                raise flight.exception
+            return flight.result
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as exc:
+            flight.exception = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def doAsync(self, key: t.Hashable, fn: t.Callable[[], t.Awaitable[t.Any]]) -> t.Any:
+        """Await *fn* or the call in flight with the same key.
+
+        The call is awaited in the task of the first caller. If it's cancelled,
+        the waiting callers call again.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                future = self._futures.get(key)
+                if future is None or future.get_loop() is not loop:
+                    future = None
+                    self._futures[key] = leader = loop.create_future()
+                else:
+                    self.shared += 1
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            leader.cancel()
+            raise
+        except BaseException as exc:
+            leader.set_exception(exc)
+            leader.exception()  # retrieved, if nobody waits
+            raise
+        else:
+            leader.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._futures.get(key) is leader:
+                    del self._futures[key]
+
+
+class ResponseCache:
+    """An opt-in read-through cache of GET responses.
+
+    The decoded responses of the cached resources are kept per private key and operation
+    for the TTL of the resource. Any other request (create, update, delete) to a resource
+    through the same client drops all cached responses of this resource and key, e.g.
+    ``PUT customers/s-cst-1`` also drops ``customers/c-4711`` (the same customer by its customerId).
+    A response, which was requested before such a write finished, isn't stored.
+
+    Pass it as *response_cache* to the client, it can be shared between clients.
+    Payments and the keypair can be cached as well by giving them a TTL. With a
+    :class:`SQLiteCache` as *store*, the processes of a host share the responses
+    and start warm after a restart::
+
+        cache = ResponseCache({"payments": 10, "keypair": 300}, store=SQLiteCache("/var/cache/unzer.sqlite"))
+
+    The writes are tracked per process, a response requested in one process while
+    another one writes the resource may be stored until its TTL expires.
+    """
+
+    # TTLs in seconds by resource (the first segment of the operation)
+    DEFAULT_TTLS = {
+        "customers": 300.0,
+        "baskets": 300.0,
+        "paypage": 30.0,
+        "webhooks": 600.0,
+    }
+
+    def __init__(self, ttls: dict[str, float] = None, maxsize: int = 1024, store: "LRUCache | SQLiteCache" = None):
+        """Create a new response cache.
+
+        :param ttls: (optional) TTLs in seconds by resource, merged with :attr:`DEFAULT_TTLS`.
+            A TTL of 0 disables the cache of a resource.
+        :param maxsize: Maximum number of responses; the least recently used is evicted.
+        :param store: (optional) The store of the responses, e.g. a :class:`SQLiteCache`.
+            Defaults to an :class:`LRUCache` of *maxsize*.
+        """
+        super().__init__()
+        self.ttls = self.DEFAULT_TTLS | (ttls or {})
+        self.store = store if store is not None else LRUCache(maxsize)
+        self._generations: dict[tuple[str, str], int] = {}
+        self._scopes: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _scope(self, key: str) -> str:
+        """The scope of the entries of a private key, it's hashed to keep it out of the store."""
+        if (scope := self._scopes.get(key)) is None:
+            scope = self._scopes[key] = hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+        return scope
+
+    @staticmethod
+    def resourceOf(operation: str) -> str:
+        """Get the resource of an operation (URL path relative to the endpoint)."""
+        return operation.lstrip("/").split("/", 1)[0]
+
+    def cacheable(self, operation: str) -> bool:
+        return self.ttls.get(self.resourceOf(operation), 0) > 0
+
+    def generation(self, key: str, operation: str) -> int:
+        """Get the number of writes to the resource of an operation, pass it to :meth:`set`."""
+        with self._lock:
+            return self._generations.get((key, self.resourceOf(operation)), 0)
+
+    def get(self, key: str, operation: str) -> t.Any:
+        """Get a cached response, None if it's not cached."""
+        return self.store.get((self._scope(key), self.resourceOf(operation), operation))
+
+    def set(self, key: str, operation: str, data: t.Any, generation: int) -> None:
+        """Cache a response, unless the resource was written since *generation*."""
+        resource = self.resourceOf(operation)
+        with self._lock:
+            if self._generations.get((key, resource), 0) != generation:
+                return
+            self.store.set((self._scope(key), resource, operation), data, self.ttls[resource])
+
+    def invalidate(self, key: str, operation: str) -> None:
+        """Drop all cached responses of the resource of an operation."""
+        resource = self.resourceOf(operation)
+        if resource not in self.ttls:
+            return
+        with self._lock:
+            self._generations[(key, resource)] = self._generations.get((key, resource), 0) + 1
+        self.store.deletePrefix((self._scope(key), resource))
+
+    def clear(self) -> None:
+        self.store.clear()
+
+
+class SQLiteCache:
+    def __init__(self, path: str, maxsize: int = 100_000, ttl: float | None = None, cleanup_interval: int = 256):
+        """A cache in a SQLite file, shared by the processes of a host and kept across restarts.
+
+        Provides the interface of :class:`LRUCache`, but evicts the oldest written entries
+        instead of the least recently used, so reads never write. Expired and surplus entries
+        are removed every *cleanup_interval* writes. Keys are strings or tuples of strings,
+        values must be JSON serializable (e.g. the decoded responses of a :class:`ResponseCache`).
+
+        The file contains personal data of the customers and is created readable by the owner only.
+
+        :param path: Path of the database file.
+        :param maxsize: Maximum number of entries.
+        :param ttl: (optional) Default time-to-live of the entries in seconds.
+        :param cleanup_interval: Number of writes between two cleanups.
+        """
+        super().__init__()
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL, written REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS cache_written ON cache (written)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """The connection of the current thread."""
+        if (db := getattr(self._local, "db", None)) is None:
+            db = self._local.db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    @staticmethod
+    def _encodeKey(key: t.Hashable) -> str:
+        return json.dumps(list(key) if isinstance(key, tuple) else key)
+
+    @staticmethod
+    def _decodeKey(value: str) -> t.Hashable:
+        key = json.loads(value)
+        return tuple(key) if isinstance(key, list) else key
+
+    def get(self, key: t.Hashable, default: t.Any = None) -> t.Any:
+        """Get the value of a key, if it's present and not expired."""
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (self._encodeKey(key), time.time()),
+        ).fetchone()
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: t.Hashable, value: t.Any, ttl: float | None = _MISSING) -> None:
+        """Set the value of a key.
+
+        :param ttl: (optional) Time-to-live of this entry in seconds,
+            defaults to the :attr:`ttl` of the cache. None means no expiration.
+        """
+        if self.maxsize <= 0:
+            return
+        if ttl is _MISSING:
+            ttl = self.ttl
+        now = time.time()
+        with self._connection() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, written) VALUES (?, ?, ?, ?)",
+                (self._encodeKey(key), json.dumps(value), None if ttl is None else now + ttl, now),
+            )
+        with self._lock:
+            self._writes += 1
+            cleanup = self._writes % self.cleanup_interval == 0
+        if cleanup:
+            self.cleanup()
+
+    def cleanup(self) -> None:
+        """Remove the expired entries and the oldest ones beyond :attr:`maxsize`."""
+        with self._connection() as db:
+            db.execute("DELETE FROM cache WHERE expires <= ?", (time.time(),))
+            db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY written DESC LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def delete(self, key: t.Hashable) -> None:
+        """Remove a key, if present."""
+        with self._connection() as db:
+            db.execute("DELETE FROM cache WHERE key = ?", (self._encodeKey(key),))
+
+    def deletePrefix(self, prefix: tuple) -> None:
+        """Remove all entries with a tuple key starting with *prefix*."""
+        start = json.dumps(list(prefix))[:-1] + ","
+        end = start[:-1] + chr(ord(start[-1]) + 1)
+        with self._connection() as db:
+            db.execute("DELETE FROM cache WHERE key >= ? AND key < ?", (start, end))
+
+    def deleteWhere(self, predicate: t.Callable[[t.Hashable, t.Any], bool]) -> None:
+        """Remove all entries for which ``predicate(key, value)`` is true (scans all entries)."""
+        db = self._connection()
+        keys = [
+            (key,) for key, value in db.execute("SELECT key, value FROM cache").fetchall()
+            if predicate(self._decodeKey(key), json.loads(value))
+        ]
+        with db:
+            db.executemany("DELETE FROM cache WHERE key = ?", keys)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._connection() as db:
+            db.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        """Close the connection of the current thread."""
+        if (db := getattr(self._local, "db", None)) is not None:
+            db.close()
+            self._local.db = None
+
+    def __contains__(self, key: t.Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT count(*) FROM cache").fetchone()[0]
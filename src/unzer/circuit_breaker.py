@@ -0,0 +1,233 @@
+import collections
+import enum
+import logging
+import threading
+import time
+import typing as t
+
+from .model.error import CircuitOpenError
+
+logger = logging.getLogger("unzer-sdk").getChild(__name__)
+
+
+class CircuitState(enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+StateChangeListener: t.TypeAlias = t.Callable[[str, CircuitState, CircuitState], None]
+
+
+class _Circuit:
+    def __init__(self):
+        """The state of one operation family."""
+        super().__init__()
+        self.state = CircuitState.CLOSED
+        self.results: collections.deque[tuple[float, bool]] = collections.deque()
+        self.consecutiveFailures = 0
+        self.openedAt = 0.0
+        self.trials = 0
+        self.trialSuccesses = 0
+
+
+class CircuitBreaker:
+    """Fail fast, while the Unzer API is degraded.
+
+    The breaker tracks the results of the attempts per operation family
+    (the first segment of the operation, e.g. ``payments``, ``types``, ``customers``, ``webhooks``).
+    A family opens, if its failure rate in the sliding window or the number of consecutive
+    failures exceeds the threshold. While open, requests of this family fail immediately
+    with :exc:`CircuitOpenError`. After :attr:`open_timeout` the family becomes half-open
+    and lets a limited number of trial requests pass: if they succeed, the family closes,
+    otherwise it opens again.
+
+    Network errors and responses with a retryable status code (see :class:`RetryPolicy`)
+    count as failures; client errors (4xx) show a healthy API and count as success.
+    """
+
+    FAMILY_ALIASES = {
+        "paypage": "payments",
+    }
+
+    def __init__(
+            self,
+            failure_rate: float = 0.5,
+            minimum_calls: int = 10,
+            consecutive_failures: int = 5,
+            window: float = 30.0,
+            open_timeout: float = 15.0,
+            half_open_trials: int = 1,
+            on_state_change: StateChangeListener = None,
+    ):
+        """Create a new circuit breaker.
+
+        :param failure_rate: Open, if at least this rate (0..1) of the attempts in the window failed.
+        :param minimum_calls: The failure rate is only evaluated with at least this number of attempts.
+        :param consecutive_failures: Open, if this number of attempts failed in a row.
+        :param window: Length of the sliding window in seconds.
+        :param open_timeout: Time in seconds, after an open family becomes half-open.
+        :param half_open_trials: Number of (concurrent) successful trials required to close again.
+        :param on_state_change: (optional) Listener called with family, old state and new state.
+        """
+        super().__init__()
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.consecutive_failures = consecutive_failures
+        self.window = window
+        self.open_timeout = open_timeout
+        self.half_open_trials = half_open_trials
+        self.listeners: list[StateChangeListener] = []
+        if on_state_change is not None:
+            self.listeners.append(on_state_change)
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def addListener(self, listener: StateChangeListener) -> None:
+        """Register a listener, which is called on every state transition."""
+        self.listeners.append(listener)
+
+    @classmethod
+    def familyOf(cls, operation: str) -> str:
+        """Get the operation family of an operation (URL path relative to the endpoint)."""
+        family = operation.lstrip("/").split("/", 1)[0]
+        return cls.FAMILY_ALIASES.get(family, family)
+
+    def state(self, family: str) -> CircuitState:
+        """Get the current state of a family."""
+        with self._lock:
+            circuit = self._circuits.get(family)
+            if circuit is None:
+                return CircuitState.CLOSED
+            self._updateTimeout(family, circuit, [])
+            return circuit.state
+
+    def states(self) -> dict[str, CircuitState]:
+        """Get the current state of all known families."""
+        return {family: self.state(family) for family in list(self._circuits)}
+
+    def reset(self, family: str = None) -> None:
+        """Close a family (or all families) and forget its results."""
+        with self._lock:
+            families = [family] if family is not None else list(self._circuits)
+            transitions = []
+            for family_ in families:
+                circuit = self._circuits.pop(family_, None)
+                if circuit is not None and circuit.state != CircuitState.CLOSED:
+                    transitions.append((family_, circuit.state, CircuitState.CLOSED))
+        self._notify(transitions)
+
+    def check(self, family: str) -> None:
+        """Fail fast, if a family is open, without taking a trial slot of a half-open family.
+
+        :raises CircuitOpenError: If the family is open.
+        """
+        transitions = []
+        try:
+            with self._lock:
+                circuit = self._circuits.get(family)
+                if circuit is None:
+                    return
+                self._updateTimeout(family, circuit, transitions)
+                if circuit.state != CircuitState.OPEN:
+                    return
+                retryAfter = max(0.0, circuit.openedAt + self.open_timeout - time.monotonic())
+        finally:
+            self._notify(transitions)
+        raise CircuitOpenError(
+            "Circuit for %r is open" % family,
+            family=family,
+            retryAfter=retryAfter,
+        )
+
+    def acquire(self, family: str) -> None:
+        """Check, whether an attempt of this family may be performed.
+
+        :raises CircuitOpenError: If the family is open
+            or the half-open family has no free trial slot.
+        """
+        transitions = []
+        try:
+            with self._lock:
+                circuit = self._circuits.setdefault(family, _Circuit())
+                self._updateTimeout(family, circuit, transitions)
+                if circuit.state == CircuitState.CLOSED:
+                    return
+                if circuit.state == CircuitState.HALF_OPEN and circuit.trials < self.half_open_trials:
+                    circuit.trials += 1
+                    return
+                retryAfter = max(0.0, circuit.openedAt + self.open_timeout - time.monotonic())
+        finally:
+            self._notify(transitions)
+        raise CircuitOpenError(
+            "Circuit for %r is open" % family,
+            family=family,
+            retryAfter=retryAfter,
+        )
+
+    def record(self, family: str, success: bool) -> None:
+        """Record the result of an attempt of this family."""
+        now = time.monotonic()
+        transitions = []
+        with self._lock:
+            circuit = self._circuits.setdefault(family, _Circuit())
+            if circuit.state == CircuitState.HALF_OPEN:
+                circuit.trials = max(0, circuit.trials - 1)
+                if not success:
+                    self._transition(family, circuit, CircuitState.OPEN, transitions)
+                else:
+                    circuit.trialSuccesses += 1
+                    if circuit.trialSuccesses >= self.half_open_trials:
+                        self._transition(family, circuit, CircuitState.CLOSED, transitions)
+            elif circuit.state == CircuitState.CLOSED:
+                circuit.results.append((now, success))
+                while circuit.results and circuit.results[0][0] < now - self.window:
+                    circuit.results.popleft()
+                circuit.consecutiveFailures = 0 if success else circuit.consecutiveFailures + 1
+                if not success and self._shouldOpen(circuit):
+                    self._transition(family, circuit, CircuitState.OPEN, transitions)
+        self._notify(transitions)
+
+    def _shouldOpen(self, circuit: _Circuit) -> bool:
+        if circuit.consecutiveFailures >= self.consecutive_failures:
+            return True
+        if len(circuit.results) < self.minimum_calls:
+            return False
+        failures = sum(1 for _, success in circuit.results if not success)
+        return failures / len(circuit.results) >= self.failure_rate
+
+    def _updateTimeout(self, family: str, circuit: _Circuit, transitions: list) -> None:
+        """Move an open family to half-open after the timeout.
+
+        A half-open family, whose trials got no result within the timeout, starts new trials.
+        """
+        if circuit.state == CircuitState.CLOSED:
+            return
+        if time.monotonic() - circuit.openedAt < self.open_timeout:
+            return
+        if circuit.state == CircuitState.OPEN:
+            self._transition(family, circuit, CircuitState.HALF_OPEN, transitions)
+        else:
+            circuit.openedAt = time.monotonic()
+            circuit.trials = 0
+
+    def _transition(self, family: str, circuit: _Circuit, state: CircuitState, transitions: list) -> None:
+        transitions.append((family, circuit.state, state))
+        circuit.state = state
+        circuit.trials = 0
+        circuit.trialSuccesses = 0
+        if state == CircuitState.CLOSED:
+            circuit.results.clear()
+            circuit.consecutiveFailures = 0
+        else:
+            circuit.openedAt = time.monotonic()
+
+    def _notify(self, transitions: list[tuple[str, CircuitState, CircuitState]]) -> None:
+        """Call the listeners outside the lock."""
+        for family, old, new in transitions:
+            logger.warning("Circuit for %r changed from %s to %s", family, old.value, new.value)
+            for listener in self.listeners:
+                try:
+                    listener(family, old, new)
+                except Exception:
+                    logger.exception("Circuit breaker listener %r failed", listener)
@@ -1,27 +1,62 @@
+import concurrent.futures
+import contextlib
+import contextvars
+import copy
+import functools
+import itertools
 import logging
 import time
 import typing as t
+import warnings
 from types import NoneType
 
-import requests
-from urllib3.exceptions import TimeoutError
-
 from . import __version__
 from .model import *
+from .model.base import BaseModel
 from .model.basket import Basket
+from .model.keypair import KeyPairTypes
 from .model.payment import PaymentGetResponse, PaymentRequest, PaymentResponse
 from .model.paymentpage import PaymentPage, PaymentPageResponse
 from .model.webhook import Webhook
+from .cache import LRUCache, ResponseCache, SingleFlight, StaleWhileRevalidate
+from .circuit_breaker import CircuitBreaker
+from .codec import JSONCodec, StdlibJSONCodec
+from .hooks import Hook, HookEvent, Hooks, RequestEvent, operationLabel
+from .instrumentation import Instrumentation
+from .metrics import MetricsCollector
+from .profiling import CallProfile, Profiler, currentProfile, modelProfile
+from .ratelimit import RateLimiter, TokenBucket
+from .retry import RetryPolicy
+from .transport import (
+    RequestsTransport,
+    Transport,
+    TransportConnectionError,
+    TransportError,
+    TransportRequest,
+    TransportResponse,
+    TransportTimeout,
+)
 
 logger = logging.getLogger("unzer-sdk").getChild(__name__)
 
 HttpMethod = t.Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
 
+T = t.TypeVar("T")
+
+# marker of BaseUnzerClient._handleResponse for a retryable response
+RETRY = object()
+
+
+class BaseUnzerClient:
+    """Common configuration and helpers of :class:`UnzerClient` and :class:`AsyncUnzerClient`.
+
+    The model parsing is shared, only the transport and the control flow
+    (blocking or awaitable) differs between the clients.
+    """
 
-class UnzerClient:
     endpoint = "https://api.unzer.com/v1"
-    retryDelays = (1, 2, 4, 8)
     timeout = 5
+    retryPolicy = RetryPolicy()
 
     def __init__(
             self,
@@ -29,12 +64,639 @@ class UnzerClient:
             public_key: str,
             sandbox: bool = False,
             language: str = "en",
+            retry_policy: RetryPolicy = None,
+            circuit_breaker: CircuitBreaker = None,
+            codec: JSONCodec = None,
+            read_back: bool = True,
+            customer_key_cache: LRUCache = None,
+            keypair_ttl: float = 300,
+            keypair_stale_ttl: float = 3600,
+            instrumentation: Instrumentation = None,
+            hooks: Hooks = None,
+            metrics: MetricsCollector = None,
+            profiler: Profiler = None,
+            rate_limiter: RateLimiter = None,
+            coalesce_gets: bool = False,
+            response_cache: ResponseCache = None,
+            preflight: bool = False,
     ):
-        super(UnzerClient, self).__init__()
+        """
+        :param private_key: The private key of the keypair.
+        :param public_key: The public key of the keypair.
+        :param sandbox: Use the sandbox environment.
+        :param language: Language for translation of customerMessage in errors.
+        :param retry_policy: (optional) The retry policy of this client,
+            defaults to the :attr:`retryPolicy` of the class.
+        :param circuit_breaker: (optional) A circuit breaker to fail fast,
+            while the API is degraded. Can be shared between clients.
+        :param codec: (optional) The JSON codec for the request and response bodies,
+            e.g. :class:`OrjsonCodec`. Defaults to :class:`StdlibJSONCodec`.
+        :param read_back: Fetch created and updated customers and baskets again.
+            If disabled, the returned model is built locally from the submitted model
+            and the returned id, which saves one request. Can be overridden per call.
+        :param customer_key_cache: (optional) Cache of customerId to the Unzer key (id),
+            used by :meth:`UnzerClient.createOrUpdateCustomer` to update known customers directly.
+            Defaults to a cache of 4096 entries with a TTL of one hour.
+        :param keypair_ttl: Time in seconds, the cached keypair configuration
+            (see :meth:`UnzerClient.getKeyPairConfiguration`) is fresh.
+        :param keypair_stale_ttl: Time in seconds after the expiration, the stale keypair
+            configuration is served while it's refreshed in the background.
+        :param instrumentation: (optional) The debug logging of requests and responses,
+            e.g. to sample payload logging. Defaults to an :class:`Instrumentation`
+            on the logger of this module.
+        :param hooks: (optional) The lifecycle hooks of the requests, see :class:`Hooks`
+            and :meth:`addHook`.
+        :param metrics: (optional) A metrics collector, which is registered on the hooks.
+            Can be shared between clients.
+        :param profiler: (optional) Record the timing breakdown of each call
+            and keep the slowest calls, see :class:`Profiler`.
+        :param rate_limiter: (optional) Client-side request budgets per operation class,
+            see :class:`RateLimiter`. Can be shared between clients.
+        :param coalesce_gets: Share one request and its decoded response between
+            concurrent identical GET requests with the same retry policy and rate limit class,
+            see :class:`SingleFlight`. The callers get the same objects, so raw responses
+            (e.g. of :meth:`UnzerClient.getKeyPair`) must not be modified.
+        :param response_cache: (optional) Cache the responses of customers, baskets, payment pages
+            and webhooks, see :class:`ResponseCache`. Can be shared between clients.
+        :param preflight: Validate transactions and payment pages locally against the cached
+            keypair configuration (see :meth:`UnzerClient.getKeyPairConfiguration`): Payment types,
+            which aren't configured, unsupported currencies and customer types are rejected
+            with a :exc:`ValueError` before anything is sent.
+        """
+        super().__init__()
         self.private_key = private_key
         self.public_key = public_key
         self.sandbox = sandbox
         self.language = language
+        if retry_policy is not None:
+            self.retryPolicy = retry_policy
+        self.circuitBreaker = circuit_breaker
+        self.codec = codec if codec is not None else StdlibJSONCodec()
+        self.readBack = read_back
+        if customer_key_cache is None:
+            customer_key_cache = LRUCache(maxsize=4096, ttl=3600)
+        self.customerKeyCache = customer_key_cache
+        self._keyPairTypes = StaleWhileRevalidate(keypair_ttl, keypair_stale_ttl)
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation(logger)
+        self.hooks = hooks if hooks is not None else Hooks()
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.install(self.hooks)
+        self.profiler = profiler
+        self._retryPolicyOverride: contextvars.ContextVar[RetryPolicy | None] = \
+            contextvars.ContextVar("retryPolicy", default=None)
+        self.rateLimiter = rate_limiter
+        self._rateLimitOverride: contextvars.ContextVar[tuple[str | None, bool | None]] = \
+            contextvars.ContextVar("rateLimit", default=(None, None))
+        self.coalesceGets = coalesce_gets
+        self._singleFlight = SingleFlight()
+        self.responseCache = response_cache
+        self.preflight = preflight
+
+    def __init_subclass__(cls, **kwargs: t.Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # subclasses may still override the former retryDelays ladder
+        delays = cls.__dict__.get("retryDelays")
+        if delays is not None and not isinstance(delays, property):
+            warnings.warn("%s.retryDelays is deprecated, use retryPolicy" % cls.__name__,
+                          DeprecationWarning, stacklevel=2)
+            delattr(cls, "retryDelays")
+            if "retryPolicy" not in cls.__dict__:
+                cls.retryPolicy = RetryPolicy.fromDelays(delays)
+
+    @property
+    def retryDelays(self) -> tuple[float, ...]:
+        """Deprecated, use :attr:`retryPolicy`.
+
+        The upper bounds of the delays before the retries. Assigning a ladder
+        sets the :attr:`retryPolicy` to the equivalent :meth:`RetryPolicy.fromDelays`.
+        """
+        warnings.warn("retryDelays is deprecated, use retryPolicy", DeprecationWarning, stacklevel=2)
+        return self.retryPolicy.ladder
+
+    @retryDelays.setter
+    def retryDelays(self, delays: t.Sequence[float]) -> None:
+        warnings.warn("retryDelays is deprecated, use retryPolicy", DeprecationWarning, stacklevel=2)
+        self.retryPolicy = RetryPolicy.fromDelays(delays)
+
+    @contextlib.contextmanager
+    def withRetryPolicy(self, policy: RetryPolicy) -> t.Iterator[RetryPolicy]:
+        """Use another retry policy for the calls inside the context.
+
+        The override is bound to the current thread or asyncio task,
+        e.g. checkout calls can fail fast while a background job retries harder::
+
+            with client.withRetryPolicy(RetryPolicy(max_attempts=2, deadline=3)):
+                client.charge(payment)
+        """
+        token = self._retryPolicyOverride.set(policy)
+        try:
+            yield policy
+        finally:
+            self._retryPolicyOverride.reset(token)
+
+    @property
+    def currentRetryPolicy(self) -> RetryPolicy:
+        """The retry policy in effect for the current context."""
+        return self._retryPolicyOverride.get() or self.retryPolicy
+
+    @contextlib.contextmanager
+    def withRateLimitClass(self, operationClass: str = None, block: bool = None) -> t.Iterator[None]:
+        """Count the calls inside the context to another budget of the :class:`RateLimiter`.
+
+        The override is bound to the current thread or asyncio task,
+        e.g. a background job uses its own budget and waits for it::
+
+            with client.withRateLimitClass("bulk", block=True):
+                client.getPayments(paymentIds)
+
+        :param operationClass: (optional) The operation class, instead of :meth:`RateLimiter.classify`.
+        :param block: (optional) Wait for the budget (True) or fail with :exc:`RateLimitExceeded` (False),
+            instead of the setting of the budget.
+        """
+        token = self._rateLimitOverride.set((operationClass, block))
+        try:
+            yield
+        finally:
+            self._rateLimitOverride.reset(token)
+
+    def _rateLimitClass(self, method: str, operation: str) -> tuple[str, bool | None]:
+        """Get the operation class and the block override of a request for the :class:`RateLimiter`."""
+        operationClass, block = self._rateLimitOverride.get()
+        return operationClass or self.rateLimiter.classify(method, operation), block
+
+    def addHook(self, event: HookEvent, hook: Hook) -> Hook:
+        """Register a lifecycle hook, see :class:`Hooks`.
+
+        ::
+
+            client.addHook("retry", lambda event: logger.info("Retry %s in %.1fs", event.label, event.delay))
+        """
+        return self.hooks.add(event, hook)
+
+    def invalidateKeyPairConfiguration(self) -> None:
+        """Drop the cached keypair configuration, the next access fetches it again."""
+        self._keyPairTypes.invalidate()
+
+    def _buildUrl(self, operation: str) -> str:
+        """Build the complete URL for an operation."""
+        return "%s/%s" % (self.endpoint, operation)
+
+    def _operationOf(self, url: str) -> str:
+        """Get the operation (URL path relative to the endpoint) of a complete URL."""
+        return url.removeprefix(self.endpoint).lstrip("/")
+
+    def _buildHeaders(self, additional_headers: dict[str, str] = None) -> dict[str, str]:
+        """Build the HTTP headers for a request.
+
+        :param additional_headers: Additional headers for this request.
+        """
+        headers = {
+            "user-agent": "unzer-python-sdk %s" % __version__,
+            "content-type": "application/json; charset=UTF-8",
+            "accept": "application/json",
+            "accept-language": self.language,  # language for translation of customerMessage in errors
+        }
+        if additional_headers:
+            headers |= additional_headers
+        return headers
+
+    def _flightKey(self, url: str, headers: dict[str, str]) -> tuple:
+        """The key of identical GET requests, see :attr:`coalesceGets`.
+
+        Only calls with the same retry policy (and thus the same deadline) and rate limit class
+        are coalesced, a caller must not wait through the retries of a more patient one.
+        """
+        return (
+            url,
+            self.private_key,
+            tuple(sorted(headers.items())),
+            self.currentRetryPolicy,
+            self._rateLimitOverride.get(),
+        )
+
+    def _cachedResponse(self, operation: str) -> tuple[t.Any, int | None]:
+        """Look up a GET request in the :attr:`responseCache`.
+
+        :return: The cached response (None on a miss) and the generation to store
+            the response with (None, if the operation isn't cached).
+        """
+        if self.responseCache is None or not self.responseCache.cacheable(operation):
+            return None, None
+        generation = self.responseCache.generation(self.private_key, operation)
+        data = self.responseCache.get(self.private_key, operation)
+        if self.metrics is not None:
+            self.metrics.increment(
+                "unzer_cache_requests_total",
+                operation=operationLabel("GET", operation),
+                result="miss" if data is None else "hit",
+            )
+        return data, generation
+
+    def _storeResponse(self, operation: str, data: t.Any, generation: int | None) -> None:
+        if generation is not None:
+            self.responseCache.set(self.private_key, operation, data, generation)
+
+    def _invalidateResponses(self, operation: str) -> None:
+        """Drop the cached responses of the resource written by a request."""
+        if self.responseCache is not None:
+            self.responseCache.invalidate(self.private_key, operation)
+
+    @property
+    def _auth(self) -> tuple[str, str]:
+        """The basic authentication for the requests."""
+        return self.private_key, ""
+
+    def _buildTransportRequest(self, url: str, method: str,
+                               headers: dict[str, str], payload: t.Any,
+                               auth: tuple[str, str]) -> TransportRequest:
+        """Build the request for the transport.
+
+        The payload is encoded once, the body is reused for all attempts.
+        """
+        return TransportRequest(
+            method,
+            url,
+            headers,
+            self.codec.encode(payload) if payload is not None else None,
+            auth=auth,
+            timeout=self.timeout,
+        )
+
+    def _buildErrorResponse(self, r: TransportResponse, message: str = "Unzer Error") -> ErrorResponse:
+        """Build an :exc:`ErrorResponse` from a response.
+
+        :param r: The HTTP response.
+        :param message: The message of the exception.
+        :raises ValueError: If the response body is not a valid error object.
+        """
+        errorResponse = ErrorResponse.fromDict(self.codec.decode(r.content), message)
+        errorResponse.statusCode = r.status_code
+        errorResponse.srcResponse = r
+        return errorResponse
+
+    def _decode(self, content: bytes) -> t.Any:
+        """Decode a response body, the time is added to the profile of the call."""
+        if (profile := currentProfile.get()) is None:
+            return self.codec.decode(content)
+        with profile.measure("decode"):
+            return self.codec.decode(content)
+
+    def _startProfile(self, event: RequestEvent) -> tuple[CallProfile, contextvars.Token] | None:
+        """Start the profile of a call, if profiling is enabled.
+
+        :return: The profile and the token to reset :data:`currentProfile` with.
+        """
+        if self.profiler is None:
+            return None
+        profile = self.profiler.start(event.label)
+        return profile, currentProfile.set(profile)
+
+    def _finishProfile(self, started: tuple[CallProfile, contextvars.Token],
+                       event: RequestEvent, data: t.Any) -> None:
+        """Rank the profile of a finished call.
+
+        :param started: The result of :meth:`_startProfile`.
+        :param data: The decoded response of a successful call.
+        """
+        profile, token = started
+        currentProfile.reset(token)
+        profile.finish()
+        profile.attempts = event.attempt
+        if event.response is not None:
+            profile.statusCode = event.response.status_code
+        if isinstance(data, dict):
+            profile.traceId = (
+                data.get("traceId")
+                or (data.get("processing") or {}).get("traceId")
+                or (data.get("resources") or {}).get("traceId")
+            )
+            modelProfile.set((profile, data))
+        elif isinstance(event.exception, ErrorResponse):
+            profile.traceId = event.exception.traceId
+        self.profiler.submit(profile)
+
+    def _buildResponseModel(self, fromDict: t.Callable[..., T], data: t.Any, *args: t.Any) -> T:
+        """Build the model of a response.
+
+        The time is added to the profile of the call, which returned *data*,
+        but not to previous calls (e.g. on cache hits or coalesced requests).
+        """
+        if self.profiler is None or (pending := modelProfile.get()) is None:
+            return fromDict(data, *args)
+        profile, profiledData = pending
+        if profiledData is not data:
+            return fromDict(data, *args)
+        modelProfile.set(None)
+        started = time.perf_counter()
+        model = fromDict(data, *args)
+        elapsed = time.perf_counter() - started
+        profile.add("model", elapsed)
+        profile.total += elapsed
+        return model
+
+    def _handleResponse(self, r: TransportResponse, operation: str, sampled: bool = False) -> t.Any:
+        """Evaluate the response of one attempt and report it to the circuit breaker.
+
+        A successful response with a body, which can't be decoded (e.g. truncated),
+        counts as failed attempt and is retried.
+
+        :param operation: The operation of the request, see :meth:`_operationOf`.
+        :param sampled: Log the response body, see :meth:`Instrumentation.samplePayload`.
+        :return: The decoded body on success, :data:`RETRY` if the request should be retried.
+        :raises: :exc:`ErrorResponse` in case of an client error.
+        """
+        if 200 <= r.status_code <= 201:
+            try:
+                data = self._decode(r.content)
+            except ValueError:
+                logger.exception("Failed to decode the response body")
+                self._recordCircuit(operation, None)
+                self.instrumentation.response(r, None, sampled)
+                return RETRY
+            self._recordCircuit(operation, r)
+            self.instrumentation.response(r, data, sampled)
+            return data
+        self._recordCircuit(operation, r)
+        self.instrumentation.response(r, None, sampled)
+        if r.status_code in self.currentRetryPolicy.retry_statuses:
+            return RETRY
+        raise self._buildErrorResponse(r)
+
+    def _checkCircuit(self, operation: str) -> None:
+        """Fail fast, if the circuit of an operation is open, see :meth:`CircuitBreaker.check`."""
+        if self.circuitBreaker is not None:
+            self.circuitBreaker.check(self.circuitBreaker.familyOf(operation))
+
+    def _acquireCircuit(self, operation: str, method: str) -> None:
+        """Check the circuit breaker before an attempt.
+
+        The tokens of the :attr:`rateLimiter` taken for the attempt are put back, if the circuit is open.
+
+        :raises: :exc:`CircuitOpenError` if the operation family is open.
+        """
+        if self.circuitBreaker is None:
+            return
+        try:
+            self.circuitBreaker.acquire(self.circuitBreaker.familyOf(operation))
+        except CircuitOpenError:
+            if self.rateLimiter is not None:
+                self.rateLimiter.release(self.private_key, self._rateLimitClass(method, operation)[0])
+            raise
+
+    def _recordCircuit(self, operation: str, r: TransportResponse | None) -> None:
+        """Report the result of an attempt to the circuit breaker.
+
+        :param r: The response of the attempt, None in case of a network error
+            or an invalid response.
+        """
+        if self.circuitBreaker is not None:
+            self.circuitBreaker.record(
+                self.circuitBreaker.familyOf(operation),
+                r is not None and r.status_code not in self.currentRetryPolicy.retry_statuses,
+            )
+
+    def _isRetryableError(self, exc: TransportError) -> bool:
+        """Decide, whether a network error of one attempt can be retried."""
+        if isinstance(exc, TransportTimeout):
+            logger.exception("Caught TimeoutError")
+            return True
+        if isinstance(exc, TransportConnectionError) and self.currentRetryPolicy.retry_connection_errors:
+            logger.exception("Caught ConnectionError")
+            return True
+        return False
+
+    def _raiseAllAttemptsFailed(self, r: TransportResponse | None) -> t.NoReturn:
+        """Raise the :exc:`ErrorResponse` after the last attempt failed.
+
+        :param r: The response of the last attempt, if any.
+        """
+        logger.error("All request attempts failed")
+        if r is not None:
+            try:
+                errorResponse = self._buildErrorResponse(r, "All request attempts failed")
+            except (ValueError, KeyError):
+                logger.exception("Failed to build an ErrorResponse from last request")
+            else:
+                raise errorResponse
+        raise ErrorResponse("All request attempts failed", srcResponse=r)
+
+    def _shouldReadBack(self, readBack: bool | None) -> bool:
+        """Resolve the per call readBack argument with the client default."""
+        return self.readBack if readBack is None else readBack
+
+    @staticmethod
+    def _buildLocalModel(model: BaseModel, key: str) -> BaseModel:
+        """Build the result of a write locally instead of fetching it again.
+
+        :param model: The submitted model (will not be modified).
+        :param key: The id returned by the API.
+        """
+        # don't copy the client, it's shared
+        result = copy.deepcopy(model, {id(model._client): model._client})
+        result.key = key
+        return result
+
+    @staticmethod
+    def _paymentTypeOperation(paymentType: PaymentType) -> str:
+        """Get the operation to create a payment type, e.g. ``types/card``."""
+        if isinstance(paymentType.method_name, PaymentMethodTypes):
+            return "types/%s" % paymentType.method_name.value
+        return "types/%s" % paymentType.method.value
+
+    def _rememberCustomer(self, customer: Customer) -> Customer:
+        """Remember the key of a customer with a customerId for the upsert."""
+        if customer.customerId and customer.key:
+            self.customerKeyCache.set(customer.customerId, customer.key)
+        return customer
+
+    def _forgetCustomer(self, codeOrExternalId: str) -> None:
+        """Forget a customer by its customerId or key."""
+        self.customerKeyCache.deleteWhere(lambda customerId, key: codeOrExternalId in (customerId, key))
+
+    def _knownCustomer(self, customer: Customer) -> Customer | None:
+        """Get a copy of the customer with the cached key,
+        if the customer is already known to exist at Unzer.
+        """
+        if customer.key:
+            return customer
+        if customer.customerId and (key := self.customerKeyCache.get(customer.customerId)):
+            customer = copy.copy(customer)
+            customer.key = key
+            return customer
+        return None
+
+    @staticmethod
+    def _isCustomerExistsError(er: ErrorResponse) -> bool:
+        return bool(er.errors) and er.statusCode == 400 and er.errors[0].code == "API.410.200.010"
+
+    CHECKOUT_STEPS = ("customer", "basket", "paymentType")
+
+    def _checkoutPlan(self, payment: PaymentRequest, customer: Customer,
+                      basket: Basket) -> dict[str, t.Callable[[], t.Any]]:
+        """Get the independent creations of a checkout by step.
+
+        Resources with a key are used as they are. Resources are created without reading
+        them back, only their keys are needed.
+        """
+        if not isinstance(payment, PaymentRequest):
+            raise TypeError("Expected a PaymentRequest object. Got %r" % type(payment))
+        if not payment.paymentType:
+            raise ValueError("No paymentType set")
+        plan = {}
+        if customer is not None and not customer.key:
+            if customer.customerId:
+                plan["customer"] = functools.partial(self.createOrUpdateCustomer, customer, readBack=False)
+            else:
+                plan["customer"] = functools.partial(self.createCustomer, customer, readBack=False)
+        if basket is not None and not basket.key:
+            plan["basket"] = functools.partial(self.createBasket, basket, readBack=False)
+        if not payment.paymentType.key:
+            plan["paymentType"] = functools.partial(self.createPaymentType, payment.paymentType)
+        return plan
+
+    @staticmethod
+    def _checkoutTransaction(action: Action) -> str:
+        if action not in {Action.CHARGE, Action.AUTHORIZE}:
+            raise ValueError("Invalid action %r" % action)
+        return "authorize" if action == Action.AUTHORIZE else "charges"
+
+    @staticmethod
+    def _checkoutCustomerType(customer: Customer) -> str | None:
+        # a customer given by key may have a company, which isn't known locally
+        return customer.customerType if customer is not None and not customer.key else None
+
+    @staticmethod
+    def _checkoutPayment(payment: PaymentRequest, resources: dict[str, t.Any]) -> PaymentRequest:
+        """Get a copy of the payment request with the ids of the resources."""
+        payment = copy.copy(payment)
+        if (customer := resources["customer"]) is not None:
+            payment.customerId = customer.key
+        if (basket := resources["basket"]) is not None:
+            payment.basketId = basket.key
+        payment.paymentType = resources["paymentType"]
+        return payment
+
+    @staticmethod
+    def _isRejected(exc: BaseException) -> bool:
+        """Decide, whether the API definitely refused a transaction.
+
+        Client errors (4xx) and declined transactions (a successful response with
+        ``isError``, see :meth:`UnzerClient._authorize_or_charge`) are definite. After timeouts,
+        server errors and exhausted retries the transaction may have been processed.
+        """
+        if not isinstance(exc, ErrorResponse) or isinstance(exc, (CircuitOpenError, RateLimitExceeded)):
+            return False
+        statusCode = exc.statusCode or 0
+        return 400 <= statusCode < 500 or bool(exc.isError) and statusCode < 300
+
+    def _checkoutRollback(self, plan: dict[str, t.Callable[[], t.Any]], resources: dict[str, t.Any],
+                          failures: dict[str, BaseException]) -> list[str]:
+        """Get the keys of the customers to delete after a failed checkout.
+
+        Only customers without a customerId were created for sure, the others may have existed before.
+        Baskets and payment types can't be deleted. Nothing is deleted, if the transaction
+        may have been processed, the payment would lose its customer.
+        """
+        if "transaction" in failures and not self._isRejected(failures["transaction"]):
+            return []
+        customer = resources["customer"]
+        if "customer" in plan and customer is not None and not customer.customerId:
+            return [customer.key]
+        return []
+
+    def _checkoutFailure(self, failures: dict[str, BaseException], resources: dict[str, t.Any],
+                         rolledBack: list[str]) -> CheckoutError:
+        step, exc = next(iter(failures.items()))
+        kwargs = {}
+        if isinstance(exc, ErrorResponse):
+            kwargs = dict(timestamp=exc.timestamp, url=exc.url, errors=exc.errors, errorId=exc.errorId,
+                          statusCode=exc.statusCode, traceId=exc.traceId, srcResponse=exc.srcResponse)
+        if resources["customer"] is not None and resources["customer"].key in rolledBack:
+            resources["customer"] = None
+        transactionOutcome = None
+        if "transaction" in failures:
+            transactionOutcome = "rejected" if self._isRejected(failures["transaction"]) else "unknown"
+        return CheckoutError(
+            "Checkout failed at %s%s: %s" % (
+                step, " (transaction outcome unknown)" if transactionOutcome == "unknown" else "", exc),
+            step=step,
+            failures=failures,
+            rolledBack=rolledBack,
+            transactionOutcome=transactionOutcome,
+            **resources,
+            **kwargs,
+        )
+
+    @staticmethod
+    def _reportBulkError(codeOrId: str, exc: Exception,
+                         on_error: t.Callable[[str, Exception], None] | None) -> None:
+        """Report the failure of one item of a bulk operation."""
+        if on_error is None:
+            logger.error("Failed to fetch %r: %r", codeOrId, exc)
+        else:
+            on_error(codeOrId, exc)
+
+    def _loadWebhookResponse(self, data):
+        """Helper method load webhook responses.
+
+        :param data: The data from the request.
+        :type data: dict
+        :return: A list of Webhooks
+        :rtype: list[Webhook]
+        """
+        if "events" not in data:
+            webhooks = [data]  # got exactly one webhook, data is the webhook itself
+        else:
+            webhooks = data["events"]  # list of webhooks wrapped in events property
+        return map(Webhook.fromDict, webhooks)
+
+
+class UnzerClient(BaseUnzerClient):
+
+    def __init__(
+            self,
+            private_key: str,
+            public_key: str,
+            sandbox: bool = False,
+            language: str = "en",
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            transport: Transport = None,
+            **kwargs
+    ):
+        """Create a new client.
+
+        By default, the client uses a :class:`RequestsTransport` with a pooled
+        keep-alive session, so subsequent requests reuse already established connections.
+        Call :meth:`close` (or use the client as context manager)
+        to release the connections.
+
+        :param private_key: The private key of the keypair.
+        :param public_key: The public key of the keypair.
+        :param sandbox: Use the sandbox environment.
+        :param language: Language for translation of customerMessage in errors.
+        :param pool_connections: Number of connection pools (one per host) to cache.
+        :param pool_maxsize: Maximum number of connections to keep per host.
+        :param transport: (optional) The transport to perform the requests.
+            The pool parameters are ignored, if a transport is provided.
+
+        See :class:`BaseUnzerClient` for further parameters.
+        """
+        super().__init__(private_key, public_key, sandbox, language, **kwargs)
+        if transport is None:
+            transport = RequestsTransport(pool_connections, pool_maxsize)
+        self.transport = transport
+
+    def close(self) -> None:
+        """Close the transport and release all pooled connections."""
+        self.transport.close()
+
+    def __enter__(self) -> t.Self:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     def request(
             self,
@@ -54,33 +716,38 @@ class UnzerClient:
             Send json-encoded as body.
         :param additional_headers: Additional headers for this request.
         :return: The json-decoded response from the api.
+            With :attr:`coalesceGets`, concurrent identical GET requests get the same object,
+            don't modify it.
         """
-        url = "%s/%s" % (self.endpoint, operation)
-        headers = {
-            "user-agent": "unzer-python-sdk %s" % __version__,
-            "content-type": "application/json; charset=UTF-8",
-            "accept": "application/json",
-            "accept-language": self.language,  # language for translation of customerMessage in errors
-        }
-        if additional_headers:
-            headers |= additional_headers
-        return self._request(
-            url,
-            method,
-            headers,
-            payload,
-            auth=(self.private_key, "")
-        )
+        url = self._buildUrl(operation)
+        headers = self._buildHeaders(additional_headers)
+        if method != "GET":
+            try:
+                return self._request(url, method, headers, payload, auth=self._auth)
+            finally:
+                self._invalidateResponses(operation)
+        data, generation = self._cachedResponse(operation)
+        if data is not None:
+            return data
+        if self.coalesceGets:
+            data = self._singleFlight.do(
+                self._flightKey(url, headers),
+                lambda: self._request(url, method, headers, payload, auth=self._auth),
+            )
+        else:
+            data = self._request(url, method, headers, payload, auth=self._auth)
+        self._storeResponse(operation, data, generation)
+        return data
 
     def _request(self, url: str, method: str,
-                 headers: list[tuple] | dict[str, str], payload: t.Any,
+                 headers: dict[str, str], payload: t.Any,
                  auth: tuple[str, str]) -> t.Any:
         """Helper method to perform the request with throttling.
 
         :param url: The complete URL.
         :param method: The HTTP method (e.g. POST, GET).
         :param headers: The HTTP headers.
-        :type headers: list[tuple] | dict[str, str]
+        :type headers: dict[str, str]
         :param payload: The HTTP payload (will be json encoded).
         :param auth: The authentication for this request.
         :return: The json decoded response
@@ -88,52 +755,55 @@ class UnzerClient:
         :raises: :exc:`ErrorResponse` in case of an client error
             or after last retry failed.
         """
-        r = None
-        for idx, delay in enumerate((0,) + self.retryDelays):
-            logger.debug("Perform try no. %d (delay: %d)", idx, delay)
-            time.sleep(delay)
-            logger.debug("%s %s", method, url)
-            logger.debug("payload: %r", payload)
-            logger.debug("headers: %r", headers)
-            try:
-                r = requests.request(
-                    method,
-                    url,
-                    json=payload,
-                    headers=headers,
-                    auth=auth,
-                    verify=True,
-                    timeout=self.timeout,
-                )
-            except (TimeoutError, requests.exceptions.ReadTimeout):
-                logger.exception("Caught TimeoutError")
-                continue
-            if 200 <= r.status_code <= 201:
-                logger.debug("Response[%s %s]: %r", r.status_code, r.reason, r.json())
-                return r.json()
-            elif 500 <= r.status_code < 600:
-                logger.debug("Server error")
-                logger.debug("Response[%s %s]: %r", r.status_code, r.reason, r.text)
-                continue
-            else:
-                logger.debug("Client error")
-                logger.debug("Response[%s %s]: %r", r.status_code, r.reason, r.text)
-                errorResponse = ErrorResponse.fromDict(r.json())
-                errorResponse.statusCode = r.status_code
-                errorResponse.srcResponse = r
-                raise errorResponse
-
-        logger.error("All request attempts failed")
-        if r is not None:
-            try:
-                errorResponse = ErrorResponse.fromDict(r.json(), "All request attempts failed")
-                errorResponse.statusCode = r.status_code
-                errorResponse.srcResponse = r
-            except ValueError:
-                logger.exception("Failed to build an ErrorResponse from last request")
-            else:
-                raise errorResponse
-        raise ErrorResponse("All request attempts failed", srcResponse=r)
+        request = self._buildTransportRequest(url, method, headers, payload, auth)
+        operation = self._operationOf(url)
+        retry = self.currentRetryPolicy.start()
+        sampled = self.instrumentation.samplePayload()
+        event = RequestEvent(self, method, url, operation, request)
+        profiling = self._startProfile(event)
+        r = data = None
+        try:
+            while True:
+                if not retry.canAttempt():
+                    break
+                # the rate limit first, a RateLimitExceeded must not take the half-open trial of the circuit,
+                # but don't wait for the budget of an open circuit
+                if self.rateLimiter is not None:
+                    self._checkCircuit(operation)
+                    self.rateLimiter.acquire(self.private_key, *self._rateLimitClass(method, operation))
+                self._acquireCircuit(operation, method)
+                request.timeout = retry.attemptTimeout(self.timeout)
+                event.startAttempt(retry.attempt)
+                self.hooks.emit("before_request", event)
+                self.instrumentation.attempt(request, retry.attempt, payload, sampled)
+                try:
+                    r = self.transport.send(request)
+                except TransportError as exc:
+                    self._recordCircuit(operation, None)
+                    if not self._isRetryableError(exc):
+                        raise
+                    event.exception = exc
+                    delay = retry.nextDelay()
+                else:
+                    event.response = r
+                    self.hooks.emit("after_response", event)
+                    if (data := self._handleResponse(r, operation, sampled)) is not RETRY:
+                        return data
+                    delay = retry.nextDelay(r)
+                if delay is None:
+                    break
+                event.delay = delay
+                self.hooks.emit("retry", event)
+                self.instrumentation.retry(delay)
+                time.sleep(delay)
+            return self._raiseAllAttemptsFailed(r)
+        except Exception as exc:
+            event.exception = exc
+            self.hooks.emit("error", event)
+            raise
+        finally:
+            if profiling is not None:
+                self._finishProfile(profiling, event, data)
 
     def getKeyPair(self) -> dict:
         """Provides the public key of the used private key as well as a list of the payment types available for the merchant.
@@ -166,6 +836,17 @@ class UnzerClient:
             "GET",
         )
 
+    def getKeyPairConfiguration(self, refresh: bool = False) -> KeyPairTypes:
+        """Get the payment method configuration of the keypair.
+
+        The configuration is cached, see the *keypair_ttl* and *keypair_stale_ttl*
+        parameters of the client and :meth:`invalidateKeyPairConfiguration`.
+
+        :param refresh: Fetch the configuration, even if the cached one is fresh.
+        :return: The (cached) KeyPairTypes
+        """
+        return self._keyPairTypes.get(lambda: KeyPairTypes.fromDict(self.getKeyPairTypes()), refresh)
+
     def getError(self, errorId: str) -> dict:
         """Get information about an error
 
@@ -178,11 +859,14 @@ class UnzerClient:
             "GET",
         )
 
-    def createCustomer(self, customer):
+    def createCustomer(self, customer, readBack=None):
         """Creating a customer
 
         :param customer: Customer object
         :type customer: Customer
+        :param readBack: (optional) Fetch the customer after the write again,
+            defaults to the *read_back* setting of the client.
+        :type readBack: bool
         :return: The created customer object
         :rtype: Customer
         """
@@ -197,14 +881,19 @@ class UnzerClient:
             customer.serialize(),
         )
         # API docs wrong: we get only a dict with the id back
+        if not self._shouldReadBack(readBack):
+            return self._rememberCustomer(self._buildLocalModel(customer, data["id"]))
         return self.getCustomer(data["id"])
 
-    def updateCustomer(self, customer):
+    def updateCustomer(self, customer, readBack=None):
         """Update a customer using unique customerId or the resource id from the customers resource.
         The customer MUST have customerId oder key (id)
 
         :param customer: Customer object
         :type customer: Customer
+        :param readBack: (optional) Fetch the customer after the write again,
+            defaults to the *read_back* setting of the client.
+        :type readBack: bool
         :return: The updated customer object
         :rtype: Customer
         """
@@ -218,14 +907,40 @@ class UnzerClient:
             customer.serialize(),
         )
         # API docs wrong: we get only a dict with the id back
+        if not self._shouldReadBack(readBack):
+            return self._rememberCustomer(self._buildLocalModel(customer, data["id"]))
         return self.getCustomer(data["id"])
 
-    def createOrUpdateCustomer(self, customer):
+    def createOrUpdateCustomer(self, customer, readBack=None):
+        """Create a customer or update it, if it already exists.
+
+        Customers with a key (id) or a customerId known from the :attr:`customerKeyCache`
+        are updated directly. Otherwise, the customer is created and updated,
+        if Unzer reports that the customerId already exists.
+
+        :param customer: Customer object
+        :type customer: Customer
+        :param readBack: (optional) Fetch the customer after the write again,
+            defaults to the *read_back* setting of the client.
+        :type readBack: bool
+        :return: The created or updated customer object
+        :rtype: Customer
+        """
+        if not isinstance(customer, Customer):
+            raise TypeError("Expected a Customer object. Got %r" % type(customer))
+        if (known := self._knownCustomer(customer)) is not None:
+            try:
+                return self.updateCustomer(known, readBack)
+            except ErrorResponse as er:
+                if customer.key or er.statusCode not in (400, 404):
+                    raise er
+                # the cached key is outdated, the customer was deleted
+                self._forgetCustomer(customer.customerId)
         try:
-            return self.createCustomer(customer)
+            return self.createCustomer(customer, readBack)
         except ErrorResponse as er:
-            if er.errors and er.statusCode == 400 and er.errors[0].code == "API.410.200.010":
-                return self.updateCustomer(customer)
+            if self._isCustomerExistsError(er):
+                return self.updateCustomer(customer, readBack)
             raise er
 
     def deleteCustomer(self, customer):
@@ -249,6 +964,7 @@ class UnzerClient:
             "customers/%s" % codeOrExternalId,
             "DELETE",
         )
+        self._forgetCustomer(codeOrExternalId)
         return data["id"]
 
     def getCustomer(self, codeOrExternalId):
@@ -263,13 +979,16 @@ class UnzerClient:
             "customers/%s" % codeOrExternalId,
             "GET",
         )
-        return Customer.fromDict(data)
+        return self._rememberCustomer(self._buildResponseModel(Customer.fromDict, data))
 
-    def createBasket(self, basket):
+    def createBasket(self, basket, readBack=None):
         """Creating a basket
 
         :param basket: Basket object
         :type basket: Basket
+        :param readBack: (optional) Fetch the basket after the write again,
+            defaults to the *read_back* setting of the client.
+        :type readBack: bool
         :return: The created Basket object
         :rtype: Basket
         """
@@ -280,14 +999,19 @@ class UnzerClient:
             "POST",
             basket.serialize(),
         )
+        if not self._shouldReadBack(readBack):
+            return self._buildLocalModel(basket, data["id"])
         return self.getBasket(data["id"])
 
-    def updateBasket(self, basket):
+    def updateBasket(self, basket, readBack=None):
         """Update a basket.
         The basket MUST have key (id)
 
         :param basket: Basket object
         :type basket: Basket
+        :param readBack: (optional) Fetch the basket after the write again,
+            defaults to the *read_back* setting of the client.
+        :type readBack: bool
         :return: The updated basket object
         :rtype: Basket
         """
@@ -300,6 +1024,8 @@ class UnzerClient:
             "PUT",
             basket.serialize(),
         )
+        if not self._shouldReadBack(readBack):
+            return self._buildLocalModel(basket, data["id"])
         return self.getBasket(data["id"])
 
     def getBasket(self, basketId):
@@ -314,7 +1040,7 @@ class UnzerClient:
             "baskets/%s" % basketId,
             "GET",
         )
-        return Basket.fromDict(data)
+        return self._buildResponseModel(Basket.fromDict, data)
 
     def createPaymentType(self, paymentType):
         """Create a new PaymentType at Unzer.
@@ -330,29 +1056,40 @@ class UnzerClient:
             raise TypeError("Expected a PaymentType object. Got %r" % type(paymentType))
         paymentType.validateBeforeRequest()
         data = self.request(
-            "types/%s" % paymentType.method,
+            self._paymentTypeOperation(paymentType),
             "POST",
             paymentType.serialize(),
         )
-        return type(paymentType).fromDict(data)
+        return self._buildResponseModel(type(paymentType).fromDict, data)
 
-    def createPaymentPage(self, paymentPage):
+    def createPaymentPage(self, paymentPage, customer=None):
         """The initialize payment page call with direct charge purpose.
 
         :param paymentPage: The PaymentPage model
         :type paymentPage: PaymentPage
+        :param customer: (optional) The created customer of the payment page. Its key is used as
+            customerId, if none is set, and the preflight validates its customer type (B2B or B2C).
+        :type customer: Customer
         :return: The PaymentPageResponse
         :rtype: PaymentPageResponse
         """
         if not isinstance(paymentPage, PaymentPage) or isinstance(paymentPage, PaymentPageResponse):
             raise TypeError("Expected a PaymentPage object. Got %r" % type(paymentPage))
-        paymentPage.validateBeforeRequest()
+        if self.preflight:
+            paymentPage.validateBeforeRequest(
+                self.getKeyPairConfiguration(),
+                customer.customerType if customer is not None else None,
+            )
+        else:
+            paymentPage.validateBeforeRequest()
+        if customer is not None and customer.key and not paymentPage.customerId:
+            paymentPage.customerId = customer.key
         data = self.request(
-            "paypage/%s" % paymentPage.action,
+            "paypage/%s" % paymentPage.action.value,
             "POST",
             paymentPage.serialize(),
         )
-        return PaymentPageResponse.fromDict(data)
+        return self._buildResponseModel(PaymentPageResponse.fromDict, data)
 
     def getPaymentPage(self, payPageId):
         """Fetch the payment resource. Provides an overview about a payment.
@@ -368,7 +1105,7 @@ class UnzerClient:
             "paypage/%s" % payPageId,
             "GET",
         )
-        return PaymentPageResponse.fromDict(data)
+        return self._buildResponseModel(PaymentPageResponse.fromDict, data)
 
     def getPayment(self, codeOrOrderId):
         """Fetch the payment resource. Provides an overview about a payment.
@@ -384,7 +1121,54 @@ class UnzerClient:
             "payments/%s" % codeOrOrderId,
             "GET",
         )
-        return PaymentGetResponse.fromDict(data, self)
+        return self._buildResponseModel(PaymentGetResponse.fromDict, data, self)
+
+    def getPayments(
+            self,
+            codeOrOrderIds: t.Iterable[str],
+            concurrency: int = 8,
+            on_error: t.Callable[[str, Exception], None] = None,
+            rate_limit: float = None,
+    ) -> t.Iterator[PaymentGetResponse]:
+        """Fetch many payment resources in parallel.
+
+        The payments are yielded as they complete, not in the order of the ids.
+        A failed payment does not abort the batch, it is reported to *on_error*.
+
+        :param codeOrOrderIds: The ids of the payments (can be a lazy iterable).
+        :param concurrency: Maximum number of parallel requests.
+        :param on_error: (optional) Called with the id and the exception of a failed payment.
+            By default, the failure is logged.
+        :param rate_limit: (optional) Maximum number of requests per second for this batch.
+        :return: The fetched payment resources
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        bucket = TokenBucket(rate_limit, burst=1) if rate_limit else None
+        codeOrOrderIds = iter(codeOrOrderIds)
+        with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+            pending: dict[concurrent.futures.Future, str] = {}
+            try:
+                while True:
+                    for codeOrOrderId in itertools.islice(codeOrOrderIds, concurrency - len(pending)):
+                        if bucket is not None:
+                            bucket.acquire()
+                        future = executor.submit(contextvars.copy_context().run, self.getPayment, codeOrOrderId)
+                        pending[future] = codeOrOrderId
+                    if not pending:
+                        break
+                    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        codeOrOrderId = pending.pop(future)
+                        try:
+                            payment = future.result()
+                        except Exception as exc:
+                            self._reportBulkError(codeOrOrderId, exc, on_error)
+                        else:
+                            yield payment
+            finally:
+                for future in pending:
+                    future.cancel()
 
     def authorize(self, payment, **kwargs) -> PaymentResponse:
         """Authorize call for redirect payments.
@@ -394,6 +1178,9 @@ class UnzerClient:
 
         :param payment: The PaymentRequest model
         :type payment: PaymentRequest
+        :param customer: (optional) The created customer of the payment. Its key is used as
+            customerId, if none is set, and the preflight validates its customer type (B2B or B2C).
+        :type customer: Customer
         :return: The paymentType response
         :rtype: PaymentResponse
         """
@@ -407,18 +1194,90 @@ class UnzerClient:
 
         :param payment: The PaymentRequest model
         :type payment: PaymentRequest
+        :param customer: (optional) The created customer of the payment. Its key is used as
+            customerId, if none is set, and the preflight validates its customer type (B2B or B2C).
+        :type customer: Customer
         :return: The paymentType response
         :rtype: PaymentResponse
         """
         return self._authorize_or_charge("charges", payment, **kwargs)
 
+    def checkout(
+            self,
+            payment: PaymentRequest,
+            customer: Customer = None,
+            basket: Basket = None,
+            action: Action = Action.CHARGE,
+            rollback: bool = True,
+            headers: dict[str, str] = None,
+    ) -> PaymentResponse:
+        """Create the resources of a payment concurrently, then authorize or charge it.
+
+        The customer, the basket and the payment type are created in parallel (resources
+        with a key are used as they are), without reading them back. Their ids are set on
+        a copy of *payment*, which is then authorized or charged. Compared to calling
+        the create methods and :meth:`charge` one after another, this saves up to four
+        sequential round trips.
+
+        If a step fails, :exc:`CheckoutError` is raised with all failures and the
+        resources created so far, which can be passed to another checkout.
+        If the outcome of the transaction is unknown (e.g. it timed out), nothing is rolled
+        back and :attr:`CheckoutError.transactionOutcome` is ``unknown``.
+
+        :param payment: The PaymentRequest model, customerId, basketId and the
+            paymentType are taken from the created resources.
+        :param customer: (optional) The customer, created or updated (if it has a customerId).
+        :param basket: (optional) The basket.
+        :param action: Charge (default) or authorize the payment.
+        :param rollback: Delete the created customer, if the checkout fails and
+            the transaction (if attempted) was refused by the API (4xx).
+            Only customers without customerId are deleted, the others might have existed before.
+        :param headers: (optional) Additional headers for the transaction.
+        :return: The transaction response
+        :raises ValueError: If the preflight validation (see *preflight* of the client) failed,
+            nothing was created then.
+        :raises CheckoutError: If a step failed.
+        """
+        type_ = self._checkoutTransaction(action)
+        plan = self._checkoutPlan(payment, customer, basket)
+        if self.preflight:
+            payment.validateBeforeRequest(self.getKeyPairConfiguration(), self._checkoutCustomerType(customer))
+        resources = {"customer": customer, "basket": basket, "paymentType": payment.paymentType}
+        failures = {}
+        with concurrent.futures.ThreadPoolExecutor(max(1, len(plan))) as executor:
+            futures = {step: executor.submit(contextvars.copy_context().run, fn) for step, fn in plan.items()}
+        for step, future in futures.items():
+            if (exc := future.exception()) is not None:
+                failures[step] = exc
+                resources[step] = None
+            else:
+                resources[step] = future.result()
+        if not failures:
+            try:
+                return self._authorize_or_charge(type_, self._checkoutPayment(payment, resources), headers)
+            except Exception as exc:
+                failures["transaction"] = exc
+        rolledBack = []
+        for key in self._checkoutRollback(plan, resources, failures) if rollback else ():
+            try:
+                self.deleteCustomer(key)
+            except Exception:
+                logger.exception("Failed to roll back the customer %s of a failed checkout", key)
+            else:
+                rolledBack.append(key)
+        raise self._checkoutFailure(failures, resources, rolledBack) from next(iter(failures.values()))
+
     def _authorize_or_charge(
             self,
             type_: str,
             payment: PaymentRequest,
             headers: dict[str, str] = None,
+            customer: Customer = None,
     ) -> PaymentResponse:
         """Internal helper for authorize and charge calls
+
+        :param customer: (optional) The customer of the payment, its key is used as customerId
+            (if none is set) and its customerType is validated by the preflight.
         """
         if type_ not in {"authorize", "charges"}:
             raise ValueError("Invalid type %r" % type_)
@@ -426,9 +1285,17 @@ class UnzerClient:
             raise TypeError("Expected a PaymentRequest object. Got %r" % type(PaymentRequest))
         if not payment.paymentType:
             raise ValueError("No paymentType set")
+        if self.preflight:
+            payment.validateBeforeRequest(
+                self.getKeyPairConfiguration(),
+                customer.customerType if customer is not None else None,
+            )
+        else:
+            payment.validateBeforeRequest()
+        if customer is not None and customer.key and not payment.customerId:
+            payment.customerId = customer.key
         if not payment.paymentType.key:
             payment.paymentType = self.createPaymentType(payment.paymentType)
-        payment.validateBeforeRequest()
         data = self.request(
             "/".join(filter(None, ["payments", payment.paymentId, type_])),
             "POST",
@@ -437,7 +1304,7 @@ class UnzerClient:
         )
         if data.get("isError"):
             raise ErrorResponse.fromDict(data)
-        return PaymentResponse.fromDict(data, self)
+        return self._buildResponseModel(PaymentResponse.fromDict, data, self)
 
     def getChargedTransaction(self, codeOrOrderId, txnCode):
         """Fetch the corresponding charged transaction.
@@ -459,7 +1326,7 @@ class UnzerClient:
             "payments/%s/charges/%s" % (codeOrOrderId, txnCode or ""),
             "GET",
         )
-        return PaymentResponse.fromDict(data, self)
+        return self._buildResponseModel(PaymentResponse.fromDict, data, self)
 
     def listWebhooks(self):
         """Get all webhook resources.
@@ -485,7 +1352,7 @@ class UnzerClient:
             "webhooks/%s" % webhookId,
             "GET",
         )
-        return Webhook.fromDict(data)
+        return self._buildResponseModel(Webhook.fromDict, data)
 
     def createWebhook(self, webhook):
         """Create a new webhook.
@@ -527,21 +1394,7 @@ class UnzerClient:
             "PUT",
             {"url": webhook.url},
         )
-        return Webhook.fromDict(data)
-
-    def _loadWebhookResponse(self, data):
-        """Helper method load webhook responses.
-
-        :param data: The data from the request.
-        :type data: dict
-        :return: A list of Webhooks
-        :rtype: list[Webhook]
-        """
-        if "events" not in data:
-            webhooks = [data]  # got exactly one webhook, data is the webhook itself
-        else:
-            webhooks = data["events"]  # list of webhooks wrapped in events property
-        return map(Webhook.fromDict, webhooks)
+        return self._buildResponseModel(Webhook.fromDict, data)
 
     def deleteWebhook(self, webhookOrId):
         """Delete a specific webhook.
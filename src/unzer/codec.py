@@ -0,0 +1,52 @@
+import abc
+import json
+import typing as t
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONCodec(abc.ABC):
+    """Encode the request payloads and decode the response bodies."""
+
+    @abc.abstractmethod
+    def encode(self, data: t.Any) -> bytes:
+        """Encode data to a JSON document."""
+        pass
+
+    @abc.abstractmethod
+    def decode(self, content: bytes) -> t.Any:
+        """Decode a JSON document.
+
+        :raises ValueError: If the content is no valid JSON.
+        """
+        pass
+
+
+class StdlibJSONCodec(JSONCodec):
+    """Codec based on the :mod:`json` module of the standard library (default)."""
+
+    def encode(self, data: t.Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, content: bytes) -> t.Any:
+        return json.loads(content)
+
+
+class OrjsonCodec(JSONCodec):
+    def __init__(self):
+        """Codec based on the accelerated :mod:`orjson` library.
+
+        Requires the optional dependency ``orjson`` (``pip install unzer[orjson]``).
+        """
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires orjson. Install it with `pip install unzer[orjson]`.")
+        super().__init__()
+
+    def encode(self, data: t.Any) -> bytes:
+        return orjson.dumps(data)
+
+    def decode(self, content: bytes) -> t.Any:
+        return orjson.loads(content)
@@ -0,0 +1,156 @@
+import functools
+import logging
+import time
+import typing as t
+
+from .model.payment import PaymentMethodTypes
+
+if t.TYPE_CHECKING:
+    from .transport import TransportRequest, TransportResponse
+
+logger = logging.getLogger("unzer-sdk").getChild(__name__)
+
+HookEvent: t.TypeAlias = t.Literal["before_request", "after_response", "retry", "error"]
+
+HOOK_EVENTS: tuple[HookEvent, ...] = t.get_args(HookEvent)
+
+# literal segments of the operations, all other segments are ids
+RESOURCE_SEGMENTS = frozenset({
+    "authorize",
+    "baskets",
+    "cancels",
+    "charge",
+    "chargebacks",
+    "charges",
+    "customers",
+    "errors",
+    "keypair",
+    "payments",
+    "payouts",
+    "paypage",
+    "shipments",
+    "types",
+    "webhooks",
+})
+
+_PAYMENT_METHODS = frozenset(method.value for method in PaymentMethodTypes)
+
+
+def operationLabel(method: str, operation: str) -> str:
+    """Get a low-cardinality label of an operation, the ids are replaced by ``{id}``.
+
+    E.g. ``POST payments/s-pay-1/charges`` becomes ``POST payments/{id}/charges``,
+    ``POST types/card`` stays as it is.
+
+    :param method: The HTTP method.
+    :param operation: The URL path relative to the endpoint.
+    """
+    segments = []
+    for segment in filter(None, operation.split("/")):
+        if segment in RESOURCE_SEGMENTS or (segments[-1:] == ["types"] and segment in _PAYMENT_METHODS):
+            segments.append(segment)
+        else:
+            segments.append("{id}")
+    return "%s %s" % (method, "/".join(segments))
+
+
+class RequestEvent:
+    def __init__(self, client, method: str, url: str, operation: str, request: "TransportRequest"):
+        """The state of one call, passed to the hooks.
+
+        The same object is passed to all hooks of a call and updated per attempt.
+        Hooks may modify the :attr:`request` (e.g. add headers) in ``before_request``.
+        """
+        super().__init__()
+        self.client = client
+        self.method = method
+        self.url = url
+        self.operation = operation  # type: str
+        self.request = request  # type: TransportRequest
+        self.attempt = 0  # type: int
+        self.response = None  # type: TransportResponse | None
+        self.exception = None  # type: BaseException | None
+        self.delay = None  # type: float | None
+        self.started = time.perf_counter()
+        self.attemptStarted = self.started
+
+    @functools.cached_property
+    def label(self) -> str:
+        """The operation with replaced ids, see :func:`operationLabel`."""
+        return operationLabel(self.method, self.operation)
+
+    def startAttempt(self, attempt: int) -> None:
+        """Reset the per attempt state."""
+        self.attempt = attempt
+        self.response = None
+        self.exception = None
+        self.delay = None
+        self.attemptStarted = time.perf_counter()
+
+    @property
+    def attemptElapsed(self) -> float:
+        """Time in seconds since the current attempt started."""
+        return time.perf_counter() - self.attemptStarted
+
+    @property
+    def elapsed(self) -> float:
+        """Time in seconds since the call started, including all attempts and delays."""
+        return time.perf_counter() - self.started
+
+    def __repr__(self) -> str:
+        return "%s.%s(label=%r, attempt=%r)" % (
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.label,
+            self.attempt,
+        )
+
+
+Hook: t.TypeAlias = t.Callable[[RequestEvent], None]
+
+
+class Hooks:
+    """The lifecycle hooks of the requests of a client.
+
+    ``before_request``
+        Before each attempt is sent.
+    ``after_response``
+        After each attempt received a response, before it's evaluated.
+    ``retry``
+        Before the delay of a retry; :attr:`RequestEvent.delay` is set and either
+        :attr:`RequestEvent.response` or :attr:`RequestEvent.exception` is the failure.
+    ``error``
+        When the call fails finally; :attr:`RequestEvent.exception` is the raised exception.
+
+    Hooks are called synchronously, also by :class:`AsyncUnzerClient`, and should be fast.
+    Exceptions of hooks are logged and don't affect the request.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._hooks: dict[HookEvent, list[Hook]] = {event: [] for event in HOOK_EVENTS}
+
+    def add(self, event: HookEvent, hook: Hook) -> Hook:
+        """Register a hook for an event."""
+        if event not in self._hooks:
+            raise ValueError("Unknown hook event %r" % event)
+        self._hooks[event].append(hook)
+        return hook
+
+    def remove(self, event: HookEvent, hook: Hook) -> None:
+        """Unregister a hook, if it's registered."""
+        try:
+            self._hooks[event].remove(hook)
+        except (KeyError, ValueError):
+            pass
+
+    def __bool__(self) -> bool:
+        return any(self._hooks.values())
+
+    def emit(self, event: HookEvent, requestEvent: RequestEvent) -> None:
+        """Call the hooks of an event."""
+        for hook in self._hooks[event]:
+            try:
+                hook(requestEvent)
+            except Exception:
+                logger.exception("%s hook %r failed", event, hook)
@@ -0,0 +1,198 @@
+import json
+import logging
+import random
+import threading
+import time
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .transport import TransportRequest, TransportResponse
+
+logger = logging.getLogger("unzer-sdk").getChild(__name__)
+
+REDACTED = "***"
+
+SENSITIVE_HEADERS = frozenset({
+    "authorization",
+    "proxy-authorization",
+    "cookie",
+    "set-cookie",
+    "x-api-key",
+})
+
+SENSITIVE_KEYS = frozenset({
+    "privatekey",
+    "password",
+    "secret",
+    "token",
+    "number",
+    "cvc",
+    "cvv",
+    "expirydate",
+    "iban",
+    "bic",
+    "accountnumber",
+    "cardholder",
+    "holder",
+})
+
+PERSONAL_KEYS = frozenset({
+    "firstname",
+    "lastname",
+    "name",
+    "company",
+    "email",
+    "phone",
+    "mobile",
+    "birthdate",
+    "street",
+    "zip",
+    "city",
+})
+
+
+def redact(data: t.Any, keys: t.Collection[str] = SENSITIVE_KEYS) -> t.Any:
+    """Get a copy of JSON-like data with the values of sensitive keys replaced.
+
+    :param data: Dicts, lists and scalars as decoded from JSON.
+    :param keys: Lower-cased keys, whose values are replaced (at any depth).
+    """
+    if isinstance(data, dict):
+        return {
+            key: REDACTED if isinstance(key, str) and key.lower() in keys else redact(value, keys)
+            for key, value in data.items()
+        }
+    if isinstance(data, (list, tuple)):
+        return [redact(value, keys) for value in data]
+    return data
+
+
+def redactHeaders(headers: t.Mapping[str, str]) -> dict[str, str]:
+    """Get a copy of HTTP headers with the values of auth-bearing headers replaced."""
+    return {
+        key: REDACTED if key.lower() in SENSITIVE_HEADERS else value
+        for key, value in headers.items()
+    }
+
+
+class RateLimitedLog:
+    def __init__(self, interval: float = 60.0):
+        """Emit a message with the same key at most once per interval.
+
+        Suppressed messages are counted and reported with the next emitted one.
+
+        :param interval: Minimum time in seconds between two messages with the same key.
+        """
+        super().__init__()
+        self.interval = interval
+        self._last: dict[t.Hashable, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def log(self, logger_: logging.Logger, level: int, key: t.Hashable, msg: str, *args: t.Any) -> bool:
+        """Log *msg* unless a message with *key* was logged within the interval.
+
+        :return: True, if the message was emitted.
+        """
+        if not logger_.isEnabledFor(level):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last, suppressed = self._last.get(key, (None, 0))
+            if last is not None and now - last < self.interval:
+                self._last[key] = (last, suppressed + 1)
+                return False
+            self._last[key] = (now, 0)
+        if suppressed:
+            msg += " (%d similar messages suppressed)"
+            args += (suppressed,)
+        logger_.log(level, msg, *args)
+        return True
+
+    def warning(self, logger_: logging.Logger, key: t.Hashable, msg: str, *args: t.Any) -> bool:
+        """See :meth:`log`."""
+        return self.log(logger_, logging.WARNING, key, msg, *args)
+
+    def reset(self) -> None:
+        """Forget all keys, the next message of each key is emitted."""
+        with self._lock:
+            self._last.clear()
+
+
+rateLimitedLog = RateLimitedLog()
+
+
+class Instrumentation:
+    def __init__(
+            self,
+            logger_: logging.Logger = None,
+            payload_sample_rate: float = 1.0,
+            redact_keys: t.Collection[str] = SENSITIVE_KEYS,
+    ):
+        """Debug logging of the requests and responses of a client.
+
+        Nothing is formatted, decoded or redacted unless the logger is enabled for DEBUG.
+        Payloads and response bodies are redacted (see :func:`redact`) and logged
+        only for a sample of the calls; the request line, status and timing are logged always.
+        The records carry the structured fields in ``record.unzer``.
+
+        :param logger_: (optional) The logger, defaults to ``unzer-sdk.unzer.instrumentation``.
+        :param payload_sample_rate: Rate (0..1) of the calls, whose payloads are logged.
+        :param redact_keys: Lower-cased keys, whose values are never logged.
+        """
+        super().__init__()
+        self.logger = logger_ or logger
+        self.payload_sample_rate = payload_sample_rate
+        self.redact_keys = frozenset(key.lower() for key in redact_keys)
+
+    @property
+    def enabled(self) -> bool:
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def samplePayload(self) -> bool:
+        """Decide, whether the payloads of a call are logged. Call once per call."""
+        if not self.enabled or self.payload_sample_rate <= 0:
+            return False
+        return self.payload_sample_rate >= 1 or random.random() < self.payload_sample_rate
+
+    def _debug(self, msg: str, *args: t.Any, **fields: t.Any) -> None:
+        self.logger.debug(msg, *args, extra={"unzer": fields})
+
+    def attempt(self, request: "TransportRequest", attempt: int, payload: t.Any, sampled: bool) -> None:
+        """Log one attempt of a request."""
+        if not self.enabled:
+            return
+        self._debug(
+            "%s %s (try no. %d, timeout: %.2f)", request.method, request.url, attempt, request.timeout,
+            method=request.method, url=request.url, attempt=attempt, timeout=request.timeout,
+        )
+        if sampled:
+            self._debug(
+                "headers: %r, payload: %r",
+                redactHeaders(request.headers), redact(payload, self.redact_keys),
+            )
+
+    def response(self, r: "TransportResponse", data: t.Any, sampled: bool) -> None:
+        """Log a response, *data* is the decoded body or None, if it wasn't decoded.
+
+        Bodies, which weren't decoded (e.g. of errors), are decoded here to be redacted.
+        """
+        if not self.enabled:
+            return
+        self._debug(
+            "Response[%s %s] (%d bytes)", r.status_code, r.reason, len(r.content or b""),
+            status=r.status_code, size=len(r.content or b""),
+        )
+        if not sampled:
+            return
+        if data is None:
+            try:
+                data = json.loads(r.content)
+            except ValueError:
+                # error bodies may echo the submitted data, don't log them unredacted
+                self._debug("Response body: <%d bytes, not JSON>", len(r.content or b""))
+                return
+        self._debug("Response body: %r", redact(data, self.redact_keys))
+
+    def retry(self, delay: float) -> None:
+        if self.enabled:
+            self._debug("Retry in %.2f seconds", delay, delay=delay)
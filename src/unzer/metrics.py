@@ -0,0 +1,189 @@
+import bisect
+import math
+import threading
+import typing as t
+
+from .hooks import Hooks, RequestEvent
+from .model.error import ErrorResponse
+
+DEFAULT_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels: t.TypeAlias = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    def __init__(self, buckets: t.Sequence[float] = DEFAULT_BUCKETS):
+        """A cumulative histogram with fixed upper bounds (in the Prometheus sense).
+
+        :param buckets: The sorted upper bounds, ``+Inf`` is added implicitly.
+        """
+        super().__init__()
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Get the (upper bound, cumulative count) pairs including ``+Inf``."""
+        result = []
+        total = 0
+        for bound, count in zip((*self.buckets, math.inf), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile (0..1), the upper bound of the bucket containing it."""
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        for bound, total in self.cumulative():
+            if total >= rank:
+                return bound
+        return math.inf
+
+
+class MetricsCollector:
+    """In-process metrics of the requests of one or more clients.
+
+    Collects per operation (see :func:`operationLabel`):
+
+    ``unzer_request_duration_seconds``
+        Histogram of the call latency, including retries and delays.
+    ``unzer_attempt_duration_seconds``
+        Histogram of the latency of single attempts.
+    ``unzer_responses_total``
+        Counter of the responses by status code.
+    ``unzer_retries_total``
+        Counter of the retries.
+    ``unzer_errors_total``
+        Counter of the failed calls by error code (the code of the first error of an
+        :exc:`ErrorResponse` or the exception class).
+    ``unzer_cache_requests_total``
+        Counter of the lookups in the :class:`ResponseCache` by result (``hit`` or ``miss``).
+
+    Register it with the *metrics* parameter of the client or :meth:`install`.
+    Export the metrics with :meth:`exportPrometheus`.
+    """
+
+    HELP = {
+        "unzer_request_duration_seconds": "Latency of the Unzer API calls including retries.",
+        "unzer_attempt_duration_seconds": "Latency of single attempts of Unzer API calls.",
+        "unzer_responses_total": "Responses of the Unzer API by status code.",
+        "unzer_retries_total": "Retried attempts of Unzer API calls.",
+        "unzer_errors_total": "Failed Unzer API calls by error code.",
+        "unzer_cache_requests_total": "Lookups in the response cache by result (hit or miss).",
+    }
+
+    def __init__(self, buckets: t.Sequence[float] = DEFAULT_BUCKETS):
+        """Create a new metrics collector.
+
+        :param buckets: The upper bounds of the latency histograms in seconds.
+        """
+        super().__init__()
+        self.buckets = tuple(buckets)
+        self._histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._counters: dict[str, dict[Labels, float]] = {}
+        self._lock = threading.Lock()
+
+    def install(self, hooks: Hooks) -> None:
+        """Register the hooks of this collector."""
+        hooks.add("after_response", self.onAfterResponse)
+        hooks.add("retry", self.onRetry)
+        hooks.add("error", self.onError)
+
+    @staticmethod
+    def _labels(labels: dict[str, t.Any]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def increment(self, name: str, amount: float = 1, **labels: t.Any) -> None:
+        """Increment a counter."""
+        key = self._labels(labels)
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: t.Any) -> None:
+        """Add a value to a histogram."""
+        key = self._labels(labels)
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            if (histogram := histograms.get(key)) is None:
+                histogram = histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def counter(self, name: str, **labels: t.Any) -> float:
+        """Get the value of a counter."""
+        with self._lock:
+            return self._counters.get(name, {}).get(self._labels(labels), 0)
+
+    def histogram(self, name: str, **labels: t.Any) -> Histogram | None:
+        """Get a histogram, None if nothing was observed."""
+        with self._lock:
+            return self._histograms.get(name, {}).get(self._labels(labels))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def onAfterResponse(self, event: RequestEvent) -> None:
+        self.observe("unzer_attempt_duration_seconds", event.attemptElapsed, operation=event.label)
+        self.increment("unzer_responses_total", operation=event.label, status=event.response.status_code)
+        if 200 <= event.response.status_code <= 201:
+            self.observe("unzer_request_duration_seconds", event.elapsed, operation=event.label)
+
+    def onRetry(self, event: RequestEvent) -> None:
+        self.increment("unzer_retries_total", operation=event.label)
+
+    def onError(self, event: RequestEvent) -> None:
+        self.observe("unzer_request_duration_seconds", event.elapsed, operation=event.label)
+        exc = event.exception
+        if isinstance(exc, ErrorResponse) and exc.errors:
+            code = exc.errors[0].code
+        else:
+            code = exc.__class__.__name__
+        self.increment("unzer_errors_total", operation=event.label, code=code)
+
+    @staticmethod
+    def _formatLabels(labels: Labels) -> str:
+        if not labels:
+            return ""
+        return "{%s}" % ",".join(
+            '%s="%s"' % (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for key, value in labels
+        )
+
+    @staticmethod
+    def _formatValue(value: float) -> str:
+        if value == math.inf:
+            return "+Inf"
+        if float(value).is_integer():
+            return "%d" % value
+        return repr(float(value))
+
+    def exportPrometheus(self) -> str:
+        """Export all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, histograms in sorted(self._histograms.items()):
+                lines.append("# HELP %s %s" % (name, self.HELP.get(name, name)))
+                lines.append("# TYPE %s histogram" % name)
+                for labels, histogram in sorted(histograms.items()):
+                    for bound, total in histogram.cumulative():
+                        lines.append("%s_bucket%s %d" % (
+                            name, self._formatLabels((*labels, ("le", self._formatValue(bound)))), total,
+                        ))
+                    lines.append("%s_sum%s %s" % (name, self._formatLabels(labels), repr(histogram.sum)))
+                    lines.append("%s_count%s %d" % (name, self._formatLabels(labels), histogram.count))
+            for name, counters in sorted(self._counters.items()):
+                lines.append("# HELP %s %s" % (name, self.HELP.get(name, name)))
+                lines.append("# TYPE %s counter" % name)
+                for labels, value in sorted(counters.items()):
+                    lines.append("%s%s %s" % (name, self._formatLabels(labels), self._formatValue(value)))
+        return "\n".join(lines) + "\n"
@@ -11,7 +11,8 @@ from .address import Address
 from .basket import Basket
 from .basketItem import BasketItem
 from .customer import Customer
-from .error import Error, ErrorResponse
+from .keypair import KeyPairPaymentType, KeyPairSupport, KeyPairTypes
+from .error import CheckoutError, CircuitOpenError, Error, ErrorResponse, RateLimitExceeded
 from .payment import (
     Action,
     PaymentGetResponse,
@@ -40,9 +41,16 @@ __all__ = [
     "RegistrationLevel",
     "RiskData",
     "ShippingTransactionData",
+    # keypair
+    "KeyPairPaymentType",
+    "KeyPairSupport",
+    "KeyPairTypes",
     # error
+    "CheckoutError",
+    "CircuitOpenError",
     "Error",
     "ErrorResponse",
+    "RateLimitExceeded",
     # payment
     "Action",
     "PaymentGetResponse",
@@ -82,6 +82,11 @@ class Customer(BaseModel):
     def keyOrCustomerId(self):
         return self.key or self.customerId
 
+    @property
+    def customerType(self):
+        """B2B if the customer has a company, otherwise B2C."""
+        return "B2B" if self.company or self.companyData else "B2C"
+
     @property
     def salutation(self):
         return self._salutation
@@ -1,7 +1,11 @@
 import datetime
 import logging
+import typing as t
 
-import requests
+from ..instrumentation import rateLimitedLog
+
+if t.TYPE_CHECKING:
+    from ..transport import TransportResponse
 
 logger = logging.getLogger("unzer-sdk").getChild(__name__)
 
@@ -12,7 +16,8 @@ class Error:
         self.merchantMessage = merchantMessage
         self.customerMessage = customerMessage
         if kwargs:
-            logger.warning("Error got additional unhandled data: %r", kwargs)
+            rateLimitedLog.warning(logger, ("Error", *sorted(kwargs)),
+                                   "Error got additional unhandled data: %r", kwargs)
 
     def __str__(self):
         return "%s %s: %s" % (self.__class__.__name__, self.code, self.merchantMessage)
@@ -56,9 +61,10 @@ class ErrorResponse(Exception):
         self.isError = isError  # type: bool
         self.isPending = isPending  # type: bool
         self.isSuccess = isSuccess  # type: bool
-        self.srcResponse = srcResponse  # type: requests.Response
+        self.srcResponse = srcResponse  # type: TransportResponse
         if kwargs:
-            logger.warning("ErrorResponse got additional unhandled data: %r", kwargs)
+            rateLimitedLog.warning(logger, ("ErrorResponse", *sorted(kwargs)),
+                                   "ErrorResponse got additional unhandled data: %r", kwargs)
 
     @classmethod
     def fromDict(cls, data, message="Unzer Error"):
@@ -83,3 +89,115 @@ class ErrorResponse(Exception):
             self.traceId,
             self.errors,
         )
+
+
+class CircuitOpenError(ErrorResponse):
+    def __init__(
+            self,
+            message,
+            family=None,
+            retryAfter=None,
+            **kwargs
+    ):
+        """The request was not sent, because the circuit breaker is open.
+
+        :param family: The operation family (e.g. payments), which is open.
+        :type family: str
+        :param retryAfter: Seconds until the circuit allows trial requests again.
+        :type retryAfter: float
+        """
+        super().__init__(message, **kwargs)
+        self.family = family  # type: str
+        self.retryAfter = retryAfter  # type: float
+
+    def __repr__(self):
+        return "%s.%s(family=%r, retryAfter=%r)" % (
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.family,
+            self.retryAfter,
+        )
+
+
+class RateLimitExceeded(ErrorResponse):
+    def __init__(
+            self,
+            message,
+            operationClass=None,
+            retryAfter=None,
+            **kwargs
+    ):
+        """The request was not sent, because the client-side rate limit is exhausted.
+
+        :param operationClass: The operation class (e.g. bulk), whose budget is exhausted.
+        :type operationClass: str
+        :param retryAfter: Seconds until the budget allows a request again.
+        :type retryAfter: float
+        """
+        super().__init__(message, **kwargs)
+        self.operationClass = operationClass  # type: str
+        self.retryAfter = retryAfter  # type: float
+
+    def __repr__(self):
+        return "%s.%s(operationClass=%r, retryAfter=%r)" % (
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.operationClass,
+            self.retryAfter,
+        )
+
+
+class CheckoutError(ErrorResponse):
+    def __init__(
+            self,
+            message,
+            step=None,
+            failures=None,
+            customer=None,
+            basket=None,
+            paymentType=None,
+            rolledBack=None,
+            transactionOutcome=None,
+            **kwargs
+    ):
+        """A checkout failed, see :meth:`UnzerClient.checkout`.
+
+        The resources created before the failure are kept, so the checkout can be
+        repeated with them, unless they were rolled back. If the outcome of the transaction
+        is unknown (e.g. after a timeout), it may have been processed; check the payment
+        (e.g. by its orderId) before repeating the checkout.
+
+        :param step: The failed step: customer, basket, paymentType or transaction.
+        :type step: str
+        :param failures: The exceptions by step, several steps can fail at once.
+        :type failures: dict[str, Exception]
+        :param customer: The created or given customer, None if it failed or was rolled back.
+        :type customer: Customer
+        :param basket: The created or given basket, None if it failed.
+        :type basket: Basket
+        :param paymentType: The created or given payment type, None if it failed.
+        :type paymentType: PaymentType
+        :param rolledBack: The ids of the deleted resources.
+        :type rolledBack: list[str]
+        :param transactionOutcome: ``rejected`` if the API refused the transaction,
+            ``unknown`` if it may have been processed, None if it wasn't attempted.
+        :type transactionOutcome: str
+        """
+        super().__init__(message, **kwargs)
+        self.step = step  # type: str
+        self.failures = failures or {}  # type: dict[str, Exception]
+        self.customer = customer  # type: Customer
+        self.basket = basket  # type: Basket
+        self.paymentType = paymentType  # type: PaymentType
+        self.rolledBack = rolledBack or []  # type: list[str]
+        self.transactionOutcome = transactionOutcome  # type: str
+
+    def __repr__(self):
+        return "%s.%s(step=%r, failures=%r, rolledBack=%r, transactionOutcome=%r)" % (
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.step,
+            self.failures,
+            self.rolledBack,
+            self.transactionOutcome,
+        )
@@ -0,0 +1,221 @@
+import typing as t
+
+from .base import BaseModel, JSONValue
+from .payment import PaymentMethodTypes
+
+
+class KeyPairSupport(BaseModel):
+    def __init__(
+            self,
+            brands=None,
+            countries=None,
+            channel=None,
+            currency=None,
+            **kwargs
+    ):
+        """Create a new KeyPairSupport, one supported configuration of a payment type.
+
+        :param brands: (optional) The supported brands (e.g. VISA, MASTER).
+        :type brands: list[str]
+        :param countries: (optional) The supported countries in ISO A2 format.
+        :type countries: list[str]
+        :param channel: (optional) The channel id.
+        :type channel: str
+        :param currency: (optional) The supported currencies in ISO 4217 alpha-3 format.
+        :type currency: list[str]
+        """
+        super().__init__(**kwargs)
+        self.brands = brands or []  # type: list[str]
+        self.countries = countries or []  # type: list[str]
+        self.channel = channel  # type: str
+        self.currency = currency or []  # type: list[str]
+
+    def serialize(self) -> dict[str, JSONValue]:
+        return {
+            "brands": self.brands,
+            "countries": self.countries,
+            "channel": self.channel,
+            "currency": self.currency,
+        }
+
+    @classmethod
+    def fromDict(cls, data: dict[str, JSONValue]) -> t.Self:
+        return cls(**data)
+
+
+class KeyPairPaymentType(BaseModel):
+    def __init__(
+            self,
+            type=None,
+            allowCustomerTypes=None,
+            allowCreditTransaction=None,
+            supports=None,
+            card3ds=None,
+            **kwargs
+    ):
+        """Create a new KeyPairPaymentType, the configuration of one payment type.
+
+        :param type: The payment method type (e.g. card, paypal).
+        :type type: str
+        :param allowCustomerTypes: (optional) The allowed customer types: B2C, B2B or BOTH.
+        :type allowCustomerTypes: str
+        :param allowCreditTransaction: (optional) Whether credit transactions are allowed.
+        :type allowCreditTransaction: bool
+        :param supports: (optional) The supported configurations.
+        :type supports: list[KeyPairSupport]
+        :param card3ds: (optional) (original: 3ds) Whether 3ds is enabled.
+        :type card3ds: bool
+        """
+        super().__init__(**kwargs)
+        self.type = type  # type: str
+        self.allowCustomerTypes = allowCustomerTypes  # type: str
+        self.allowCreditTransaction = allowCreditTransaction  # type: bool
+        self.supports = supports or []  # type: list[KeyPairSupport]
+        self.card3ds = card3ds  # type: bool
+
+    @property
+    def methodName(self) -> PaymentMethodTypes | None:
+        """The type as :class:`PaymentMethodTypes`, None if the type is unknown to the SDK."""
+        try:
+            return PaymentMethodTypes(self.type)
+        except ValueError:
+            return None
+
+    @property
+    def channel(self) -> str | None:
+        """The channel of the first supported configuration."""
+        return self.supports[0].channel if self.supports else None
+
+    @property
+    def brands(self) -> list[str]:
+        """The brands of the first supported configuration."""
+        return self.supports[0].brands if self.supports else []
+
+    @property
+    def currencies(self) -> set[str]:
+        """All supported currencies."""
+        return {currency for support in self.supports for currency in support.currency}
+
+    def allowsCustomerType(self, customerType: str) -> bool:
+        """Whether the customer type (B2C or B2B) is allowed, everything is allowed if nothing is configured."""
+        return self.allowCustomerTypes in {None, "BOTH", customerType}
+
+    def serialize(self) -> dict[str, JSONValue]:
+        data = {
+            "type": self.type,
+            "allowCustomerTypes": self.allowCustomerTypes,
+            "allowCreditTransaction": self.allowCreditTransaction,
+            "supports": [support.serialize() for support in self.supports],
+        }
+        if self.card3ds is not None:
+            data["3ds"] = self.card3ds
+        return data
+
+    @classmethod
+    def fromDict(cls, data: dict[str, JSONValue]) -> t.Self:
+        data = data.copy()
+        data["supports"] = [KeyPairSupport.fromDict(support) for support in data.get("supports") or []]
+        data["card3ds"] = data.pop("3ds", None)
+        return cls(**data)
+
+
+class KeyPairTypes(BaseModel):
+    def __init__(
+            self,
+            publicKey=None,
+            secureLevel=None,
+            alias=None,
+            merchantName=None,
+            merchantAddress=None,
+            paymentTypes=None,
+            **kwargs
+    ):
+        """Create a new KeyPairTypes, the payment method configuration of a keypair.
+
+        The payment types are indexed by their type, see :meth:`get`.
+
+        :param publicKey: (optional) The public key of the keypair.
+        :type publicKey: str
+        :param secureLevel: (optional) The PCI secure level.
+        :type secureLevel: str
+        :param alias: (optional) The alias of the keypair.
+        :type alias: str
+        :param merchantName: (optional) The name of the merchant.
+        :type merchantName: str
+        :param merchantAddress: (optional) The address of the merchant.
+        :type merchantAddress: str
+        :param paymentTypes: (optional) The configured payment types.
+        :type paymentTypes: list[KeyPairPaymentType]
+        """
+        kwargs.pop("privateKey", None)  # don't keep a copy of the secret
+        super().__init__(**kwargs)
+        self.publicKey = publicKey  # type: str
+        self.secureLevel = secureLevel  # type: str
+        self.alias = alias  # type: str
+        self.merchantName = merchantName  # type: str
+        self.merchantAddress = merchantAddress  # type: str
+        self.paymentTypes = paymentTypes or []  # type: list[KeyPairPaymentType]
+
+    @property
+    def paymentTypes(self) -> list[KeyPairPaymentType]:
+        return self._paymentTypes
+
+    @paymentTypes.setter
+    def paymentTypes(self, value: list[KeyPairPaymentType]):
+        self._paymentTypes = value
+        self._index = {paymentType.type: paymentType for paymentType in value}
+
+    def get(self, methodName: PaymentMethodTypes | str) -> KeyPairPaymentType | None:
+        """Get the configuration of a payment type.
+
+        :param methodName: The payment method type (e.g. ``PaymentMethodTypes.CARD`` or ``"card"``).
+        :return: The configuration or None, if the type is not configured.
+        """
+        if isinstance(methodName, PaymentMethodTypes):
+            methodName = methodName.value
+        return self._index.get(methodName)
+
+    def __contains__(self, methodName: PaymentMethodTypes | str) -> bool:
+        return self.get(methodName) is not None
+
+    def validate(
+            self,
+            methodName: PaymentMethodTypes | str,
+            currency: str = None,
+            customerType: str = None,
+    ) -> KeyPairPaymentType:
+        """Check locally, that a payment type is configured and supports the currency and customer type.
+
+        :param methodName: The payment method type (e.g. ``PaymentMethodTypes.CARD`` or ``"card"``).
+        :param currency: (optional) The currency in ISO 4217 alpha-3 format.
+        :param customerType: (optional) The customer type: B2C or B2B.
+        :return: The configuration of the payment type.
+        :raises ValueError: If the payment type would be rejected by the API.
+        """
+        if (paymentType := self.get(methodName)) is None:
+            raise ValueError("PaymentType %s is not configured in the keypair."
+                             % getattr(methodName, "value", methodName))
+        if currency and (currencies := paymentType.currencies) and currency not in currencies:
+            raise ValueError("PaymentType %s doesn't support the currency %s, only %s."
+                             % (paymentType.type, currency, ", ".join(sorted(currencies))))
+        if customerType and not paymentType.allowsCustomerType(customerType):
+            raise ValueError("PaymentType %s doesn't allow %s customers, only %s."
+                             % (paymentType.type, customerType, paymentType.allowCustomerTypes))
+        return paymentType
+
+    def serialize(self) -> dict[str, JSONValue]:
+        return {
+            "publicKey": self.publicKey,
+            "secureLevel": self.secureLevel,
+            "alias": self.alias,
+            "merchantName": self.merchantName,
+            "merchantAddress": self.merchantAddress,
+            "paymentTypes": [paymentType.serialize() for paymentType in self.paymentTypes],
+        }
+
+    @classmethod
+    def fromDict(cls, data: dict[str, JSONValue]) -> t.Self:
+        data = data.copy()
+        data["paymentTypes"] = [KeyPairPaymentType.fromDict(paymentType)
+                                for paymentType in data.get("paymentTypes") or []]
+        return cls(**data)
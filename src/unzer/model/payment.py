@@ -1,5 +1,9 @@
+import asyncio
+import concurrent.futures
+import contextvars
 import datetime
 import enum
+import inspect
 import logging
 import re
 import typing as t
@@ -10,6 +14,7 @@ from .base import BaseModel
 from ..utils import parseBool, parseDateTime
 
 if t.TYPE_CHECKING:
+    from .keypair import KeyPairTypes
     from ..client import UnzerClient
 
 
@@ -248,16 +253,50 @@ class PaymentGetResponse(BaseModel):
         data["typeId"] = data["resources"].get("typeId") or None
         return cls(client=client, **data)
 
-    def getChargedTransactions(self):
+    def getChargedTransactions(self, transactionIds=None, concurrency=1):
         """Fetch the charged transaction of this payment.
 
-        :return:  List of charged transaction resources.
+        With a :class:`AsyncUnzerClient` an awaitable is returned.
+
+        :param transactionIds: (optional) Fetch only the charge transactions with these ids.
+        :type transactionIds: Iterable[str]
+        :param concurrency: Maximum number of parallel requests
+            (threads with a sync client, tasks with an async client).
+        :type concurrency: int
+        :return:  List of charged transaction resources, in the order of :attr:`transactions`.
         :rtype: list[PaymentResponse]
         """
-        transactions = []
-        for txn in filter(lambda txn_: txn_.action == Action.CHARGE, self.transactions):
-            transactions.append(self._client.getChargedTransaction(self.paymentId, txn.transactionId))
-        return transactions
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if transactionIds is not None:
+            transactionIds = set(transactionIds)
+        txnIds = [
+            txn.transactionId for txn in self.transactions
+            if txn.action in (Action.CHARGE, Action.CHARGE.value)
+            and (transactionIds is None or txn.transactionId in transactionIds)
+        ]
+        if inspect.iscoroutinefunction(self._client.getChargedTransaction):
+            return self._getChargedTransactionsAsync(txnIds, concurrency)
+        if concurrency == 1 or len(txnIds) <= 1:
+            return [self._client.getChargedTransaction(self.paymentId, txnId) for txnId in txnIds]
+        with concurrent.futures.ThreadPoolExecutor(min(concurrency, len(txnIds))) as executor:
+            futures = [
+                # run each request in a copy of the callers context (e.g. a retry policy override)
+                executor.submit(contextvars.copy_context().run,
+                                self._client.getChargedTransaction, self.paymentId, txnId)
+                for txnId in txnIds
+            ]
+            return [future.result() for future in futures]
+
+    async def _getChargedTransactionsAsync(self, txnIds, concurrency):
+        """Fetch the charged transactions with an async client."""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(txnId):
+            async with semaphore:
+                return await self._client.getChargedTransaction(self.paymentId, txnId)
+
+        return list(await asyncio.gather(*map(fetch, txnIds)))
 
     @staticmethod
     def getPaymentTypeFromTypeId(typeId) -> PaymentTypes:
@@ -446,6 +485,24 @@ class PaymentRequest(BaseModel):
             data["additionalTransactionData"] = self.additional_transaction_data.serialize()
         return data
 
+    def validateBeforeRequest(self, keyPairTypes: "KeyPairTypes" = None, customerType: str = None) -> bool:
+        """Validate the model.
+
+        With the keypair configuration (see :meth:`UnzerClient.getKeyPairConfiguration`)
+        check also, that the payment type is configured and supports the currency
+        and the customer type, see :meth:`KeyPairTypes.validate`.
+
+        :param keyPairTypes: (optional) The keypair configuration.
+        :param customerType: (optional) The type of the customer: B2C or B2B.
+        :raises ValueError: If the request would be rejected.
+        """
+        super().validateBeforeRequest()
+        if keyPairTypes is not None:
+            methodName = self.paymentType.method_name
+            if isinstance(methodName, PaymentMethodTypes):  # types created on the fly are unknown to the SDK
+                keyPairTypes.validate(methodName, self.currency, customerType)
+        return True
+
     @classmethod
     def fromDict(cls, data):
         raise NotImplementedError("Use PaymentResponse.fromDict for your responses.")
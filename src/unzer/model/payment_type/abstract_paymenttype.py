@@ -1,14 +1,23 @@
 import abc
+import inspect
 import logging
+import threading
 import typing as t
 
 from ..base import BaseModel
 
 if t.TYPE_CHECKING:
+    from ..keypair import KeyPairPaymentType, KeyPairTypes  # noqa
     from ..payment import PaymentTypes, PaymentMethodTypes  # noqa
 
 logger = logging.getLogger("unzer-sdk").getChild(__name__)
 
+# PaymentTypes, PaymentMethodTypes and their values -> PaymentType class
+_registry: dict[t.Any, t.Type["PaymentType"]] = {}
+# (base class, method) -> PaymentType class created on the fly
+_fallbacks: dict[tuple[type, t.Any], t.Type["PaymentType"]] = {}
+_fallbackLock = threading.Lock()
+
 
 class PaymentType(BaseModel):
     @property
@@ -52,28 +61,85 @@ class PaymentType(BaseModel):
             yield from subclass.get_subclasses()
             yield subclass
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if not vars(cls).get("_fallback"):
+            PaymentType.register(cls)
+
+    @staticmethod
+    def register(subclass: t.Type["PaymentType"]) -> None:
+        """Register a PaymentType subclass for the lookup of :meth:`construct`.
+
+        Subclasses are registered automatically on their definition.
+        A later registered class replaces the class of the same method.
+        """
+        method = subclass.method
+        if isinstance(method, property):
+            return  # still abstract
+        _registry[method] = subclass
+        _registry[method.value] = subclass
+        if not isinstance(subclass.method_name, (property, str)):
+            _registry[subclass.method_name] = subclass
+            _registry[subclass.method_name.value] = subclass
+
+    @staticmethod
+    def lookup(key: t.Union["PaymentTypes", "PaymentMethodTypes", str]) -> t.Type["PaymentType"] | None:
+        """Get the registered PaymentType class.
+
+        :param key: A :class:`PaymentTypes`, a :class:`PaymentMethodTypes`,
+            their values (e.g. ``crd`` or ``card``) or a typeId (e.g. ``s-crd-abc456def789``).
+        :return: The class or None, if no class is registered.
+        """
+        if (subclass := _registry.get(key)) is not None:
+            return subclass
+        if isinstance(key, str) and key.count("-") >= 2:  # typeId
+            return _registry.get(key.split("-")[1].lower())
+        return None
+
     @classmethod
     def construct(cls, method: "PaymentTypes") -> t.Type["PaymentType"]:
-        for subclass in PaymentType.get_subclasses():
-            if subclass.method == method:
-                return subclass
-        logger.warning(f"Creating not existing PaymentType for method {method} on the fly")
-        sub_cls = type(str(method).title(), (cls,), {"method": method, "method_name": "N/A"})
-        return sub_cls  # noqa
-
-    def get_configuration(self) -> dict:
+        if (subclass := PaymentType.lookup(method)) is not None:
+            return subclass
+        with _fallbackLock:
+            if (subclass := _fallbacks.get((cls, method))) is None:
+                logger.warning(f"Creating not existing PaymentType for method {method} on the fly")
+                subclass = type(str(method).title(), (cls,), {"method": method, "method_name": "N/A",
+                                                              "_fallback": True})
+                _fallbacks[(cls, method)] = subclass
+        return subclass  # noqa
+
+    def get_keypair_type(self) -> "KeyPairPaymentType":
+        """Get the configuration of this payment type from the (cached) keypair configuration.
+
+        With a :class:`AsyncUnzerClient` an awaitable is returned.
+
+        :raises LookupError: If the payment type is not configured in the keypair.
+        """
         if self._client is None:
             raise IOError(f"PaymentType {type(self).__name__} was not initialized with client instance")
-        key_pair_types = self._client.getKeyPairTypes()
-        logger.debug(f"key_pair_types: {key_pair_types}")
-        for payment_type in key_pair_types["paymentTypes"]:
-            if payment_type["type"] == self.method_name.value:
-                return payment_type
-        raise LookupError(f"PaymentType {self.method_name} is not configured in the keypair")
-
-    # TODO: Without caching this isn't the best solution --> better implement in the KeyPairTypeModel
+
+        def lookup(key_pair_types: "KeyPairTypes") -> "KeyPairPaymentType":
+            if (payment_type := key_pair_types.get(self.method_name)) is None:
+                raise LookupError(f"PaymentType {self.method_name} is not configured in the keypair")
+            return payment_type
+
+        return _then(self._client.getKeyPairConfiguration(), lookup)
+
+    def get_configuration(self) -> dict:
+        return _then(self.get_keypair_type(), lambda payment_type: payment_type.serialize())
+
     def get_channel_id(self) -> str:
-        return self.get_configuration()["supports"][0]["channel"]
+        return _then(self.get_keypair_type(), lambda payment_type: payment_type.channel)
 
     def get_brands(self) -> list[str]:
-        return self.get_configuration()["supports"][0]["brands"]
+        return _then(self.get_keypair_type(), lambda payment_type: payment_type.brands)
+
+
+def _then(result: t.Any, callback: t.Callable[[t.Any], t.Any]) -> t.Any:
+    """Apply callback on the result, which might be an awaitable of an async client."""
+    if inspect.isawaitable(result):
+        async def wrapper():
+            return callback(await result)
+
+        return wrapper()
+    return callback(result)
@@ -1,7 +1,12 @@
+import typing as t
+
 from .base import BaseModel
 from .payment import Action
 from ..utils import parseBool
 
+if t.TYPE_CHECKING:
+    from .keypair import KeyPairTypes
+
 
 class PaymentPage(BaseModel):
     REQUIRED_ATTRIBUTES = [
@@ -127,6 +132,30 @@ class PaymentPage(BaseModel):
         self.metadataId = metadataId  # type:str
         self.basketId = basketId  # type:str
 
+    def validateBeforeRequest(self, keyPairTypes: "KeyPairTypes" = None, customerType: str = None) -> bool:
+        """Validate the model.
+
+        With the keypair configuration (see :meth:`UnzerClient.getKeyPairConfiguration`)
+        check also, that at least one payment type, which is not excluded,
+        supports the currency and the customer type.
+
+        :param keyPairTypes: (optional) The keypair configuration.
+        :param customerType: (optional) The type of the customer: B2C or B2B.
+        :raises ValueError: If the payment page would offer no payment type.
+        """
+        super().validateBeforeRequest()
+        if keyPairTypes is not None:
+            excludeTypes = set(self.excludeTypes or ())
+            if not any(
+                    paymentType.type not in excludeTypes
+                    and (not paymentType.currencies or self.currency in paymentType.currencies)
+                    and (not customerType or paymentType.allowsCustomerType(customerType))
+                    for paymentType in keyPairTypes.paymentTypes
+            ):
+                raise ValueError("No payment type of the keypair supports the currency %s%s."
+                                 % (self.currency, " for %s customers" % customerType if customerType else ""))
+        return True
+
     def serialize(self):
         data = {
             "amount": self.amount,
@@ -212,5 +241,5 @@ class PaymentPageResponse(PaymentPage):
         data["card3ds"] = parseBool(data["card3ds"])
         data["shippingAddressRequired"] = parseBool(data["shippingAddressRequired"])
         data["billingAddressRequired"] = parseBool(data["billingAddressRequired"])
-        data["action"] = data["action"].lower()  # must be equivalent to enum *Action*
+        data["action"] = Action(data["action"].lower())
         return cls(**data)
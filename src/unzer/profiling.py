@@ -0,0 +1,149 @@
+import contextlib
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+import typing as t
+
+# phases of a call in the order they happen
+PHASES = ("connect", "tls", "ttfb", "body", "decode", "model")
+
+# the profile of the call in progress in the current context, set by the client
+currentProfile: contextvars.ContextVar["CallProfile | None"] = \
+    contextvars.ContextVar("unzerProfile", default=None)
+
+# the profile of the last finished call in the current context and its decoded response,
+# the model construction of exactly this response is added to it
+modelProfile: contextvars.ContextVar["tuple[CallProfile, t.Any] | None"] = \
+    contextvars.ContextVar("unzerModelProfile", default=None)
+
+
+class CallProfile:
+    def __init__(self, label: str):
+        """The timing breakdown of one call, see :class:`Profiler`.
+
+        The phases are summed up over all attempts of the call:
+
+        ``connect``
+            Name resolution and TCP connect of new connections.
+        ``tls``
+            TLS handshake of new connections.
+        ``ttfb``
+            Time to the first byte: sending the request and waiting for the response headers.
+        ``body``
+            Transfer of the response body.
+        ``decode``
+            JSON decoding of the response body.
+        ``model``
+            Construction of the returned model (e.g. :meth:`PaymentResponse.fromDict`).
+
+        :param label: The operation label, see :func:`operationLabel`.
+        """
+        super().__init__()
+        self.label = label
+        self.traceId = None  # type: str | None
+        self.statusCode = None  # type: int | None
+        self.attempts = 0
+        self.phases: dict[str, float] = {}
+        self.timestamp = time.time()
+        self.total = 0.0
+        self._started = time.perf_counter()
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add time to a phase."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def measure(self, phase: str) -> t.Iterator[None]:
+        """Add the time of the block to a phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - started)
+
+    def finish(self) -> None:
+        """Stop the clock of the call."""
+        self.total = time.perf_counter() - self._started
+
+    @property
+    def other(self) -> float:
+        """Time of the call not covered by a phase (e.g. retry delays, hooks)."""
+        return max(0.0, self.total - sum(self.phases.values()))
+
+    def breakdown(self) -> dict[str, float]:
+        """Get the phases in order, including ``other`` and ``total``."""
+        data = {phase: self.phases[phase] for phase in PHASES if phase in self.phases}
+        data.update((phase, value) for phase, value in self.phases.items() if phase not in data)
+        data["other"] = self.other
+        data["total"] = self.total
+        return data
+
+    def __repr__(self) -> str:
+        return "%s.%s(label=%r, traceId=%r, total=%.4f)" % (
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.label,
+            self.traceId,
+            self.total,
+        )
+
+
+class Profiler:
+    def __init__(self, slowest: int = 50):
+        """Opt-in profiling of the calls of a client.
+
+        Pass it as *profiler* to the client. Each call gets a :class:`CallProfile`,
+        the slowest calls are kept for later investigation (see :meth:`slowest`).
+        The model construction is added to the profile after the call was ranked.
+
+        Connect and TLS are measured for :class:`RequestsTransport` and :class:`HttpxTransport`,
+        name resolution is included in ``connect``.
+
+        :param slowest: Number of the slowest calls to keep.
+        """
+        super().__init__()
+        self.size = slowest
+        self.calls = 0
+        self._heap: list[tuple[float, int, CallProfile]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def start(self, label: str) -> CallProfile:
+        """Start the profile of a call."""
+        return CallProfile(label)
+
+    def submit(self, profile: CallProfile) -> None:
+        """Rank a finished call, it's kept if it's one of the slowest."""
+        entry = (profile.total, next(self._counter), profile)
+        with self._lock:
+            self.calls += 1
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, entry)
+            elif self._heap and entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def slowest(self) -> list[CallProfile]:
+        """Get the kept profiles, the slowest first."""
+        with self._lock:
+            profiles = [profile for _, _, profile in self._heap]
+        return sorted(profiles, key=lambda profile: profile.total, reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap.clear()
+            self.calls = 0
+
+    def report(self, limit: int = None) -> str:
+        """Format the slowest calls as a table (times in milliseconds)."""
+        columns = (*PHASES, "other", "total")
+        lines = ["%-36s %-24s %s" % ("operation", "traceId", " ".join("%8s" % column for column in columns))]
+        for profile in self.slowest()[:limit]:
+            breakdown = profile.breakdown()
+            lines.append("%-36s %-24s %s" % (
+                profile.label,
+                profile.traceId or "-",
+                " ".join("%8.1f" % (breakdown.get(column, 0.0) * 1000) for column in columns),
+            ))
+        return "\n".join(lines)
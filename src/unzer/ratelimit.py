@@ -0,0 +1,358 @@
+import asyncio
+import hashlib
+import mmap
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+import typing as t
+
+from .model.error import RateLimitExceeded
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = None):
+        """A thread-safe token bucket.
+
+        The bucket is refilled with :attr:`rate` tokens per second up to :attr:`burst` tokens.
+
+        :param rate: Number of tokens per second.
+        :param burst: (optional) Capacity of the bucket, defaults to one second of tokens (at least 1).
+        """
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _update(self, tokens: float, take: bool) -> float:
+        """Refill the bucket and take the tokens, if *take* is set and they are available.
+
+        The caller must hold the lock.
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + max(0.0, now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= tokens:
+            if take:
+                self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def _refund(self, tokens: float) -> float:
+        """Refill the bucket and put tokens back. The caller must hold the lock."""
+        self._update(0, False)
+        self._tokens = min(self.burst, self._tokens + tokens)
+        return 0.0
+
+    def _locked(self, operation: t.Callable[[], float]) -> float:
+        """Run an operation on the state of the bucket under the lock."""
+        with self._lock:
+            return operation()
+
+    def tryAcquire(self, tokens: float = 1) -> float:
+        """Take tokens, if available.
+
+        :return: 0 if the tokens were taken,
+            otherwise the time in seconds until they are available.
+        """
+        return self._locked(lambda: self._update(tokens, True))
+
+    def waitTime(self, tokens: float = 1) -> float:
+        """Get the time in seconds until tokens are available, without taking them."""
+        return self._locked(lambda: self._update(tokens, False))
+
+    def release(self, tokens: float = 1) -> None:
+        """Put back tokens, which were taken for a request that isn't sent."""
+        self._locked(lambda: self._refund(tokens))
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> bool:
+        """Take tokens, wait until they are available.
+
+        :param timeout: (optional) Maximum time to wait in seconds.
+        :return: True if the tokens were taken, False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while wait := self.tryAcquire(tokens):
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+        return True
+
+    async def acquireAsync(self, tokens: float = 1, timeout: float = None) -> bool:
+        """Take tokens, wait non-blocking until they are available.
+
+        See :meth:`acquire`.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while wait := self.tryAcquire(tokens):
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+        return True
+
+
+class SharedTokenBucket(TokenBucket):
+    _STATE = struct.Struct("dd")  # tokens, updated
+
+    def __init__(self, path: str, rate: float, burst: float = None):
+        """A token bucket shared by all processes of a host.
+
+        The state is kept in a small memory-mapped file and guarded by an exclusive
+        ``flock``, so each operation costs two system calls. The refill is based on
+        :func:`time.monotonic`, which is system-wide on Linux and macOS. A state
+        from before a reboot (with a timestamp in the future) starts with a full bucket.
+        Processes should use the same rate and burst for the same file.
+
+        :param path: The file of the state, preferably on a tmpfs (e.g. ``/dev/shm``).
+        :param rate: Number of tokens per second.
+        :param burst: (optional) Capacity of the bucket, defaults to one second of tokens (at least 1).
+        """
+        if fcntl is None:
+            raise RuntimeError("A SharedTokenBucket requires fcntl (POSIX)")
+        super().__init__(rate, burst)
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._fd).st_size < self._STATE.size:
+                    os.ftruncate(self._fd, self._STATE.size)
+                    os.pwrite(self._fd, self._STATE.pack(self.burst, time.monotonic()), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._map = mmap.mmap(self._fd, self._STATE.size)
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+    def _locked(self, operation: t.Callable[[], float]) -> float:
+        """Run an operation on the shared state under the lock of the file."""
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._tokens, self._updated = self._STATE.unpack_from(self._map)
+                if self._updated > time.monotonic():
+                    # the state survived a reboot, which reset the monotonic clock
+                    self._tokens, self._updated = self.burst, time.monotonic()
+                result = operation()
+                self._STATE.pack_into(self._map, 0, self._tokens, self._updated)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._map.closed:
+                self._map.close()
+                os.close(self._fd)
+
+
+class SharedMemoryBackend:
+    def __init__(self, directory: str = None):
+        """Share the budgets of a :class:`RateLimiter` between all processes of a host.
+
+        Pass it as *backend* to the limiter in every process (e.g. every gunicorn worker);
+        then one API key has one budget on the host instead of one per process.
+        Each budget is a :class:`SharedTokenBucket` named after a hash of the key
+        and the operation class.
+
+        :param directory: (optional) The directory of the state files,
+            defaults to ``/dev/shm/unzer-ratelimit`` or a directory in the temp dir.
+        """
+        super().__init__()
+        if directory is None:
+            base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+            directory = os.path.join(base, "unzer-ratelimit")
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.directory = directory
+
+    def path(self, key: str, operationClass: str) -> str:
+        """Get the file of a budget, the key is hashed, it's secret."""
+        name = "%s-%s.bucket" % (
+            hashlib.sha256(key.encode("utf-8")).hexdigest()[:24],
+            "key" if operationClass == RateLimiter.KEY_CLASS else re.sub(r"[^\w.-]", "_", operationClass),
+        )
+        return os.path.join(self.directory, name)
+
+    def __call__(self, key: str, operationClass: str, limit: "RateLimit") -> SharedTokenBucket:
+        return SharedTokenBucket(self.path(key, operationClass), limit.rate, limit.burst)
+
+
+class RateLimit:
+    def __init__(self, rate: float, burst: float = None, block: bool = True, max_wait: float = None):
+        """The budget of one operation class, see :class:`RateLimiter`.
+
+        :param rate: Number of requests per second.
+        :param burst: (optional) Number of requests, which can be sent at once,
+            defaults to one second of requests.
+        :param block: Wait for the budget, otherwise fail with :exc:`RateLimitExceeded`.
+        :param max_wait: (optional) Maximum time to wait in seconds, then fail.
+        """
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst
+        self.block = block
+        self.max_wait = max_wait
+
+    def __repr__(self) -> str:
+        return "%s.%s(rate=%r, burst=%r, block=%r)" % (
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.rate,
+            self.burst,
+            self.block,
+        )
+
+
+BucketFactory: t.TypeAlias = t.Callable[[str, str, RateLimit], TokenBucket]
+
+
+class RateLimiter:
+    """Client-side request budgets per API key and operation class.
+
+    Each request takes a token of the budget of its operation class and of the
+    budget ``*`` of the whole key (if configured). Give bulk work (e.g. a reconciliation)
+    its own class with a budget below the one of the key, then it can't starve the
+    interactive requests::
+
+        limiter = RateLimiter({
+            "*": RateLimit(20),
+            "bulk": RateLimit(5, max_wait=30),
+            "payments": RateLimit(10, block=False),
+        })
+        client = UnzerClient(private_key, public_key, rate_limiter=limiter)
+        with client.withRateLimitClass("bulk"):
+            client.getPayments(paymentIds)
+
+    The operation class is determined by :meth:`classify` or set per context with
+    :meth:`UnzerClient.withRateLimitClass`. Classes without a budget are only limited by ``*``.
+    The budgets are tracked per private key, so one limiter can be shared between clients.
+    Every attempt counts, including retries. With a :class:`SharedMemoryBackend` the
+    budgets are shared between the processes of a host as well.
+    """
+
+    KEY_CLASS = "*"
+
+    def __init__(self, limits: dict[str, RateLimit], backend: BucketFactory = None):
+        """Create a new rate limiter.
+
+        :param limits: The budgets by operation class, ``*`` is the budget of the whole key.
+        :param backend: (optional) Create the bucket of a budget from the key, the operation class
+            and the limit, e.g. :class:`SharedMemoryBackend`. Defaults to an in-process :class:`TokenBucket`.
+        """
+        super().__init__()
+        self.limits = dict(limits)
+        self.backend = backend
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def classify(method: str, operation: str) -> str:
+        """Get the default operation class of a request.
+
+        Transactions and what's created during a checkout (``payments``, ``paypage``, ``types``)
+        are ``payments``, all other requests are ``default``.
+
+        :param method: The HTTP method.
+        :param operation: The URL path relative to the endpoint.
+        """
+        family = operation.lstrip("/").split("/", 1)[0]
+        if method == "POST" and family in {"payments", "paypage", "types"}:
+            return "payments"
+        return "default"
+
+    def _bucket(self, key: str, operationClass: str) -> TokenBucket:
+        with self._lock:
+            if (bucket := self._buckets.get((key, operationClass))) is None:
+                limit = self.limits[operationClass]
+                if self.backend is not None:
+                    bucket = self.backend(key, operationClass, limit)
+                else:
+                    bucket = TokenBucket(limit.rate, limit.burst)
+                self._buckets[(key, operationClass)] = bucket
+            return bucket
+
+    def _budgets(self, key: str, operationClass: str) -> t.Iterator[tuple[str, RateLimit, TokenBucket]]:
+        """The budgets a request has to pass, the most specific first."""
+        for name in (operationClass, self.KEY_CLASS):
+            if (limit := self.limits.get(name)) is not None:
+                yield name, limit, self._bucket(key, name)
+
+    @staticmethod
+    def _exceeded(name: str, retryAfter: float) -> RateLimitExceeded:
+        return RateLimitExceeded(
+            "Rate limit of %s exceeded, retry after %.2f seconds" % (name, retryAfter),
+            operationClass=name,
+            retryAfter=retryAfter,
+        )
+
+    def acquire(self, key: str, operationClass: str, block: bool = None) -> None:
+        """Take a token of the budgets of a request.
+
+        Either a token of all budgets is taken or none: if a budget is exhausted,
+        the tokens already taken of the other budgets are put back.
+
+        :param key: The API key (private key).
+        :param operationClass: The operation class, see :meth:`classify`.
+        :param block: (optional) Override the *block* setting of the budgets.
+        :raises RateLimitExceeded: If a budget is exhausted and the request must not wait.
+        """
+        taken = []
+        try:
+            for name, limit, bucket in self._budgets(key, operationClass):
+                if not (limit.block if block is None else block):
+                    if wait := bucket.tryAcquire():
+                        raise self._exceeded(name, wait)
+                elif not bucket.acquire(timeout=limit.max_wait):
+                    raise self._exceeded(name, bucket.waitTime())
+                taken.append(bucket)
+        except BaseException:
+            for bucket in taken:
+                bucket.release()
+            raise
+
+    async def acquireAsync(self, key: str, operationClass: str, block: bool = None) -> None:
+        """Take a token of the budgets of a request, wait non-blocking.
+
+        See :meth:`acquire`.
+        """
+        taken = []
+        try:
+            for name, limit, bucket in self._budgets(key, operationClass):
+                if not (limit.block if block is None else block):
+                    if wait := bucket.tryAcquire():
+                        raise self._exceeded(name, wait)
+                elif not await bucket.acquireAsync(timeout=limit.max_wait):
+                    raise self._exceeded(name, bucket.waitTime())
+                taken.append(bucket)
+        except BaseException:
+            for bucket in taken:
+                bucket.release()
+            raise
+
+    def release(self, key: str, operationClass: str) -> None:
+        """Put back the tokens taken by :meth:`acquire` for a request, which isn't sent."""
+        for _, _, bucket in self._budgets(key, operationClass):
+            bucket.release()
+
+    def close(self) -> None:
+        """Release the buckets (e.g. the files of a :class:`SharedMemoryBackend`)."""
+        with self._lock:
+            buckets = list(self._buckets.values())
+            self._buckets.clear()
+        for bucket in buckets:
+            if isinstance(bucket, SharedTokenBucket):
+                bucket.close()
@@ -0,0 +1,176 @@
+import datetime
+import email.utils
+import random
+import time
+import typing as t
+
+if t.TYPE_CHECKING:
+    from .transport import TransportResponse
+
+
+class RetryPolicy:
+    def __init__(
+            self,
+            max_attempts: int = 5,
+            base_delay: float = 1.0,
+            max_delay: float = 8.0,
+            deadline: float | None = None,
+            retry_statuses: t.Iterable[int] = (429, *range(500, 600)),
+            respect_retry_after: bool = True,
+            retry_connection_errors: bool = True,
+            delays: t.Sequence[float] = None,
+            min_attempt_timeout: float = 0.1,
+    ):
+        """Define how often and when a failed request is retried.
+
+        The delays follow an exponential backoff with full jitter:
+        before the n-th retry a random delay between 0 and
+        ``min(max_delay, base_delay * 2 ** (n - 1))`` seconds is waited.
+        A ``Retry-After`` header of a 429 or 503 response overrides this delay,
+        but is limited to *max_delay* as well.
+
+        :param max_attempts: Maximum number of attempts (including the first one).
+        :param base_delay: Upper bound of the delay before the first retry in seconds.
+        :param max_delay: Upper bound of any delay in seconds.
+        :param deadline: (optional) Overall time budget of a call in seconds, including
+            all attempts and delays. The timeout of each attempt is cut to the remaining
+            budget and no attempt is started, which cannot finish in time.
+        :param retry_statuses: The HTTP status codes which are retried.
+        :param respect_retry_after: Use the ``Retry-After`` header of 429 and 503 responses.
+        :param retry_connection_errors: Retry, if the connection could not be established
+            or was reset. Timeouts are always retried.
+        :param delays: (optional) Fixed delays before the retries instead of the jittered backoff,
+            see :meth:`fromDelays`.
+        :param min_attempt_timeout: The smallest timeout of an attempt in seconds.
+            With a deadline, the call gives up, when less than this budget remains.
+        """
+        super().__init__()
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        if delays is not None and len(delays) < max_attempts - 1:
+            raise ValueError("delays must provide a delay for each retry")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+        self.respect_retry_after = respect_retry_after
+        self.retry_connection_errors = retry_connection_errors
+        self.delays = tuple(delays) if delays is not None else None
+        self.min_attempt_timeout = min_attempt_timeout
+
+    @classmethod
+    def fromDelays(cls, delays: t.Sequence[float], **kwargs: t.Any) -> t.Self:
+        """Build a policy with a fixed ladder of delays, like the former ``retryDelays``.
+
+        :param delays: The delays in seconds before the retries,
+            the call is attempted ``len(delays) + 1`` times.
+        """
+        delays = tuple(delays)
+        kwargs.setdefault("max_delay", max(delays, default=0))
+        return cls(max_attempts=len(delays) + 1, delays=delays, **kwargs)
+
+    @property
+    def ladder(self) -> tuple[float, ...]:
+        """The upper bounds of the delays before the retries."""
+        if self.delays is not None:
+            return self.delays
+        return tuple(min(self.max_delay, self.base_delay * 2 ** retry) for retry in range(self.max_attempts - 1))
+
+    def start(self) -> "RetryState":
+        """Start tracking the attempts of a new call."""
+        return RetryState(self)
+
+    def backoff(self, retry: int) -> float:
+        """Compute the jittered delay before a retry.
+
+        :param retry: Number of the retry (starting at 1).
+        """
+        if self.delays is not None:
+            return self.delays[retry - 1]
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    @staticmethod
+    def parseRetryAfter(value: str | None) -> float | None:
+        """Parse the value of a ``Retry-After`` header.
+
+        :param value: Delay in seconds or an HTTP date.
+        :return: The delay in seconds or None, if the value is invalid.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=datetime.timezone.utc)
+        return max(0.0, (date - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+    def __repr__(self) -> str:
+        return "%s.%s(max_attempts=%r, base_delay=%r, max_delay=%r, deadline=%r)" % (
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.max_attempts,
+            self.base_delay,
+            self.max_delay,
+            self.deadline,
+        )
+
+
+class RetryState:
+    def __init__(self, policy: RetryPolicy):
+        """The attempts of one call, created by :meth:`RetryPolicy.start`."""
+        super().__init__()
+        self.policy = policy
+        self.attempt = 0
+        self.started = time.monotonic()
+
+    @property
+    def remaining(self) -> float | None:
+        """The remaining time budget in seconds or None, if there is no deadline."""
+        if self.policy.deadline is None:
+            return None
+        return max(0.0, self.policy.deadline - (time.monotonic() - self.started))
+
+    def canAttempt(self) -> bool:
+        """Decide, whether the remaining budget allows another attempt."""
+        remaining = self.remaining
+        return remaining is None or remaining > self.policy.min_attempt_timeout
+
+    def attemptTimeout(self, timeout: float) -> float:
+        """Limit the timeout of the next attempt to the remaining budget.
+
+        The timeout is never below :attr:`RetryPolicy.min_attempt_timeout`,
+        check :meth:`canAttempt` before.
+        """
+        self.attempt += 1
+        remaining = self.remaining
+        if remaining is None:
+            return timeout
+        return max(self.policy.min_attempt_timeout, min(timeout, remaining))
+
+    def nextDelay(self, response: "TransportResponse | None" = None) -> float | None:
+        """Decide, whether the call is retried after a failed attempt.
+
+        :param response: The response of the failed attempt, None in case of a network error.
+        :return: The delay in seconds before the next attempt or None to give up.
+        """
+        if self.attempt >= self.policy.max_attempts:
+            return None
+        delay = None
+        if (self.policy.respect_retry_after and response is not None
+                and response.status_code in {429, 503}):
+            delay = self.policy.parseRetryAfter(response.headers.get("retry-after"))
+            if delay is not None:
+                delay = min(delay, self.policy.max_delay)
+        if delay is None:
+            delay = self.policy.backoff(self.attempt)
+        remaining = self.remaining
+        if remaining is not None and delay + self.policy.min_attempt_timeout >= remaining:
+            return None
+        return delay
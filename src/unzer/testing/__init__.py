@@ -0,0 +1,8 @@
+from .fakeserver import FakeError, FakeUnzer, FakeUnzerServer, Latency
+
+__all__ = [
+    "FakeError",
+    "FakeUnzer",
+    "FakeUnzerServer",
+    "Latency",
+]
@@ -0,0 +1,3 @@
+from .fakeserver import main
+
+main()
@@ -0,0 +1,764 @@
+import argparse
+import base64
+import copy
+import datetime
+import http.server
+import itertools
+import json
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+import typing as t
+
+from ..hooks import operationLabel
+from ..model.payment import PaymentMethodTypes, PaymentState, PaymentTypes
+from ..model.payment_type import PaymentType
+
+logger = logging.getLogger("unzer-sdk").getChild(__name__)
+
+# the transaction urls are always absolute to the real API, the models parse them
+API_URL = "https://api.unzer.com/v1"
+
+# payment methods, whose transactions stay pending until the customer returns from the redirect
+REDIRECT_METHODS = frozenset({
+    "paypal",
+    "sofort",
+    "klarna",
+    "ideal",
+    "bancontact",
+    "przelewy24",
+    "EPS",
+    "twint",
+    "alipay",
+    "wechatpay",
+    "post-finance-efinance",
+    "openbanking-pis",
+})
+
+SUCCESS_MESSAGE = {
+    "code": "COR.000.100.112",
+    "merchant": "Request successfully processed in 'Merchant in Connector Test Mode'",
+    "customer": "Your payments have been successfully processed in sandbox mode.",
+}
+
+PENDING_MESSAGE = {
+    "code": "COR.000.200.000",
+    "merchant": "Transaction pending",
+    "customer": "Your payment is currently pending. Please contact us for more information.",
+}
+
+
+class FakeError(Exception):
+    def __init__(self, status: int, code: str, merchantMessage: str, customerMessage: str = None):
+        """An error response of the fake API."""
+        super().__init__(merchantMessage)
+        self.status = status
+        self.code = code
+        self.merchantMessage = merchantMessage
+        self.customerMessage = customerMessage or "An error occurred. Please contact the merchant."
+
+
+class Latency:
+    def __init__(self, base: float = 0.0, jitter: float = 0.0, per_operation: dict[str, float] = None):
+        """The simulated server time of the requests.
+
+        Each request takes the base latency of its operation plus a random jitter.
+
+        :param base: Latency of all operations in seconds.
+        :param jitter: Upper bound of the random additional latency in seconds.
+        :param per_operation: Latency of single operations, by their label
+            (see :func:`operationLabel`, e.g. ``POST payments/{id}/charges``).
+        """
+        super().__init__()
+        self.base = base
+        self.jitter = jitter
+        self.per_operation = per_operation or {}
+
+    def delay(self, label: str) -> float:
+        delay = self.per_operation.get(label, self.base)
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        return delay
+
+
+class FakeUnzer:
+    """An in-memory imitation of the Unzer API for load and end-to-end tests.
+
+    Implements the endpoints used by :class:`UnzerClient` with the payment state machine:
+    an authorization makes a pending payment, charges raise the charged amount up to the
+    authorized one (``partly``, then ``completed``), cancels of charges refund and cancels of
+    the authorization reverse it (``canceled``). Transactions of redirect methods
+    (e.g. PayPal) stay pending until :meth:`completeRedirect` is called.
+
+    Use it through :class:`FakeUnzerServer` or call :meth:`handle` directly.
+    """
+
+    def __init__(
+            self,
+            public_key: str = "s-pub-fake",
+            currencies: t.Iterable[str] = ("EUR", "CHF", "USD", "GBP"),
+            payment_methods: t.Iterable[PaymentMethodTypes] = tuple(PaymentMethodTypes),
+    ):
+        """Create a new fake.
+
+        :param public_key: The public key of the fake keypair.
+        :param currencies: The currencies supported by all payment methods.
+        :param payment_methods: The payment methods configured in the fake keypair.
+        """
+        super().__init__()
+        self.public_key = public_key
+        self.currencies = list(currencies)
+        self.payment_methods = list(payment_methods)
+        self.customers: dict[str, dict] = {}
+        self.baskets: dict[str, dict] = {}
+        self.types: dict[str, dict] = {}
+        self.payments: dict[str, dict] = {}
+        self.paypages: dict[str, dict] = {}
+        self.webhooks: dict[str, dict] = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.RLock()
+        self.routes: list[tuple[str, re.Pattern, t.Callable[..., t.Any]]] = [
+            ("GET", re.compile(r"keypair"), self.getKeyPair),
+            ("GET", re.compile(r"keypair/types"), self.getKeyPairTypes),
+            ("POST", re.compile(r"customers"), self.createCustomer),
+            ("GET", re.compile(r"customers/(?P<codeOrExternalId>[^/]+)"), self.getCustomer),
+            ("PUT", re.compile(r"customers/(?P<codeOrExternalId>[^/]+)"), self.updateCustomer),
+            ("DELETE", re.compile(r"customers/(?P<codeOrExternalId>[^/]+)"), self.deleteCustomer),
+            ("POST", re.compile(r"baskets"), self.createBasket),
+            ("GET", re.compile(r"baskets/(?P<basketId>[^/]+)"), self.getBasket),
+            ("PUT", re.compile(r"baskets/(?P<basketId>[^/]+)"), self.updateBasket),
+            ("GET", re.compile(r"types/(?P<typeId>[sp]-[a-z0-9]+-[^/]+)"), self.getType),
+            ("POST", re.compile(r"types/(?P<method>[^/]+)"), self.createType),
+            ("POST", re.compile(r"payments/(?P<action>authorize|charges)"), self.createPayment),
+            ("GET", re.compile(r"payments/(?P<codeOrOrderId>[^/]+)"), self.getPayment),
+            ("POST", re.compile(r"payments/(?P<paymentId>[^/]+)/(?P<action>authorize|charges)"), self.createPayment),
+            ("GET", re.compile(r"payments/(?P<codeOrOrderId>[^/]+)/charges(?:/(?P<txnCode>[^/]+))?"), self.getCharge),
+            ("POST", re.compile(r"payments/(?P<paymentId>[^/]+)/authorize/[^/]+/cancels"), self.cancelAuthorization),
+            ("POST", re.compile(r"payments/(?P<paymentId>[^/]+)/charges/(?P<txnCode>[^/]+)/cancels"),
+             self.cancelCharge),
+            ("POST", re.compile(r"paypage/(?P<action>charge|authorize)"), self.createPaymentPage),
+            ("GET", re.compile(r"paypage/(?P<payPageId>[^/]+)"), self.getPaymentPage),
+            ("GET", re.compile(r"webhooks"), self.listWebhooks),
+            ("POST", re.compile(r"webhooks"), self.createWebhooks),
+            ("DELETE", re.compile(r"webhooks"), self.deleteAllWebhooks),
+            ("GET", re.compile(r"webhooks/(?P<webhookId>[^/]+)"), self.getWebhook),
+            ("PUT", re.compile(r"webhooks/(?P<webhookId>[^/]+)"), self.updateWebhook),
+            ("DELETE", re.compile(r"webhooks/(?P<webhookId>[^/]+)"), self.deleteWebhook),
+            ("POST", re.compile(r"_fake/payments/(?P<paymentId>[^/]+)/complete"), self.completeRedirect),
+        ]
+
+    # --- Helpers ---
+
+    def _newId(self, prefix: str) -> str:
+        return "s-%s-%d" % (prefix, next(self._counter))
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    @staticmethod
+    def _amount(value: t.Any) -> str:
+        return "%.4f" % float(value or 0)
+
+    def _error(self, status: int, code: str, merchantMessage: str) -> t.NoReturn:
+        raise FakeError(status, code, merchantMessage)
+
+    def errorBody(self, exc: FakeError, url: str) -> dict:
+        """The body of an error response."""
+        return {
+            "id": "s-err-%s" % secrets.token_hex(12),
+            "url": url,
+            "timestamp": self._now(),
+            "isSuccess": False,
+            "isPending": False,
+            "isError": True,
+            "errors": [{
+                "code": exc.code,
+                "merchantMessage": exc.merchantMessage,
+                "customerMessage": exc.customerMessage,
+            }],
+        }
+
+    def handle(self, method: str, operation: str, payload: t.Any = None, auth: str = None) -> t.Any:
+        """Handle a request.
+
+        :param method: The HTTP method.
+        :param operation: The URL path relative to the endpoint (e.g. ``payments/s-pay-1``).
+        :param payload: The decoded JSON body.
+        :param auth: The user of the basic authentication (the private key).
+        :return: The JSON data of the response, a snapshot which is
+            safe to serialize while other requests modify the state.
+        :raises FakeError: In case of an error response.
+        """
+        if not auth or "-priv-" not in auth:
+            self._error(401, "API.320.000.004", "Access denied: private key is missing or invalid.")
+        operation = operation.strip("/")
+        for routeMethod, pattern, handler in self.routes:
+            if routeMethod == method and (match := pattern.fullmatch(operation)):
+                with self._lock:
+                    # handlers return the live state (e.g. a stored customer)
+                    return copy.deepcopy(handler(payload or {}, **match.groupdict()))
+        self._error(404, "API.000.000.001", "Resource %s %s not found." % (method, operation))
+
+    # --- Keypair ---
+
+    def getKeyPair(self, payload: dict) -> dict:
+        return {
+            "publicKey": self.public_key,
+            "secureLevel": "SAQ-A",
+            "alias": "fake",
+            "merchantName": "Fake Merchant",
+            "merchantAddress": "Vangerowstraße 18, 69115 Heidelberg",
+            "availablePaymentTypes": [method.value for method in self.payment_methods],
+        }
+
+    def getKeyPairTypes(self, payload: dict) -> dict:
+        data = self.getKeyPair(payload)
+        data.pop("availablePaymentTypes")
+        data["paymentTypes"] = [
+            {
+                "type": method.value,
+                "allowCustomerTypes": "BOTH",
+                "allowCreditTransaction": method == PaymentMethodTypes.CARD,
+                "3ds": method == PaymentMethodTypes.CARD,
+                "supports": [{
+                    "brands": ["VISA", "MASTER"] if method == PaymentMethodTypes.CARD else [],
+                    "countries": [],
+                    "channel": "31HA07BC8142C5A171744F3D6D155865",
+                    "currency": self.currencies,
+                }],
+            }
+            for method in self.payment_methods
+        ]
+        return data
+
+    # --- Customers ---
+
+    def _findCustomer(self, codeOrExternalId: str) -> dict:
+        if (customer := self.customers.get(codeOrExternalId)) is not None:
+            return customer
+        for customer in self.customers.values():
+            if customer["customerId"] and customer["customerId"] == codeOrExternalId:
+                return customer
+        self._error(404, "API.410.100.100", "Customer %s not found." % codeOrExternalId)
+
+    @staticmethod
+    def _address(data: t.Any) -> dict:
+        address = {"name": "", "street": "", "state": "", "zip": "", "city": "", "country": ""}
+        if isinstance(data, dict):
+            address.update(data)
+        return address
+
+    def _storeCustomer(self, key: str, payload: dict) -> dict:
+        customer = dict(payload)
+        customer["id"] = key
+        customer.setdefault("customerId", "")
+        customer["billingAddress"] = self._address(customer.get("billingAddress"))
+        customer["shippingAddress"] = self._address(customer.get("shippingAddress"))
+        self.customers[key] = customer
+        return {"id": key}
+
+    def createCustomer(self, payload: dict) -> dict:
+        if not payload.get("lastname"):
+            self._error(400, "API.410.200.001", "lastname is missing.")
+        if customerId := payload.get("customerId"):
+            for customer in self.customers.values():
+                if customer["customerId"] == customerId:
+                    self._error(400, "API.410.200.010", "Customer with customerId %s already exists." % customerId)
+        return self._storeCustomer(self._newId("cst"), payload)
+
+    def getCustomer(self, payload: dict, codeOrExternalId: str) -> dict:
+        return self._findCustomer(codeOrExternalId)
+
+    def updateCustomer(self, payload: dict, codeOrExternalId: str) -> dict:
+        customer = self._findCustomer(codeOrExternalId)
+        return self._storeCustomer(customer["id"], customer | payload)
+
+    def deleteCustomer(self, payload: dict, codeOrExternalId: str) -> dict:
+        customer = self._findCustomer(codeOrExternalId)
+        del self.customers[customer["id"]]
+        return {"id": customer["id"]}
+
+    # --- Baskets ---
+
+    def _findBasket(self, basketId: str) -> dict:
+        if (basket := self.baskets.get(basketId)) is None:
+            self._error(404, "API.600.100.001", "Basket %s not found." % basketId)
+        return basket
+
+    def createBasket(self, payload: dict) -> dict:
+        if not payload.get("orderId"):
+            self._error(400, "API.600.200.001", "orderId is missing.")
+        basketId = self._newId("bsk")
+        self.baskets[basketId] = payload | {"id": basketId}
+        return {"id": basketId}
+
+    def getBasket(self, payload: dict, basketId: str) -> dict:
+        return self._findBasket(basketId)
+
+    def updateBasket(self, payload: dict, basketId: str) -> dict:
+        self.baskets[basketId] = self._findBasket(basketId) | payload | {"id": basketId}
+        return {"id": basketId}
+
+    # --- Types ---
+
+    @staticmethod
+    def _shortCode(method: str) -> str:
+        if (subclass := PaymentType.lookup(method)) is not None:
+            return subclass.method.value
+        try:
+            return PaymentTypes(method).value
+        except ValueError:
+            return method.replace("-", "")[:3].lower()
+
+    def createType(self, payload: dict, method: str) -> dict:
+        try:
+            method = PaymentMethodTypes(method).value
+        except ValueError:
+            pass
+        typeId = "s-%s-%s" % (self._shortCode(method), secrets.token_hex(6))
+        self.types[typeId] = payload | {"id": typeId, "method": method}
+        return self.types[typeId]
+
+    def getType(self, payload: dict, typeId: str) -> dict:
+        if (paymentType := self.types.get(typeId)) is None:
+            self._error(404, "API.500.100.100", "Payment type %s not found." % typeId)
+        return paymentType
+
+    # --- Payments ---
+
+    def _findPayment(self, codeOrOrderId: str) -> dict:
+        if (payment := self.payments.get(codeOrOrderId)) is not None:
+            return payment
+        for payment in self.payments.values():
+            if payment["orderId"] and payment["orderId"] == codeOrOrderId:
+                return payment
+        self._error(404, "API.310.100.003", "Payment %s not found." % codeOrOrderId)
+
+    def _newPayment(self, payload: dict) -> dict:
+        paymentId = self._newId("pay")
+        payment = {
+            "id": paymentId,
+            "state": PaymentState.PENDING,
+            "currency": payload.get("currency") or "EUR",
+            "orderId": payload.get("orderId") or "",
+            "invoiceId": payload.get("invoiceId") or "",
+            "authorized": 0.0,
+            "charged": 0.0,
+            "canceled": 0.0,
+            "resources": {
+                "customerId": "",
+                "paymentId": paymentId,
+                "basketId": "",
+                "metadataId": "",
+                "payPageId": "",
+                "traceId": secrets.token_hex(16),
+                "typeId": "",
+            },
+            "transactions": [],
+        }
+        self.payments[paymentId] = payment
+        return payment
+
+    def _validateResources(self, payload: dict) -> dict:
+        resources = payload.get("resources") or {}
+        if not resources.get("typeId"):
+            self._error(400, "API.320.200.138", "typeId is missing.")
+        self.getType({}, resources["typeId"])
+        if resources.get("customerId"):
+            self._findCustomer(resources["customerId"])
+        if resources.get("basketId"):
+            self._findBasket(resources["basketId"])
+        return resources
+
+    def _addTransaction(self, payment: dict, kind: str, amount: float, payload: dict, pending: bool,
+                        parent: dict = None) -> dict:
+        prefix = {"authorize": "aut", "charge": "chg", "cancel-authorize": "cnl", "cancel-charge": "cnl"}[kind]
+        code = "%s-%d" % (prefix, len([txn for txn in payment["transactions"] if txn["prefix"] == prefix]) + 1)
+        path = {
+            "authorize": "authorize/s-%s" % code,
+            "charge": "charges/s-%s" % code,
+        }.get(kind) or "%s/cancels/s-%s" % (parent["path"], code)
+        txn = {
+            "id": "s-%s" % code,
+            "prefix": prefix,
+            "path": path,
+            "type": kind,
+            "status": "pending" if pending else "success",
+            "amount": float(amount),
+            "date": self._now(),
+            "payload": payload,
+            "participantId": "31HA07BC8142C5A171744F3D6D155865",
+        }
+        payment["transactions"].append(txn)
+        return txn
+
+    def _updateState(self, payment: dict) -> None:
+        """Derive the state of a payment from its amounts."""
+        if any(txn["status"] == "pending" for txn in payment["transactions"]):
+            payment["state"] = PaymentState.PENDING
+        elif payment["charged"] and payment["canceled"] >= payment["charged"]:
+            payment["state"] = PaymentState.CANCELED
+        elif not payment["charged"] and payment["canceled"] >= payment["authorized"] > 0:
+            payment["state"] = PaymentState.CANCELED
+        elif payment["charged"] and payment["charged"] >= payment["authorized"]:
+            payment["state"] = PaymentState.COMPLETED
+        elif payment["charged"]:
+            payment["state"] = PaymentState.PARTLY
+        else:
+            payment["state"] = PaymentState.PENDING
+
+    def _transactionBody(self, payment: dict, txn: dict) -> dict:
+        """The body of a transaction response (see :class:`PaymentResponse`)."""
+        payload = txn["payload"]
+        pending = txn["status"] == "pending"
+        return {
+            "id": txn["id"],
+            "isSuccess": txn["status"] == "success",
+            "isPending": pending,
+            "isError": txn["status"] == "error",
+            "redirectUrl": "%s/_fake/redirect/%s" % (API_URL, payment["id"]) if pending else "",
+            "message": PENDING_MESSAGE if pending else SUCCESS_MESSAGE,
+            "amount": self._amount(txn["amount"]),
+            "currency": payment["currency"],
+            "returnUrl": payload.get("returnUrl") or "",
+            "date": txn["date"],
+            "resources": payment["resources"],
+            "orderId": payment["orderId"],
+            "invoiceId": payment["invoiceId"],
+            "paymentReference": payload.get("paymentReference") or "",
+            "processing": {
+                "uniqueId": txn["id"].upper().replace("-", ""),
+                "shortId": "%04d.%04d.%04d" % (random.randrange(10000), random.randrange(10000),
+                                               random.randrange(10000)),
+                "traceId": payment["resources"]["traceId"],
+            },
+        }
+
+    def createPayment(self, payload: dict, action: str, paymentId: str = None) -> dict:
+        amount = float(payload.get("amount") or 0)
+        if amount <= 0:
+            self._error(400, "API.340.100.024", "amount must be greater than 0.")
+        if payload.get("currency") and payload["currency"] not in self.currencies:
+            self._error(400, "API.340.100.018", "currency %s is not supported." % payload["currency"])
+        if paymentId is None:  # a new payment
+            resources = self._validateResources(payload)
+            if payload.get("orderId"):
+                for other in self.payments.values():
+                    if other["orderId"] == payload["orderId"]:
+                        self._error(400, "API.340.100.014", "orderId %s already exists." % payload["orderId"])
+            payment = self._newPayment(payload)
+            payment["resources"].update({key: value or "" for key, value in resources.items()})
+        else:  # charge an authorized payment
+            payment = self._findPayment(paymentId)
+            if action == "authorize":
+                self._error(400, "API.330.100.007", "Payment %s is already authorized." % paymentId)
+            if payment["state"] not in {PaymentState.PENDING, PaymentState.PARTLY} or not payment["authorized"]:
+                self._error(400, "API.340.100.010", "Payment %s cannot be charged." % paymentId)
+            if payment["charged"] + amount > payment["authorized"] + 1e-9:
+                self._error(400, "API.340.200.100", "Amount exceeds the authorized amount.")
+        method = self.types[payment["resources"]["typeId"]]["method"]
+        pending = paymentId is None and method in REDIRECT_METHODS
+        if action == "authorize":
+            txn = self._addTransaction(payment, "authorize", amount, payload, pending)
+            if not pending:
+                payment["authorized"] += amount
+        else:
+            txn = self._addTransaction(payment, "charge", amount, payload, pending)
+            if paymentId is None:
+                payment["authorized"] += amount
+            if not pending:
+                payment["charged"] += amount
+        self._updateState(payment)
+        return self._transactionBody(payment, txn)
+
+    def completeRedirect(self, payload: dict, paymentId: str) -> dict:
+        """Let the pending transactions of a payment succeed, as if the customer returned from the redirect."""
+        payment = self._findPayment(paymentId)
+        for txn in payment["transactions"]:
+            if txn["status"] != "pending":
+                continue
+            txn["status"] = "success"
+            if txn["type"] == "authorize":
+                payment["authorized"] += txn["amount"]
+            elif txn["type"] == "charge":
+                payment["charged"] += txn["amount"]
+        self._updateState(payment)
+        return self.getPayment({}, paymentId)
+
+    def getPayment(self, payload: dict, codeOrOrderId: str) -> dict:
+        payment = self._findPayment(codeOrOrderId)
+        total = payment["authorized"] - (payment["canceled"] if not payment["charged"] else 0.0)
+        return {
+            "id": payment["id"],
+            "state": {"id": payment["state"].value, "name": payment["state"].name.lower()},
+            "amount": {
+                "total": self._amount(total),
+                "charged": self._amount(payment["charged"]),
+                "canceled": self._amount(payment["canceled"]),
+                "remaining": self._amount(max(0.0, total - payment["charged"])),
+            },
+            "currency": payment["currency"],
+            "orderId": payment["orderId"],
+            "invoiceId": payment["invoiceId"],
+            "resources": payment["resources"],
+            "transactions": [
+                {
+                    "date": txn["date"],
+                    "type": txn["type"],
+                    "status": txn["status"],
+                    "url": "%s/payments/%s/%s" % (API_URL, payment["id"], txn["path"]),
+                    "amount": self._amount(txn["amount"]),
+                    "participantId": txn["participantId"],
+                }
+                for txn in payment["transactions"]
+            ],
+        }
+
+    def getCharge(self, payload: dict, codeOrOrderId: str, txnCode: str = None) -> dict:
+        payment = self._findPayment(codeOrOrderId)
+        for txn in payment["transactions"]:
+            if txn["type"] == "charge" and (not txnCode or txn["id"] == txnCode):
+                return self._transactionBody(payment, txn)
+        self._error(404, "API.340.100.005", "Charge %s not found." % txnCode)
+
+    def cancelCharge(self, payload: dict, paymentId: str, txnCode: str) -> dict:
+        payment = self._findPayment(paymentId)
+        for charge in payment["transactions"]:
+            if charge["type"] == "charge" and charge["id"] == txnCode:
+                break
+        else:
+            self._error(404, "API.340.100.005", "Charge %s not found." % txnCode)
+        if charge["status"] != "success":
+            self._error(400, "API.340.100.011", "Charge %s cannot be canceled." % txnCode)
+        refunded = sum(txn["amount"] for txn in payment["transactions"]
+                       if txn["type"] == "cancel-charge" and txn["path"].startswith(charge["path"] + "/"))
+        amount = float(payload.get("amount") or charge["amount"] - refunded)
+        if amount <= 0 or refunded + amount > charge["amount"] + 1e-9:
+            self._error(400, "API.340.200.110", "Amount exceeds the charged amount.")
+        txn = self._addTransaction(payment, "cancel-charge", amount, payload, False, parent=charge)
+        payment["canceled"] += amount
+        self._updateState(payment)
+        return self._transactionBody(payment, txn)
+
+    def cancelAuthorization(self, payload: dict, paymentId: str) -> dict:
+        payment = self._findPayment(paymentId)
+        authorization = next((txn for txn in payment["transactions"] if txn["type"] == "authorize"), None)
+        if authorization is None or payment["state"] not in {PaymentState.PENDING, PaymentState.PARTLY}:
+            self._error(400, "API.340.100.012", "Payment %s cannot be reversed." % paymentId)
+        remaining = payment["authorized"] - payment["charged"] - (payment["canceled"] if not payment["charged"] else 0)
+        amount = float(payload.get("amount") or remaining)
+        if amount <= 0 or amount > remaining + 1e-9:
+            self._error(400, "API.340.200.110", "Amount exceeds the remaining amount.")
+        txn = self._addTransaction(payment, "cancel-authorize", amount, payload, False, parent=authorization)
+        if payment["charged"]:
+            payment["authorized"] -= amount  # the rest of a partly charged payment
+        else:
+            payment["canceled"] += amount
+        self._updateState(payment)
+        return self._transactionBody(payment, txn)
+
+    # --- Payment pages ---
+
+    def createPaymentPage(self, payload: dict, action: str) -> dict:
+        payPageId = self._newId("ppg")
+        payment = self._newPayment(payload)
+        payment["authorized"] = 0.0
+        resources = payload.get("resources") or {}
+        payment["resources"].update({key: value or "" for key, value in resources.items()})
+        payment["resources"]["payPageId"] = payPageId
+        page = payload | {
+            "id": payPageId,
+            "action": action.upper(),
+            "redirectUrl": "%s/_fake/paypage/%s" % (API_URL, payPageId),
+            "card3ds": str(bool(payload.get("card3ds"))).lower(),
+            "billingAddressRequired": "false",
+            "shippingAddressRequired": "false",
+            "resources": resources | {"paymentId": payment["id"]},
+        }
+        self.paypages[payPageId] = page
+        return page
+
+    def getPaymentPage(self, payload: dict, payPageId: str) -> dict:
+        if (page := self.paypages.get(payPageId)) is None:
+            self._error(404, "API.100.100.001", "Payment page %s not found." % payPageId)
+        return page
+
+    # --- Webhooks ---
+
+    def _findWebhook(self, webhookId: str) -> dict:
+        if (webhook := self.webhooks.get(webhookId)) is None:
+            self._error(404, "API.510.310.009", "Webhook %s not found." % webhookId)
+        return webhook
+
+    def listWebhooks(self, payload: dict) -> dict:
+        return {"events": list(self.webhooks.values())}
+
+    def createWebhooks(self, payload: dict) -> dict:
+        if not payload.get("url"):
+            self._error(400, "API.510.200.003", "url is missing.")
+        events = payload.get("eventList") or [payload.get("event") or "all"]
+        created = []
+        for event in events:
+            webhookId = self._newId("whk")
+            self.webhooks[webhookId] = {"id": webhookId, "url": payload["url"], "event": event}
+            created.append(self.webhooks[webhookId])
+        return {"events": created}
+
+    def getWebhook(self, payload: dict, webhookId: str) -> dict:
+        return self._findWebhook(webhookId)
+
+    def updateWebhook(self, payload: dict, webhookId: str) -> dict:
+        webhook = self._findWebhook(webhookId)
+        webhook["url"] = payload.get("url") or webhook["url"]
+        return webhook
+
+    def deleteWebhook(self, payload: dict, webhookId: str) -> dict:
+        self._findWebhook(webhookId)
+        del self.webhooks[webhookId]
+        return {"id": webhookId}
+
+    def deleteAllWebhooks(self, payload: dict) -> dict:
+        deleted = [{"id": webhookId} for webhookId in self.webhooks]
+        self.webhooks.clear()
+        return {"events": deleted}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True  # don't hold back the body until the headers are acknowledged
+    wbufsize = -1  # send the headers and the body at once
+    server: "FakeUnzerServer"
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("content-length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = self.path.split("?", 1)[0]
+        if not path.startswith("/v1/"):
+            self._send(404, {"error": "Unknown path %s" % path})
+            return
+        operation = path.removeprefix("/v1/")
+        time.sleep(self.server.latency.delay(operation and operationLabel(self.command, operation)))
+        try:
+            payload = json.loads(body) if body else None
+            data = self.server.fake.handle(self.command, operation, payload, self._user())
+        except FakeError as exc:
+            self._send(exc.status, self.server.fake.errorBody(exc, "%s/%s" % (API_URL, operation)))
+        except ValueError as exc:
+            self._send(400, self.server.fake.errorBody(
+                FakeError(400, "API.000.000.999", "Invalid JSON: %s" % exc), "%s/%s" % (API_URL, operation)))
+        else:
+            self._send(200 if self.command != "POST" else 201, data)
+
+    def _user(self) -> str | None:
+        authorization = self.headers.get("authorization") or ""
+        if not authorization.lower().startswith("basic "):
+            return None
+        try:
+            return base64.b64decode(authorization[6:]).decode("utf-8").split(":", 1)[0]
+        except ValueError:
+            return None
+
+    def _send(self, status: int, data: t.Any) -> None:
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+    def log_message(self, format: str, *args: t.Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class FakeUnzerServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            fake: FakeUnzer = None,
+            latency: Latency = None,
+    ):
+        """Serve a :class:`FakeUnzer` over HTTP.
+
+        Point a client at it with ``client.endpoint = server.endpoint``::
+
+            with FakeUnzerServer(latency=Latency(0.05, jitter=0.02)) as server:
+                client = UnzerClient("s-priv-test", "s-pub-test")
+                client.endpoint = server.endpoint
+                ...
+
+        :param host: The interface to listen on.
+        :param port: The port, 0 picks a free one.
+        :param fake: (optional) The fake API, a new one by default.
+        :param latency: (optional) The simulated server latency, none by default.
+        """
+        super().__init__((host, port), _Handler)
+        self.fake = fake if fake is not None else FakeUnzer()
+        self.latency = latency if latency is not None else Latency()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def endpoint(self) -> str:
+        """The endpoint for :attr:`UnzerClient.endpoint`."""
+        host, port = self.server_address[:2]
+        return "http://%s:%d/v1" % (host, port)
+
+    def start(self) -> t.Self:
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name="FakeUnzerServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> t.Self:
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m unzer.testing",
+        description="Serve a local imitation of the Unzer API for load and end-to-end tests.",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="The interface to listen on.")
+    parser.add_argument("--port", type=int, default=8080, help="The port to listen on.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latency of all requests in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Upper bound of the random additional latency.")
+    parser.add_argument(
+        "--operation-latency", action="append", default=[], metavar="LABEL=SECONDS",
+        help='Latency of one operation, e.g. "POST payments/{id}/charges=0.3". Can be repeated.',
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request.")
+    args = parser.parse_args(argv)
+
+    perOperation = {}
+    for value in args.operation_latency:
+        label, _, seconds = value.rpartition("=")
+        perOperation[label] = float(seconds)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    server = FakeUnzerServer(args.host, args.port, latency=Latency(args.latency, args.jitter, perOperation))
+    print("Serving the fake Unzer API at %s" % server.endpoint, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,886 @@
+import abc
+import asyncio
+import hashlib
+import http
+import json
+import math
+import random
+import re
+import threading
+import time
+import typing as t
+import weakref
+
+import requests
+import requests.adapters
+import urllib3
+import urllib3.connection
+from urllib3.exceptions import TimeoutError
+
+from .instrumentation import PERSONAL_KEYS, SENSITIVE_KEYS, redact
+from .profiling import CallProfile, currentProfile
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class TransportError(IOError):
+    """Base class of all network errors raised by a transport."""
+
+
+class TransportTimeout(TransportError):
+    """The request timed out (connect or read)."""
+
+
+class TransportConnectionError(TransportError):
+    """The connection could not be established or was reset."""
+
+
+class TransportRequest:
+    def __init__(
+            self,
+            method: str,
+            url: str,
+            headers: dict[str, str],
+            body: bytes | None,
+            auth: tuple[str, str] | None = None,
+            timeout: float | None = None,
+    ):
+        """A request to be sent by a transport.
+
+        :param method: The HTTP method (e.g. POST, GET).
+        :param url: The complete URL.
+        :param headers: The HTTP headers.
+        :param body: The already encoded body.
+        :param auth: The basic authentication for this request.
+        :param timeout: The timeout in seconds.
+        """
+        self.method = method
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.auth = auth
+        self.timeout = timeout
+
+    def __repr__(self) -> str:
+        return "%s.%s(method=%r, url=%r)" % (
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.method,
+            self.url,
+        )
+
+
+class TransportResponse:
+    def __init__(
+            self,
+            status_code: int,
+            content: bytes = b"",
+            reason: str = "",
+            headers: dict[str, str] = None,
+            raw: t.Any = None,
+    ):
+        """A response returned by a transport.
+
+        Provides the commonly used attributes of :class:`requests.Response`.
+
+        :param status_code: The HTTP status code.
+        :param content: The raw body.
+        :param reason: The HTTP reason phrase.
+        :param headers: The HTTP headers (keys are lower-cased).
+        :param raw: The response object of the underlying HTTP library, if any.
+        """
+        self.status_code = status_code
+        self.content = content
+        self.reason = reason
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+        self.raw = raw
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> t.Any:
+        """Decode the body as JSON.
+
+        :raises ValueError: If the body is no valid JSON.
+        """
+        return json.loads(self.content)
+
+    def __repr__(self) -> str:
+        return "%s.%s(status_code=%r, reason=%r)" % (
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self.status_code,
+            self.reason,
+        )
+
+
+class Transport(abc.ABC):
+    """Send a :class:`TransportRequest` and return a :class:`TransportResponse`.
+
+    The clients prepare the request (URL, headers, encoded body)
+    and handle the retries; a transport only performs one exchange.
+    This allows to replace the HTTP stack or to run without any network.
+    Network failures must be raised as :exc:`TransportError`.
+    """
+
+    @abc.abstractmethod
+    def send(self, request: TransportRequest) -> TransportResponse:
+        """Send the request blocking."""
+        pass
+
+    async def asend(self, request: TransportRequest) -> TransportResponse:
+        """Send the request awaitable.
+
+        By default, the blocking :meth:`send` is executed in a worker thread.
+        """
+        return await asyncio.to_thread(self.send, request)
+
+    def close(self) -> None:
+        """Release all resources (e.g. pooled connections)."""
+        pass
+
+    async def aclose(self) -> None:
+        """Release all resources (e.g. pooled connections)."""
+        self.close()
+
+
+def _setupTime(profile: CallProfile) -> float:
+    """The time spent on establishing connections so far."""
+    return profile.phases.get("connect", 0.0) + profile.phases.get("tls", 0.0)
+
+
+class _ProfiledHTTPConnection(urllib3.connection.HTTPConnection):
+    """Connection, which records the connect time in the current :class:`CallProfile`."""
+
+    def _new_conn(self):
+        if (profile := currentProfile.get()) is None:
+            return super()._new_conn()
+        with profile.measure("connect"):
+            return super()._new_conn()
+
+
+class _ProfiledHTTPSConnection(urllib3.connection.HTTPSConnection):
+    """Connection, which records the connect and TLS time in the current :class:`CallProfile`."""
+
+    _new_conn = _ProfiledHTTPConnection._new_conn
+
+    def connect(self):
+        if (profile := currentProfile.get()) is None:
+            return super().connect()
+        setup = _setupTime(profile)
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            profile.add("tls", time.perf_counter() - started - (_setupTime(profile) - setup))
+
+
+class _ProfiledHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _ProfiledHTTPConnection
+
+
+class _ProfiledHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _ProfiledHTTPSConnection
+
+
+class _ProfiledHTTPAdapter(requests.adapters.HTTPAdapter):
+    """Adapter, whose connections record their setup time, see :class:`Profiler`."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _ProfiledHTTPConnectionPool,
+            "https": _ProfiledHTTPSConnectionPool,
+        }
+
+
+class RequestsTransport(Transport):
+    def __init__(
+            self,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+    ):
+        """The default transport, based on a pooled keep-alive :class:`requests.Session`.
+
+        :param pool_connections: Number of connection pools (one per host) to cache.
+        :param pool_maxsize: Maximum number of connections to keep per host.
+        """
+        super().__init__()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._session: requests.Session | None = None
+        self._sessionLock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled HTTP session, created on first use."""
+        if self._session is None:
+            with self._sessionLock:
+                if self._session is None:
+                    self._session = self._createSession()
+        return self._session
+
+    def _createSession(self) -> requests.Session:
+        """Create the :class:`requests.Session` with a sized connection pool."""
+        session = requests.Session()
+        adapter = _ProfiledHTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _send(self, request: TransportRequest, stream: bool = False) -> requests.Response:
+        return self.session.request(
+            request.method,
+            request.url,
+            data=request.body,
+            headers=request.headers,
+            auth=request.auth,
+            verify=True,
+            timeout=request.timeout,
+            stream=stream,
+        )
+
+    def _sendProfiled(self, request: TransportRequest, profile: CallProfile) -> requests.Response:
+        """Send the request and record the time to the first byte and of the body transfer."""
+        setup = _setupTime(profile)
+        started = time.perf_counter()
+        r = self._send(request, stream=True)
+        profile.add("ttfb", time.perf_counter() - started - (_setupTime(profile) - setup))
+        with profile.measure("body"):
+            r.content  # read the body now
+        return r
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        try:
+            if (profile := currentProfile.get()) is None:
+                r = self._send(request)
+            else:
+                r = self._sendProfiled(request, profile)
+        except (TimeoutError, requests.exceptions.Timeout) as exc:
+            raise TransportTimeout(str(exc)) from exc
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as exc:
+            raise TransportConnectionError(str(exc)) from exc
+        return TransportResponse(r.status_code, r.content, r.reason, r.headers, raw=r)
+
+    def close(self) -> None:
+        """Close the session and release all pooled connections.
+
+        The transport can still be used afterwards, a new session will be created.
+        """
+        with self._sessionLock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class _HttpxTrace:
+    """Trace callback of httpx, which records the phases in a :class:`CallProfile`."""
+
+    STEPS = {
+        "connect_tcp": "connect",
+        "start_tls": "tls",
+        "receive_response_body": "body",
+    }
+
+    def __init__(self, profile: CallProfile):
+        super().__init__()
+        self.profile = profile
+        self._started: dict[str, float] = {}
+
+    def record(self, name: str) -> None:
+        now = time.perf_counter()
+        prefix, _, stage = name.rpartition(".")
+        step = prefix.rpartition(".")[2]
+        if stage == "started":
+            self._started[step] = now
+        elif stage in {"complete", "failed"}:
+            if step in self.STEPS and step in self._started:
+                self.profile.add(self.STEPS[step], now - self._started[step])
+            elif step == "receive_response_headers" and "send_request_headers" in self._started:
+                self.profile.add("ttfb", now - self._started["send_request_headers"])
+
+    def __call__(self, name: str, info: dict) -> None:
+        self.record(name)
+
+
+class _AsyncHttpxTrace(_HttpxTrace):
+    async def __call__(self, name: str, info: dict) -> None:
+        self.record(name)
+
+
+class HttpxTransport(Transport):
+    def __init__(
+            self,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+    ):
+        """Transport based on :mod:`httpx`, the default of :class:`AsyncUnzerClient`.
+
+        Requires the optional dependency ``httpx`` (``pip install unzer[async]``).
+
+        :param max_connections: Maximum number of concurrent connections.
+        :param max_keepalive_connections: Maximum number of idle keep-alive connections.
+        """
+        if httpx is None:
+            raise ImportError("HttpxTransport requires httpx. Install it with `pip install unzer[async]`.")
+        super().__init__()
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self._client: httpx.Client | None = None
+        self._asyncClient: httpx.AsyncClient | None = None
+
+    @property
+    def _limits(self) -> "httpx.Limits":
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+        )
+
+    @property
+    def client(self) -> "httpx.Client":
+        """The pooled blocking HTTP client, created on first use."""
+        if self._client is None:
+            self._client = httpx.Client(limits=self._limits, verify=True)
+        return self._client
+
+    @property
+    def asyncClient(self) -> "httpx.AsyncClient":
+        """The pooled async HTTP client, created on first use."""
+        if self._asyncClient is None:
+            self._asyncClient = httpx.AsyncClient(limits=self._limits, verify=True)
+        return self._asyncClient
+
+    @staticmethod
+    def _extensions(trace: type[_HttpxTrace]) -> dict | None:
+        """The request extensions, a trace callback if the call is profiled."""
+        if (profile := currentProfile.get()) is None:
+            return None
+        return {"trace": trace(profile)}
+
+    @staticmethod
+    def _convertResponse(r: "httpx.Response") -> TransportResponse:
+        return TransportResponse(r.status_code, r.content, r.reason_phrase, r.headers, raw=r)
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        try:
+            r = self.client.request(
+                request.method,
+                request.url,
+                content=request.body,
+                headers=request.headers,
+                auth=request.auth,
+                timeout=request.timeout,
+                extensions=self._extensions(_HttpxTrace),
+            )
+        except httpx.TimeoutException as exc:
+            raise TransportTimeout(str(exc)) from exc
+        except httpx.TransportError as exc:
+            raise TransportConnectionError(str(exc)) from exc
+        return self._convertResponse(r)
+
+    async def asend(self, request: TransportRequest) -> TransportResponse:
+        try:
+            r = await self.asyncClient.request(
+                request.method,
+                request.url,
+                content=request.body,
+                headers=request.headers,
+                auth=request.auth,
+                timeout=request.timeout,
+                extensions=self._extensions(_AsyncHttpxTrace),
+            )
+        except httpx.TimeoutException as exc:
+            raise TransportTimeout(str(exc)) from exc
+        except httpx.TransportError as exc:
+            raise TransportConnectionError(str(exc)) from exc
+        return self._convertResponse(r)
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._asyncClient is not None:
+            await self._asyncClient.aclose()
+            self._asyncClient = None
+
+
+Responder: t.TypeAlias = t.Callable[[TransportRequest, re.Match], "TransportResponse | dict | list"]
+
+
+class InMemoryTransport(Transport):
+    def __init__(self, endpoint: str = "https://api.unzer.com/v1"):
+        """Serve canned responses without any network.
+
+        Routes are registered with :meth:`addResponse` and matched in reverse
+        order of their registration, so later routes override earlier ones.
+        All sent requests are kept in :attr:`requests`.
+
+        :param endpoint: The endpoint of the client, the route patterns are relative to it.
+        """
+        super().__init__()
+        self.endpoint = endpoint.rstrip("/")
+        self.routes: list[tuple[str, re.Pattern, Responder | TransportResponse]] = []
+        self.requests: list[TransportRequest] = []
+        self._lock = threading.Lock()
+
+    def addResponse(
+            self,
+            method: str,
+            pattern: str,
+            response: Responder | dict | list | TransportResponse,
+            status_code: int = 200,
+            headers: dict[str, str] = None,
+    ) -> None:
+        """Register a canned response.
+
+        :param method: The HTTP method (e.g. POST, GET).
+        :param pattern: A regular expression, which must match the full operation
+            (the URL path relative to the endpoint, e.g. ``payments/s-pay-\\d+``).
+        :param response: The JSON data of the response, a :class:`TransportResponse`
+            or a callable which gets the :class:`TransportRequest` and the match
+            and returns one of them.
+        :param status_code: The HTTP status code in case of JSON data.
+        :param headers: Additional HTTP headers in case of JSON data.
+        """
+        if not callable(response) and not isinstance(response, TransportResponse):
+            response = self.jsonResponse(response, status_code, headers)
+        with self._lock:
+            self.routes.append((method.upper(), re.compile(pattern), response))
+
+    @staticmethod
+    def jsonResponse(data: t.Any, status_code: int = 200, headers: dict[str, str] = None) -> TransportResponse:
+        """Build a :class:`TransportResponse` with a JSON body."""
+        return TransportResponse(
+            status_code,
+            json.dumps(data).encode("utf-8"),
+            headers={"content-type": "application/json"} | (headers or {}),
+        )
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        operation = request.url.removeprefix(self.endpoint).lstrip("/")
+        with self._lock:
+            self.requests.append(request)
+            routes = list(reversed(self.routes))
+        for method, pattern, response in routes:
+            if method != request.method.upper() or not (match := pattern.fullmatch(operation)):
+                continue
+            if callable(response):
+                response = response(request, match)
+                if not isinstance(response, TransportResponse):
+                    response = self.jsonResponse(response)
+            return response
+        raise LookupError("No response registered for %s %s" % (request.method, operation))
+
+    async def asend(self, request: TransportRequest) -> TransportResponse:
+        return self.send(request)
+
+
+RECORDING_REDACT_KEYS = SENSITIVE_KEYS | PERSONAL_KEYS
+
+
+def _redactBody(body: bytes | str | None, keys: t.Collection[str]) -> str | None:
+    """Redact a JSON body for a recording, other bodies are kept as they are."""
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body
+    return json.dumps(redact(data, keys), sort_keys=True)
+
+
+def _bodyHash(body: str | None) -> str | None:
+    """The hash of a redacted body, requests are matched on it by :class:`ReplayTransport`."""
+    if body is None:
+        return None
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+class RecordingTransport(Transport):
+    def __init__(self, transport: Transport, path: str,
+                 redact_keys: t.Collection[str] = RECORDING_REDACT_KEYS):
+        """Record all exchanges of another transport to a file.
+
+        Each exchange is appended as one JSON line and can be played back
+        with :class:`ReplayTransport`.
+        Headers and the authentication are not recorded, they contain the private key.
+        The values of sensitive keys (card data, bank accounts, personal data of customers)
+        are replaced in the request and response bodies before anything is written,
+        see :func:`redact`. Replays match the requests on the hash of the redacted body,
+        so a replay can't distinguish requests, which differ only in redacted values.
+
+        :param transport: The transport which really performs the requests.
+        :param path: Path of the JSON-lines file.
+        :param redact_keys: Lower-cased keys, whose values are never recorded.
+        """
+        super().__init__()
+        self.transport = transport
+        self.path = path
+        self.redact_keys = frozenset(key.lower() for key in redact_keys)
+        self._lock = threading.Lock()
+
+    def _record(self, request: TransportRequest, response: TransportResponse) -> None:
+        body = _redactBody(request.body, self.redact_keys)
+        exchange = {
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "body": body,
+                "bodyHash": _bodyHash(body),
+            },
+            "response": {
+                "status_code": response.status_code,
+                "reason": response.reason,
+                "headers": {"content-type": response.headers.get("content-type", "application/json")},
+                "body": _redactBody(response.text, self.redact_keys),
+            },
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as fp:
+            fp.write(json.dumps(exchange) + "\n")
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        response = self.transport.send(request)
+        self._record(request, response)
+        return response
+
+    async def asend(self, request: TransportRequest) -> TransportResponse:
+        response = await self.transport.asend(request)
+        self._record(request, response)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class ReplayTransport(Transport):
+    def __init__(self, path: str, loop: bool = False,
+                 redact_keys: t.Collection[str] = RECORDING_REDACT_KEYS):
+        """Play back exchanges recorded by :class:`RecordingTransport`.
+
+        Requests are matched by method, URL and the hash of the redacted body.
+        Identical requests get the responses in the recorded order.
+
+        :param path: Path of the JSON-lines file.
+        :param loop: Start from the first recorded response again
+            when all responses for a request are consumed (e.g. for benchmarks).
+        :param redact_keys: Lower-cased keys, which were redacted by the recording.
+        """
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.redact_keys = frozenset(key.lower() for key in redact_keys)
+        self._exchanges: dict[tuple, list[TransportResponse]] = {}
+        self._positions: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        with open(path, encoding="utf-8") as fp:
+            for line in fp:
+                if not line.strip():
+                    continue
+                exchange = json.loads(line)
+                req, res = exchange["request"], exchange["response"]
+                bodyHash = req.get("bodyHash") or _bodyHash(_redactBody(req["body"], self.redact_keys))
+                self._exchanges.setdefault((req["method"], req["url"], bodyHash), []).append(
+                    TransportResponse(
+                        res["status_code"],
+                        res["body"].encode("utf-8"),
+                        res["reason"],
+                        res["headers"],
+                    )
+                )
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        key = (
+            request.method,
+            request.url,
+            _bodyHash(_redactBody(request.body, self.redact_keys)),
+        )
+        with self._lock:
+            responses = self._exchanges.get(key)
+            if not responses:
+                raise LookupError("No recorded exchange for %s %s" % (request.method, request.url))
+            position = self._positions.get(key, 0)
+            if position >= len(responses):
+                if not self.loop:
+                    raise LookupError("All recorded exchanges for %s %s are consumed"
+                                      % (request.method, request.url))
+                position = 0
+            self._positions[key] = position + 1
+        return responses[position]
+
+    async def asend(self, request: TransportRequest) -> TransportResponse:
+        return self.send(request)
+
+
+LatencyDistribution: t.TypeAlias = t.Callable[[random.Random], float]
+
+
+def constantLatency(seconds: float) -> LatencyDistribution:
+    """Always the same latency, for :class:`FaultInjectionTransport`."""
+    return lambda rng: seconds
+
+
+def uniformLatency(low: float, high: float) -> LatencyDistribution:
+    """A latency evenly distributed between *low* and *high* seconds."""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormalLatency(median: float, sigma: float = 0.5) -> LatencyDistribution:
+    """A long-tailed latency around a median in seconds, like most real services.
+
+    :param sigma: The spread, ``1.0`` makes the p99 ~10 times the median.
+    """
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """The nearest-rank percentile (0..1) of sorted values."""
+    if not values:
+        return math.nan
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+class FaultReport:
+    """The observations of a :class:`FaultInjectionTransport`.
+
+    A call is identified by its :class:`TransportRequest`, the clients reuse it for all
+    attempts. The call latency is measured from the start of the first to the end of the
+    last attempt, so it includes the retry delays.
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+    def __init__(self):
+        super().__init__()
+        self.attempts = 0
+        self.outcomes: dict[str, int] = {}
+        self.attemptLatencies: list[float] = []
+        self._calls: "weakref.WeakKeyDictionary[TransportRequest, list[float]]" = weakref.WeakKeyDictionary()
+        self._callLatencies: list[list[float]] = []
+        self._lock = threading.Lock()
+
+    def record(self, request: TransportRequest, started: float, outcome: str) -> None:
+        """Record a finished attempt.
+
+        :param started: The :func:`time.perf_counter` at the start of the attempt.
+        :param outcome: ``ok``, the injected fault or the status code of a failed response.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            self.attempts += 1
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            self.attemptLatencies.append(now - started)
+            if (call := self._calls.get(request)) is None:
+                call = self._calls[request] = [started, 0.0]
+                self._callLatencies.append(call)
+            call[1] = now - call[0]
+
+    @property
+    def calls(self) -> int:
+        return len(self._callLatencies)
+
+    @property
+    def amplification(self) -> float:
+        """Attempts per call, 1.0 means no retries."""
+        return self.attempts / self.calls if self.calls else math.nan
+
+    def summary(self) -> dict[str, t.Any]:
+        """Get the counts, the retry amplification and the latency percentiles in seconds."""
+        with self._lock:
+            attempts = sorted(self.attemptLatencies)
+            calls = sorted(latency for _, latency in self._callLatencies)
+            data = {
+                "calls": len(calls),
+                "attempts": self.attempts,
+                "amplification": self.amplification,
+                "outcomes": dict(sorted(self.outcomes.items())),
+            }
+        for name, values in (("attempt", attempts), ("call", calls)):
+            data["%s_latency" % name] = {"p%g" % (q * 100): _percentile(values, q) for q in self.QUANTILES}
+            data["%s_latency" % name]["max"] = values[-1] if values else math.nan
+        return data
+
+    def format(self) -> str:
+        """Format the summary as text (times in milliseconds)."""
+        data = self.summary()
+        lines = [
+            "calls: %d, attempts: %d, retry amplification: %.2f" % (
+                data["calls"], data["attempts"], data["amplification"]),
+            "outcomes: %s" % ", ".join("%s=%d" % item for item in data["outcomes"].items()),
+        ]
+        for name in ("attempt", "call"):
+            lines.append("%-8s latency %s" % (name, " ".join(
+                "%s=%.1f" % (key, value * 1000) for key, value in data["%s_latency" % name].items())))
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.attempts = 0
+            self.outcomes.clear()
+            self.attemptLatencies.clear()
+            self._calls.clear()
+            self._callLatencies.clear()
+
+
+class FaultInjectionTransport(Transport):
+    def __init__(
+            self,
+            transport: Transport,
+            latency: LatencyDistribution = None,
+            drop_rate: float = 0.0,
+            timeout_rate: float = 0.0,
+            status_rates: dict[int, float] = None,
+            truncate_rate: float = 0.0,
+            retry_after: float = None,
+            seed: int = None,
+    ):
+        """Inject faults into the exchanges of another transport to exercise the retry and timeout handling.
+
+        Per attempt one fault is rolled, in this order:
+
+        ``drop``
+            The connection is reset before the request is sent (:exc:`TransportConnectionError`).
+        ``timeout``
+            The request hangs until its timeout (:exc:`TransportTimeout`).
+        status code (e.g. ``503``)
+            An error response of the API is returned without sending the request.
+        ``truncate``
+            The request is sent, but the response body is cut off. The clients retry
+            a successful response, whose body can't be decoded, like a server error.
+
+        The added *latency* applies to all attempts; an attempt whose latency exceeds
+        its timeout fails with :exc:`TransportTimeout` as well.
+        The observations are collected in :attr:`report`.
+
+        :param transport: The transport which really performs the requests.
+        :param latency: (optional) A distribution of the added latency,
+            e.g. :func:`lognormalLatency`.
+        :param drop_rate: Rate (0..1) of dropped connections.
+        :param timeout_rate: Rate (0..1) of hanging requests.
+        :param status_rates: Rates (0..1) of error responses by status code,
+            e.g. ``{503: 0.05, 429: 0.01}``.
+        :param truncate_rate: Rate (0..1) of truncated response bodies.
+        :param retry_after: (optional) The ``Retry-After`` header of injected 429 and 503 responses in seconds.
+        :param seed: (optional) Seed of the random generator for reproducible runs.
+        """
+        super().__init__()
+        self.transport = transport
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.timeout_rate = timeout_rate
+        self.status_rates = status_rates or {}
+        self.truncate_rate = truncate_rate
+        self.retry_after = retry_after
+        self.report = FaultReport()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _roll(self, request: TransportRequest) -> tuple[str | int | None, float]:
+        """Choose the fault and the added latency of an attempt."""
+        with self._lock:
+            delay = max(0.0, self.latency(self._random)) if self.latency is not None else 0.0
+            value = self._random.random()
+        if request.timeout is not None and delay >= request.timeout:
+            return "timeout", request.timeout
+        for fault, rate in (("drop", self.drop_rate), ("timeout", self.timeout_rate),
+                            *self.status_rates.items(), ("truncate", self.truncate_rate)):
+            if value < rate:
+                if fault == "timeout":
+                    delay = request.timeout if request.timeout is not None else delay
+                return fault, delay
+            value -= rate
+        return None, delay
+
+    def _errorResponse(self, request: TransportRequest, status_code: int) -> TransportResponse:
+        try:
+            reason = http.HTTPStatus(status_code).phrase
+        except ValueError:
+            reason = ""
+        headers = {"content-type": "application/json"}
+        if self.retry_after is not None and status_code in {429, 503}:
+            headers["retry-after"] = "%g" % self.retry_after
+        body = {
+            "id": "s-err-injected",
+            "url": request.url,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "isSuccess": False,
+            "isPending": False,
+            "isError": True,
+            "errors": [{
+                "code": "COR.000.000.%03d" % status_code,
+                "merchantMessage": "Injected fault: %d %s" % (status_code, reason),
+                "customerMessage": "An error occurred. Please try again later.",
+            }],
+        }
+        return TransportResponse(status_code, json.dumps(body).encode("utf-8"), reason, headers)
+
+    def _apply(self, request: TransportRequest, fault: str | int | None, started: float) -> None:
+        """Raise or record the faults, which don't need a response."""
+        if fault == "drop":
+            self.report.record(request, started, "drop")
+            raise TransportConnectionError("Injected fault: connection dropped")
+        if fault == "timeout":
+            self.report.record(request, started, "timeout")
+            raise TransportTimeout("Injected fault: request timed out after %.2f seconds" % request.timeout)
+
+    def _finish(self, request: TransportRequest, fault: str | int | None, started: float,
+                response: TransportResponse) -> TransportResponse:
+        if fault == "truncate" and response.content:
+            response = TransportResponse(
+                response.status_code,
+                response.content[:len(response.content) // 2],
+                response.reason,
+                response.headers,
+                response.raw,
+            )
+        outcome = fault or ("ok" if 200 <= response.status_code <= 201 else str(response.status_code))
+        self.report.record(request, started, str(outcome))
+        return response
+
+    def send(self, request: TransportRequest) -> TransportResponse:
+        started = time.perf_counter()
+        fault, delay = self._roll(request)
+        time.sleep(delay)
+        self._apply(request, fault, started)
+        if isinstance(fault, int):
+            return self._finish(request, fault, started, self._errorResponse(request, fault))
+        try:
+            response = self.transport.send(request)
+        except TransportError as exc:
+            self.report.record(request, started, exc.__class__.__name__)
+            raise
+        return self._finish(request, fault, started, response)
+
+    async def asend(self, request: TransportRequest) -> TransportResponse:
+        started = time.perf_counter()
+        fault, delay = self._roll(request)
+        await asyncio.sleep(delay)
+        self._apply(request, fault, started)
+        if isinstance(fault, int):
+            return self._finish(request, fault, started, self._errorResponse(request, fault))
+        try:
+            response = await self.transport.asend(request)
+        except TransportError as exc:
+            self.report.record(request, started, exc.__class__.__name__)
+            raise
+        return self._finish(request, fault, started, response)
+
+    def close(self) -> None:
+        self.transport.close()
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()